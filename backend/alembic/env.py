@@ -10,7 +10,10 @@ sys.path.insert(0, os.path.dirname(os.path.dirname(__file__)))
 
 from app.database import Base
 from app.config import settings
-from app.models import User, HRRequest, ChatSession
+from app.models import (
+    User, HRRequest, ChatSession, ChatSessionSummary, ChatSessionArchive, LeaveBalance,
+    RequestDailyStats, ReviewTimeHistogram, ChatIntentDailyStats, RollupWatermark
+)
 
 # this is the Alembic Config object, which provides
 # access to the values within the .ini file in use.
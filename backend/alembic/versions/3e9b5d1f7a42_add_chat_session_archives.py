@@ -0,0 +1,38 @@
+"""add_chat_session_archives
+
+Revision ID: 3e9b5d1f7a42
+Revises: f1a7c3e9d265
+Create Date: 2026-10-19 15:41:09.572630
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '3e9b5d1f7a42'
+down_revision = 'f1a7c3e9d265'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table('chat_session_archives',
+    sa.Column('session_id', sa.String(length=36), nullable=False),
+    sa.Column('user_id', sa.Integer(), nullable=False),
+    sa.Column('turn_count', sa.Integer(), nullable=False),
+    sa.Column('first_created_at', sa.DateTime(timezone=True), nullable=False),
+    sa.Column('last_created_at', sa.DateTime(timezone=True), nullable=False),
+    sa.Column('last_conversation_data', sa.JSON(), nullable=True),
+    sa.Column('payload', sa.LargeBinary(), nullable=False),
+    sa.Column('archived_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=True),
+    sa.ForeignKeyConstraint(['user_id'], ['users.id'], ),
+    sa.PrimaryKeyConstraint('session_id', 'user_id')
+    )
+    # Idle sessions are picked by last activity
+    op.create_index('ix_chat_session_summaries_last_activity_at', 'chat_session_summaries', ['last_activity_at'], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index('ix_chat_session_summaries_last_activity_at', table_name='chat_session_summaries')
+    op.drop_table('chat_session_archives')
@@ -0,0 +1,28 @@
+"""add_hr_request_listing_indexes
+
+Revision ID: 4b8e1d2f9a61
+Revises: 7c5f2ef2a6c2
+Create Date: 2026-10-19 09:12:41.218730
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '4b8e1d2f9a61'
+down_revision = '7c5f2ef2a6c2'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_index('ix_hr_requests_created_at_id', 'hr_requests', ['created_at', 'id'], unique=False)
+    op.create_index('ix_hr_requests_status_created_at', 'hr_requests', ['status', 'created_at', 'id'], unique=False)
+    op.create_index('ix_hr_requests_user_id_created_at', 'hr_requests', ['user_id', 'created_at', 'id'], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index('ix_hr_requests_user_id_created_at', table_name='hr_requests')
+    op.drop_index('ix_hr_requests_status_created_at', table_name='hr_requests')
+    op.drop_index('ix_hr_requests_created_at_id', table_name='hr_requests')
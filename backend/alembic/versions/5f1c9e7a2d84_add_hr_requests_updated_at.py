@@ -0,0 +1,28 @@
+"""add_hr_requests_updated_at
+
+Revision ID: 5f1c9e7a2d84
+Revises: e2f6b8a1c340
+Create Date: 2026-10-19 12:20:14.518203
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '5f1c9e7a2d84'
+down_revision = 'e2f6b8a1c340'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.add_column('hr_requests', sa.Column('updated_at', sa.DateTime(timezone=True), nullable=True))
+    op.execute("UPDATE hr_requests SET updated_at = COALESCE(reviewed_at, created_at, CURRENT_TIMESTAMP)")
+    op.alter_column('hr_requests', 'updated_at', nullable=False)
+    op.create_index('ix_hr_requests_updated_at', 'hr_requests', ['updated_at'], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index('ix_hr_requests_updated_at', table_name='hr_requests')
+    op.drop_column('hr_requests', 'updated_at')
@@ -0,0 +1,48 @@
+"""add_hr_requests_overlap_constraint
+
+Revision ID: 8a2d4f6c1b93
+Revises: 5f1c9e7a2d84
+Create Date: 2026-10-19 13:05:41.902176
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '8a2d4f6c1b93'
+down_revision = '5f1c9e7a2d84'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_index('ix_hr_requests_user_id_start_date', 'hr_requests', ['user_id', 'start_date'], unique=False)
+    
+    if op.get_bind().dialect.name != 'postgresql':
+        return
+    
+    # No two pending/approved requests of the same user may share a day
+    overlaps = op.get_bind().execute(sa.text("""
+        SELECT count(*) FROM hr_requests a JOIN hr_requests b
+          ON a.user_id = b.user_id AND a.id < b.id
+         AND a.status IN ('pending', 'approved') AND b.status IN ('pending', 'approved')
+         AND a.start_date <= b.end_date AND b.start_date <= a.end_date
+    """)).scalar()
+    if overlaps:
+        raise RuntimeError(
+            f"{overlaps} pairs of overlapping pending/approved leave requests exist; "
+            "reject or fix them before applying ex_hr_requests_no_overlap"
+        )
+    op.execute("CREATE EXTENSION IF NOT EXISTS btree_gist")
+    op.execute("""
+        ALTER TABLE hr_requests ADD CONSTRAINT ex_hr_requests_no_overlap
+        EXCLUDE USING gist (user_id WITH =, daterange(start_date, end_date, '[]') WITH &&)
+        WHERE (status IN ('pending', 'approved'))
+    """)
+
+
+def downgrade() -> None:
+    if op.get_bind().dialect.name == 'postgresql':
+        op.execute("ALTER TABLE hr_requests DROP CONSTRAINT IF EXISTS ex_hr_requests_no_overlap")
+    op.drop_index('ix_hr_requests_user_id_start_date', table_name='hr_requests')
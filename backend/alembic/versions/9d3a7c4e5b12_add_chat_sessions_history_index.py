@@ -0,0 +1,29 @@
+"""add_chat_sessions_history_index
+
+Revision ID: 9d3a7c4e5b12
+Revises: 4b8e1d2f9a61
+Create Date: 2026-10-19 10:03:17.514209
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '9d3a7c4e5b12'
+down_revision = '4b8e1d2f9a61'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_index(
+        'ix_chat_sessions_session_user_created',
+        'chat_sessions',
+        ['session_id', 'user_id', 'created_at', 'id'],
+        unique=False
+    )
+
+
+def downgrade() -> None:
+    op.drop_index('ix_chat_sessions_session_user_created', table_name='chat_sessions')
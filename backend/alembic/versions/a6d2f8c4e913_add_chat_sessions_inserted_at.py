@@ -0,0 +1,29 @@
+"""add_chat_sessions_inserted_at
+
+Revision ID: a6d2f8c4e913
+Revises: 3e9b5d1f7a42
+Create Date: 2026-10-19 16:20:37.104825
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'a6d2f8c4e913'
+down_revision = '3e9b5d1f7a42'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.add_column('chat_sessions', sa.Column('inserted_at', sa.DateTime(timezone=True), nullable=True))
+    # Existing rows keep their created_at so turns the chat rollup already counted aren't counted again
+    op.execute("UPDATE chat_sessions SET inserted_at = created_at")
+    op.alter_column('chat_sessions', 'inserted_at', server_default=sa.text('now()'))
+    op.create_index('ix_chat_sessions_inserted_at', 'chat_sessions', ['inserted_at'], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index('ix_chat_sessions_inserted_at', table_name='chat_sessions')
+    op.drop_column('chat_sessions', 'inserted_at')
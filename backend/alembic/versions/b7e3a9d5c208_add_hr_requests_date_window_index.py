@@ -0,0 +1,24 @@
+"""add_hr_requests_date_window_index
+
+Revision ID: b7e3a9d5c208
+Revises: 8a2d4f6c1b93
+Create Date: 2026-10-19 13:48:09.337512
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'b7e3a9d5c208'
+down_revision = '8a2d4f6c1b93'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_index('ix_hr_requests_end_date_start_date', 'hr_requests', ['end_date', 'start_date'], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index('ix_hr_requests_end_date_start_date', table_name='hr_requests')
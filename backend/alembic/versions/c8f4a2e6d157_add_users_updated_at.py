@@ -0,0 +1,28 @@
+"""add_users_updated_at
+
+Revision ID: c8f4a2e6d157
+Revises: a6d2f8c4e913
+Create Date: 2026-10-19 16:45:12.604918
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'c8f4a2e6d157'
+down_revision = 'a6d2f8c4e913'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.add_column('users', sa.Column('updated_at', sa.DateTime(timezone=True), nullable=True))
+    op.execute("UPDATE users SET updated_at = COALESCE(created_at, CURRENT_TIMESTAMP)")
+    op.alter_column('users', 'updated_at', nullable=False)
+    op.create_index('ix_users_updated_at', 'users', ['updated_at'], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index('ix_users_updated_at', table_name='users')
+    op.drop_column('users', 'updated_at')
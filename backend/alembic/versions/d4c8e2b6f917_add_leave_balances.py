@@ -0,0 +1,35 @@
+"""add_leave_balances
+
+Revision ID: d4c8e2b6f917
+Revises: b7e3a9d5c208
+Create Date: 2026-10-19 14:26:33.604118
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'd4c8e2b6f917'
+down_revision = 'b7e3a9d5c208'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    # Populate afterwards with: python scripts/reconcile_leave_balances.py
+    op.create_table('leave_balances',
+    sa.Column('user_id', sa.Integer(), nullable=False),
+    sa.Column('leave_type', sa.String(length=50), nullable=False),
+    sa.Column('year', sa.Integer(), nullable=False),
+    sa.Column('entitled_days', sa.Integer(), nullable=False),
+    sa.Column('used_days', sa.Integer(), nullable=False),
+    sa.Column('pending_days', sa.Integer(), nullable=False),
+    sa.Column('updated_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=True),
+    sa.ForeignKeyConstraint(['user_id'], ['users.id'], ),
+    sa.PrimaryKeyConstraint('user_id', 'leave_type', 'year')
+    )
+
+
+def downgrade() -> None:
+    op.drop_table('leave_balances')
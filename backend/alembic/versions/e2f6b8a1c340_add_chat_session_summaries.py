@@ -0,0 +1,62 @@
+"""add_chat_session_summaries
+
+Revision ID: e2f6b8a1c340
+Revises: 9d3a7c4e5b12
+Create Date: 2026-10-19 11:41:52.307815
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'e2f6b8a1c340'
+down_revision = '9d3a7c4e5b12'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table('chat_session_summaries',
+    sa.Column('session_id', sa.String(length=36), nullable=False),
+    sa.Column('user_id', sa.Integer(), nullable=False),
+    sa.Column('first_message_preview', sa.String(length=200), nullable=True),
+    sa.Column('last_activity_at', sa.DateTime(timezone=True), nullable=False),
+    sa.Column('turn_count', sa.Integer(), nullable=False),
+    sa.Column('last_intent', sa.String(length=50), nullable=True),
+    sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=True),
+    sa.ForeignKeyConstraint(['user_id'], ['users.id'], ),
+    sa.PrimaryKeyConstraint('session_id', 'user_id')
+    )
+    op.create_index(
+        'ix_chat_session_summaries_user_activity',
+        'chat_session_summaries',
+        ['user_id', 'last_activity_at', 'session_id'],
+        unique=False
+    )
+
+    # Backfill from existing transcripts
+    op.execute("""
+        INSERT INTO chat_session_summaries
+            (session_id, user_id, turn_count, created_at, last_activity_at, first_message_preview, last_intent)
+        SELECT
+            g.session_id, g.user_id, g.turn_count, g.first_at, g.last_at,
+            (SELECT substr(c.message, 1, 120) FROM chat_sessions c
+             WHERE c.session_id = g.session_id AND c.user_id = g.user_id
+             ORDER BY c.created_at, c.id LIMIT 1),
+            (SELECT c.intent FROM chat_sessions c
+             WHERE c.session_id = g.session_id AND c.user_id = g.user_id
+             ORDER BY c.created_at DESC, c.id DESC LIMIT 1)
+        FROM (
+            SELECT session_id, user_id, count(*) AS turn_count,
+                   min(created_at) AS first_at, max(created_at) AS last_at
+            FROM chat_sessions
+            WHERE session_id IS NOT NULL
+            GROUP BY session_id, user_id
+        ) g
+    """)
+
+
+def downgrade() -> None:
+    op.drop_index('ix_chat_session_summaries_user_activity', table_name='chat_session_summaries')
+    op.drop_table('chat_session_summaries')
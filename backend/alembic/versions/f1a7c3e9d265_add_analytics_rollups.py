@@ -0,0 +1,59 @@
+"""add_analytics_rollups
+
+Revision ID: f1a7c3e9d265
+Revises: d4c8e2b6f917
+Create Date: 2026-10-19 15:02:47.318254
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'f1a7c3e9d265'
+down_revision = 'd4c8e2b6f917'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    # Populate afterwards with: python scripts/refresh_analytics.py
+    op.create_table('request_daily_stats',
+    sa.Column('day', sa.Date(), nullable=False),
+    sa.Column('request_type', sa.String(length=50), nullable=False),
+    sa.Column('created_count', sa.Integer(), nullable=False),
+    sa.Column('approved_count', sa.Integer(), nullable=False),
+    sa.Column('rejected_count', sa.Integer(), nullable=False),
+    sa.PrimaryKeyConstraint('day', 'request_type')
+    )
+    op.create_table('review_time_histogram',
+    sa.Column('day', sa.Date(), nullable=False),
+    sa.Column('request_type', sa.String(length=50), nullable=False),
+    sa.Column('bucket', sa.Integer(), nullable=False),
+    sa.Column('review_count', sa.Integer(), nullable=False),
+    sa.PrimaryKeyConstraint('day', 'request_type', 'bucket')
+    )
+    op.create_table('chat_intent_daily_stats',
+    sa.Column('day', sa.Date(), nullable=False),
+    sa.Column('intent', sa.String(length=50), nullable=False),
+    sa.Column('turn_count', sa.Integer(), nullable=False),
+    sa.PrimaryKeyConstraint('day', 'intent')
+    )
+    op.create_table('rollup_watermarks',
+    sa.Column('name', sa.String(length=50), nullable=False),
+    sa.Column('processed_until', sa.DateTime(timezone=True), nullable=True),
+    sa.Column('updated_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=True),
+    sa.PrimaryKeyConstraint('name')
+    )
+    # Range reads when recomputing a day
+    op.create_index('ix_hr_requests_reviewed_at', 'hr_requests', ['reviewed_at'], unique=False)
+    op.create_index('ix_chat_sessions_created_at', 'chat_sessions', ['created_at'], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index('ix_chat_sessions_created_at', table_name='chat_sessions')
+    op.drop_index('ix_hr_requests_reviewed_at', table_name='hr_requests')
+    op.drop_table('rollup_watermarks')
+    op.drop_table('chat_intent_daily_stats')
+    op.drop_table('review_time_histogram')
+    op.drop_table('request_daily_stats')
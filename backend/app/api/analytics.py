@@ -0,0 +1,34 @@
+from datetime import date, timedelta
+from typing import Optional
+from fastapi import APIRouter, Depends, HTTPException
+from sqlalchemy.orm import Session
+from app.database import get_db
+from app.api.auth import get_current_user
+from app.api.serialization import json_response
+from app.services.principal_cache import Principal
+from app.services.analytics_service import analytics_summary
+
+router = APIRouter()
+
+DEFAULT_WINDOW_DAYS = 90
+MAX_WINDOW_DAYS = 3660
+
+
+@router.get("/summary")
+async def get_analytics_summary(
+    date_from: Optional[date] = None,
+    date_to: Optional[date] = None,
+    current_user: Principal = Depends(get_current_user),
+    db: Session = Depends(get_db)
+):
+    """HR dashboard stats from the daily rollups (HR only); defaults to the last 90 days"""
+    if current_user.role != "HR":
+        raise HTTPException(status_code=403, detail="Only HR users can view analytics")
+    date_to = date_to or date.today()
+    date_from = date_from or date_to - timedelta(days=DEFAULT_WINDOW_DAYS - 1)
+    if date_to < date_from:
+        raise HTTPException(status_code=400, detail="date_to must not be before date_from")
+    if (date_to - date_from).days + 1 > MAX_WINDOW_DAYS:
+        raise HTTPException(status_code=400, detail=f"Window is limited to {MAX_WINDOW_DAYS} days")
+    
+    return json_response(analytics_summary(db, date_from, date_to))
@@ -1,14 +1,17 @@
-import bcrypt
 from fastapi import APIRouter, Depends, HTTPException, status
 from fastapi.security import OAuth2PasswordBearer, OAuth2PasswordRequestForm
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
 from datetime import datetime, timedelta
 from typing import Optional
 from jose import JWTError, jwt
-from app.database import get_db
+from app.database import get_db, get_async_db
 from app.models.user import User
 from app.schemas.user import UserResponse, Token
 from app.config import settings
+from app.services.principal_cache import Principal, principal_cache
+from app.services import password_service
 
 router = APIRouter()
 
@@ -17,28 +20,20 @@ oauth2_scheme = OAuth2PasswordBearer(tokenUrl="api/auth/login")
 
 def verify_password(plain_password: str, hashed_password: str) -> bool:
     """Verify a password against a bcrypt hash"""
-    try:
-        return bcrypt.checkpw(
-            plain_password.encode('utf-8'),
-            hashed_password.encode('utf-8')
-        )
-    except Exception as e:
-        print(f"Error verifying password: {e}")
-        return False
+    return password_service.verify_password(plain_password, hashed_password)
 
 
 def get_password_hash(password: str) -> str:
     """Hash a password using bcrypt"""
-    salt = bcrypt.gensalt()
-    hashed = bcrypt.hashpw(password.encode('utf-8'), salt)
-    return hashed.decode('utf-8')
+    return password_service.hash_password(password)
 
 
-def authenticate_user(db: Session, email: str, password: str):
+async def authenticate_user(db: Session, email: str, password: str):
     user = db.query(User).filter(User.email == email).first()
     if not user:
         return False
-    if not verify_password(password, user.password_hash):
+    # bcrypt runs in the worker pool so logins don't block in-flight requests
+    if not await password_service.verify_password_async(password, user.password_hash):
         return False
     return user
 
@@ -49,34 +44,89 @@ def create_access_token(data: dict, expires_delta: Optional[timedelta] = None):
         expire = datetime.utcnow() + expires_delta
     else:
         expire = datetime.utcnow() + timedelta(hours=24)
-    to_encode.update({"exp": expire})
+    to_encode.update({"exp": expire, "iat": datetime.utcnow()})
     encoded_jwt = jwt.encode(to_encode, settings.SECRET_KEY, algorithm=settings.ALGORITHM)
     return encoded_jwt
 
 
-async def get_current_user(token: str = Depends(oauth2_scheme), db: Session = Depends(get_db)):
-    credentials_exception = HTTPException(
-        status_code=status.HTTP_401_UNAUTHORIZED,
-        detail="Could not validate credentials",
-        headers={"WWW-Authenticate": "Bearer"},
-    )
+def principal_claims(user: User) -> dict:
+    """Stable user claims embedded in access tokens so most requests need no user lookup"""
+    return {"sub": user.email, "uid": user.id, "role": user.role, "name": user.full_name}
+
+
+CREDENTIALS_EXCEPTION = HTTPException(
+    status_code=status.HTTP_401_UNAUTHORIZED,
+    detail="Could not validate credentials",
+    headers={"WWW-Authenticate": "Bearer"},
+)
+
+
+def decode_token(token: str) -> dict:
     try:
         payload = jwt.decode(token, settings.SECRET_KEY, algorithms=[settings.ALGORITHM])
-        email: str = payload.get("sub")
-        if email is None:
-            raise credentials_exception
     except JWTError:
-        raise credentials_exception
-    user = db.query(User).filter(User.email == email).first()
-    if user is None:
-        raise credentials_exception
-    return user
+        raise CREDENTIALS_EXCEPTION
+    if payload.get("sub") is None:
+        raise CREDENTIALS_EXCEPTION
+    return payload
+
+
+def principal_from_claims(payload: dict) -> Optional[Principal]:
+    """Principal built from embedded claims, or None if the token must be checked against the database"""
+    user_id, role, name = payload.get("uid"), payload.get("role"), payload.get("name")
+    if None in (user_id, role, name) or not principal_cache.claims_trusted(user_id, payload.get("iat")):
+        # Older tokens without claims, tokens past the trust window, or the user changed since issue
+        return None
+    return Principal(id=user_id, email=payload["sub"], full_name=name, role=role)
+
+
+def token_matches_user(payload: dict, user: Optional[User]) -> bool:
+    """The token's user still exists (and is not a new account that reused a deleted user's email)"""
+    return user is not None and payload.get("uid") in (None, user.id)
+
+
+async def get_current_user(token: str = Depends(oauth2_scheme), db: Session = Depends(get_db)) -> Principal:
+    cached = principal_cache.get(token)
+    if cached is not None:
+        return cached
+    
+    payload = decode_token(token)
+    principal = principal_from_claims(payload)
+    if principal is None:
+        user = db.query(User).filter(User.email == payload["sub"]).first()
+        if not token_matches_user(payload, user):
+            raise CREDENTIALS_EXCEPTION
+        principal = Principal.from_user(user)
+    
+    principal_cache.put(token, principal, token_expires_at=payload.get("exp"))
+    return principal
+
+
+async def get_current_user_async(
+    token: str = Depends(oauth2_scheme),
+    db: AsyncSession = Depends(get_async_db)
+) -> Principal:
+    """get_current_user for routes running on the async engine"""
+    cached = principal_cache.get(token)
+    if cached is not None:
+        return cached
+    
+    payload = decode_token(token)
+    principal = principal_from_claims(payload)
+    if principal is None:
+        user = (await db.execute(select(User).where(User.email == payload["sub"]))).scalar_one_or_none()
+        if not token_matches_user(payload, user):
+            raise CREDENTIALS_EXCEPTION
+        principal = Principal.from_user(user)
+    
+    principal_cache.put(token, principal, token_expires_at=payload.get("exp"))
+    return principal
 
 
 @router.post("/login", response_model=Token)
 async def login(form_data: OAuth2PasswordRequestForm = Depends(), db: Session = Depends(get_db)):
     # OAuth2PasswordRequestForm uses 'username' field, but we use email
-    user = authenticate_user(db, form_data.username, form_data.password)
+    user = await authenticate_user(db, form_data.username, form_data.password)
     if not user:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
@@ -85,7 +135,7 @@ async def login(form_data: OAuth2PasswordRequestForm = Depends(), db: Session =
         )
     access_token_expires = timedelta(hours=24)
     access_token = create_access_token(
-        data={"sub": user.email}, expires_delta=access_token_expires
+        data=principal_claims(user), expires_delta=access_token_expires
     )
     return {
         "access_token": access_token,
@@ -95,8 +145,14 @@ async def login(form_data: OAuth2PasswordRequestForm = Depends(), db: Session =
 
 
 @router.get("/me", response_model=UserResponse)
-async def read_users_me(current_user: User = Depends(get_current_user)):
-    return UserResponse.model_validate(current_user)
+async def read_users_me(
+    current_user: Principal = Depends(get_current_user_async),
+    db: AsyncSession = Depends(get_async_db)
+):
+    user = await db.get(User, current_user.id)
+    if user is None:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="User not found")
+    return UserResponse.model_validate(user)
 
 
 @router.post("/logout")
@@ -1,24 +1,61 @@
+import asyncio
 import logging
-from fastapi import APIRouter, Depends, HTTPException
+import time
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response
+from fastapi.concurrency import run_in_threadpool
+from sqlalchemy import tuple_
 from sqlalchemy.orm import Session
 from typing import Optional, List
 import uuid
-from app.database import get_db
+from datetime import datetime, timezone
+from app.config import settings
+from app.database import SessionLocal, get_db
 from app.models.chat_session import ChatSession
-from app.models.user import User
-from app.schemas.chat import ChatMessage, ChatResponse, ChatHistoryResponse, ChatHistoryItem
+from app.models.chat_session_summary import ChatSessionSummary
+from app.schemas.chat import (
+    ChatMessage, ChatResponse, ChatHistoryResponse,
+    ChatSessionListResponse, ChatSessionSummaryItem
+)
 from app.api.auth import get_current_user
-from app.graphs.chat_graph import chat_graph
+from app.api.pagination import encode_cursor, decode_cursor
+from app.api.etag import make_etag, not_modified
+from app.api.serialization import json_response, rows_to_dicts
+from app.services.principal_cache import Principal
+from app.graphs import chat_graph
 from app.graphs.nodes.intent_classifier import ChatState
+from app.graphs.deadline import new_deadline
+from app.services import metrics_service
+from app.services.session_summary_service import record_turn
+from app.services.chat_archive_service import archived_turns, archived_state
+from app.services.transcript_writer import transcript_writer
 
 logger = logging.getLogger(__name__)
 router = APIRouter()
 
+DEFAULT_HISTORY_LIMIT = 50
+MAX_HISTORY_LIMIT = 200
+DEFAULT_SESSIONS_LIMIT = 20
+MAX_SESSIONS_LIMIT = 100
+
+
+def invoke_graph(graph, state: ChatState) -> ChatState:
+    """Run the graph with a session of its own, opened and closed in the worker thread.
+
+    The thread can outlive the request when the deadline is missed, so it must not
+    share the request's session (which get_db closes when the route returns). The route
+    releases its own connection first, so a turn holds one connection at a time.
+    """
+    db = SessionLocal()
+    try:
+        return graph.invoke(state, config={"configurable": {"db": db}})
+    finally:
+        db.close()
+
 
 @router.post("", response_model=ChatResponse)
 async def chat(
     message_data: ChatMessage,
-    current_user: User = Depends(get_current_user),
+    current_user: Principal = Depends(get_current_user),
     db: Session = Depends(get_db)
 ):
     """Process chat message using LangGraph"""
@@ -34,17 +71,26 @@ async def chat(
     logger.info(f"Session ID: {session_id}")
     
     # Retrieve conversation context from the last message in this session
-    last_chat = db.query(ChatSession).filter(
+    # (range scan on ix_chat_sessions_session_user_created; id breaks created_at ties)
+    last_chat = db.query(ChatSession.conversation_data).filter(
         ChatSession.session_id == session_id,
         ChatSession.user_id == current_user.id
-    ).order_by(ChatSession.created_at.desc()).first()
+    ).order_by(ChatSession.created_at.desc(), ChatSession.id.desc()).first()
     
     conversation_context = None
     if last_chat and last_chat.conversation_data:
         conversation_context = last_chat.conversation_data
         logger.info(f"Loaded conversation context: {conversation_context}")
+    elif last_chat is None and message_data.session_id:
+        # Resuming a session whose transcript has been archived
+        conversation_context = archived_state(db, session_id, current_user.id)
+    
+    # Hand the connection back to the pool while the graph runs on its own session;
+    # saving the turn below checks one out again
+    db.close()
     
     # Initialize state (use authenticated user's ID, not from request)
+    budget = settings.route_deadline("chat")
     initial_state: ChatState = {
         "message": message_data.message,
         "user_id": current_user.id,  # Always use authenticated user
@@ -52,33 +98,66 @@ async def chat(
         "context": None,
         "tool_result": None,
         "response": "",
-        "conversation_data": conversation_context  # Pass existing conversation context
+        "conversation_data": conversation_context,  # Pass existing conversation context
+        "deadline": new_deadline(budget)
     }
     logger.info("Initial state created, starting LangGraph orchestration...")
     
-    # Run the graph
+    # First use compiles the graph (importing langgraph); keep that off the event loop too
+    if chat_graph.is_initialized():
+        graph = chat_graph.get_chat_graph()
+    else:
+        graph = await run_in_threadpool(chat_graph.get_chat_graph)
+    
+    # Run the graph off the event loop, bounded by the route's time budget
+    started = time.monotonic()
     try:
-        logger.info(">>> Invoking LangGraph workflow")
-        result = chat_graph.invoke(initial_state)
+        logger.info(f">>> Invoking LangGraph workflow (budget: {budget}s)")
+        try:
+            result = await asyncio.wait_for(
+                run_in_threadpool(invoke_graph, graph, initial_state),
+                timeout=budget
+            )
+        except asyncio.TimeoutError:
+            logger.warning(f"<<< LangGraph workflow missed its {budget}s deadline")
+            metrics_service.increment("deadline_misses_total", route="chat")
+            # The turn is not persisted, so the conversation state stays where it was
+            return ChatResponse(
+                response="Sorry, this is taking longer than expected. Please try sending your message again.",
+                intent=None,
+                data=None,
+                session_id=session_id
+            )
+        finally:
+            metrics_service.observe("route_latency_seconds", time.monotonic() - started, route="chat")
         logger.info("<<< LangGraph workflow completed")
         logger.info(f"Final intent: {result.get('intent')}")
         logger.info(f"Response length: {len(result.get('response', ''))} characters")
         if result.get('tool_result'):
             logger.info(f"Tool result: {result.get('tool_result')}")
         
-        # Save to database
-        logger.info("Saving chat session to database...")
-        chat_session = ChatSession(
-            session_id=session_id,
-            user_id=current_user.id,
-            message=message_data.message,
-            response=result["response"],
-            intent=result.get("intent"),
-            conversation_data=result.get("conversation_data")  # Save conversation state
-        )
-        db.add(chat_session)
-        db.commit()
-        logger.info("Chat session saved successfully")
+        # Save to database (transcript row and session summary in one transaction)
+        turn_time = datetime.now(timezone.utc)
+        transcript_row = {
+            "session_id": session_id,
+            "user_id": current_user.id,
+            "message": message_data.message,
+            "response": result["response"],
+            "intent": result.get("intent"),
+            "conversation_data": result.get("conversation_data"),  # Save conversation state
+            "created_at": turn_time
+        }
+        # The next turn reads conversation state from the last row, so only turns that
+        # neither had nor produced state may be written behind
+        stateless_turn = conversation_context is None and result.get("conversation_data") is None
+        if settings.CHAT_WRITE_BEHIND and stateless_turn and transcript_writer.submit(transcript_row):
+            logger.info("Chat session queued for write-behind")
+        else:
+            logger.info("Saving chat session to database...")
+            db.add(ChatSession(**transcript_row))
+            record_turn(db, session_id, current_user.id, message_data.message, result.get("intent"), turn_time)
+            db.commit()
+            logger.info("Chat session saved successfully")
         
         # Prepare response
         response_data = {
@@ -101,54 +180,99 @@ async def chat(
 
 @router.get("/history/{session_id}", response_model=ChatHistoryResponse)
 async def get_chat_history(
+    request: Request,
+    response: Response,
     session_id: str,
-    current_user: User = Depends(get_current_user),
+    before: Optional[str] = None,
+    limit: int = Query(DEFAULT_HISTORY_LIMIT, ge=1, le=MAX_HISTORY_LIMIT),
+    current_user: Principal = Depends(get_current_user),
     db: Session = Depends(get_db)
 ):
-    """Get chat history for a specific session"""
-    logger.info(f"Fetching chat history for session: {session_id}, user: {current_user.id}")
+    """Get a page of chat history for a session.
     
-    # Get all chat sessions for this session_id and user
-    chat_sessions = db.query(ChatSession).filter(
+    Pages are read newest-first; `before` is the `next_cursor` of the previous page.
+    Messages within a page are returned oldest-first.
+    Pages reaching past the hot rows continue into the session's archived turns.
+    The ETag comes from the session summary row, so unchanged sessions return 304 without reading messages.
+    """
+    logger.info(f"Fetching chat history for session: {session_id}, user: {current_user.id}, before: {before}")
+    
+    summary = db.query(ChatSessionSummary.turn_count, ChatSessionSummary.last_activity_at).filter(
+        ChatSessionSummary.session_id == session_id,
+        ChatSessionSummary.user_id == current_user.id
+    ).first()
+    if summary is not None:
+        etag = make_etag(session_id, summary.turn_count, summary.last_activity_at, before, limit)
+        cached = not_modified(request, response, etag)
+        if cached:
+            return cached
+    
+    query = db.query(
+        ChatSession.id,
+        ChatSession.message,
+        ChatSession.response,
+        ChatSession.intent,
+        ChatSession.created_at
+    ).filter(
         ChatSession.session_id == session_id,
         ChatSession.user_id == current_user.id
-    ).order_by(ChatSession.created_at.asc()).all()
-    
-    if not chat_sessions:
-        logger.info(f"No chat history found for session: {session_id}")
-        return ChatHistoryResponse(session_id=session_id, messages=[])
-    
-    # Convert to response format
-    messages = [
-        ChatHistoryItem(
-            id=session.id,
-            message=session.message,
-            response=session.response,
-            intent=session.intent,
-            created_at=session.created_at
-        )
-        for session in chat_sessions
-    ]
+    )
+    cursor = decode_cursor(before) if before else None
+    if cursor:
+        query = query.filter(tuple_(ChatSession.created_at, ChatSession.id) < tuple_(*cursor))
+    
+    rows = rows_to_dicts(query.order_by(ChatSession.created_at.desc(), ChatSession.id.desc()).limit(limit + 1).all())
+    
+    if len(rows) <= limit:
+        # Cold read: archived turns are older than any hot row and keep their ids, so the same cursor applies
+        older = [
+            {key: turn[key] for key in ("id", "message", "response", "intent", "created_at")}
+            for turn in reversed(archived_turns(db, session_id, current_user.id))
+            if cursor is None or (turn["created_at"], turn["id"]) < cursor
+        ]
+        rows.extend(older[:limit + 1 - len(rows)])
+    
+    next_cursor = None
+    if len(rows) > limit:
+        rows = rows[:limit]
+        next_cursor = encode_cursor(rows[-1]["created_at"], rows[-1]["id"])
+    
+    messages = rows[::-1]
     
     logger.info(f"Found {len(messages)} messages in session: {session_id}")
-    return ChatHistoryResponse(session_id=session_id, messages=messages)
+    return json_response({"session_id": session_id, "messages": messages, "next_cursor": next_cursor}, response)
 
 
-@router.get("/sessions", response_model=List[str])
+@router.get("/sessions", response_model=ChatSessionListResponse)
 async def get_user_sessions(
-    current_user: User = Depends(get_current_user),
+    before: Optional[str] = None,
+    limit: int = Query(DEFAULT_SESSIONS_LIMIT, ge=1, le=MAX_SESSIONS_LIMIT),
+    current_user: Principal = Depends(get_current_user),
     db: Session = Depends(get_db)
 ):
-    """Get all session IDs for the current user"""
-    logger.info(f"Fetching all sessions for user: {current_user.id}")
+    """Get the current user's sessions, most recently active first"""
+    logger.info(f"Fetching sessions for user: {current_user.id}, before: {before}")
     
-    # Get distinct session IDs for this user
-    sessions = db.query(ChatSession.session_id).filter(
-        ChatSession.user_id == current_user.id
-    ).distinct().all()
+    query = db.query(ChatSessionSummary).filter(ChatSessionSummary.user_id == current_user.id)
+    if before:
+        cursor_activity, cursor_session_id = decode_cursor(before, key_type=str)
+        query = query.filter(
+            tuple_(ChatSessionSummary.last_activity_at, ChatSessionSummary.session_id)
+            < tuple_(cursor_activity, cursor_session_id)
+        )
     
-    session_ids = [session[0] for session in sessions if session[0]]
-    logger.info(f"Found {len(session_ids)} sessions for user: {current_user.id}")
+    summaries = query.order_by(
+        ChatSessionSummary.last_activity_at.desc(),
+        ChatSessionSummary.session_id.desc()
+    ).limit(limit + 1).all()
     
-    return session_ids
-
+    next_cursor = None
+    if len(summaries) > limit:
+        summaries = summaries[:limit]
+        next_cursor = encode_cursor(summaries[-1].last_activity_at, summaries[-1].session_id)
+    
+    logger.info(f"Found {len(summaries)} sessions for user: {current_user.id}")
+    return ChatSessionListResponse(
+        sessions=[ChatSessionSummaryItem.model_validate(summary) for summary in summaries],
+        next_cursor=next_cursor
+    )
@@ -0,0 +1,179 @@
+import csv
+import io
+import itertools
+import logging
+from datetime import date, datetime
+from typing import Callable, Iterator, Literal, Optional
+from fastapi import APIRouter, Depends, HTTPException
+from fastapi.responses import StreamingResponse
+from sqlalchemy import literal, select
+from sqlalchemy.orm import Session
+from app.config import settings
+from app.database import SessionLocal
+from app.models.chat_session import ChatSession
+from app.models.hr_request import HRRequest
+from app.api.auth import get_current_user
+from app.api.requests import apply_request_filters
+from app.api.serialization import dumps
+from app.services.chat_archive_service import iter_archived_turns
+from app.services.principal_cache import Principal
+from app.services.request_events import request_listing_query
+from app.services import metrics_service
+
+logger = logging.getLogger(__name__)
+router = APIRouter()
+
+ExportFormat = Literal["csv", "ndjson"]
+
+MEDIA_TYPES = {
+    "csv": "text/csv; charset=utf-8",
+    "ndjson": "application/x-ndjson",
+}
+
+CHAT_COLUMNS = (
+    ChatSession.id,
+    ChatSession.session_id,
+    ChatSession.user_id,
+    ChatSession.message,
+    ChatSession.response,
+    ChatSession.intent,
+    ChatSession.conversation_data,
+    ChatSession.created_at,
+    literal(False).label("archived"),
+)
+
+
+def _csv_value(value):
+    if isinstance(value, (date, datetime)):
+        return value.isoformat()
+    if isinstance(value, (dict, list)):
+        return dumps(value).decode("utf-8")
+    return value
+
+
+def _encode_csv(rows, header: Optional[list]) -> bytes:
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    if header:
+        writer.writerow(header)
+    writer.writerows([_csv_value(v) for v in row] for row in rows)
+    return buffer.getvalue().encode("utf-8")
+
+
+def _encode_ndjson(rows, keys: list) -> bytes:
+    return b"".join(dumps(dict(zip(keys, row))) + b"\n" for row in rows)
+
+
+def stream_rows(
+    build_statement: Callable[[Session], object],
+    export_format: str,
+    name: str,
+    leading_batches: Optional[Callable[[Session, list], Iterator[list]]] = None
+) -> Iterator[bytes]:
+    """Encode a query's rows one yield_per batch at a time.
+
+    Runs in the threadpool (sync generator) with its own session, since the request's
+    session is closed once the endpoint returns. stream_results opens a server-side
+    cursor on Postgres, so only one batch of rows is ever held in memory.
+    leading_batches(db, keys), if given, yields batches of rows (in the statement's column
+    order) that are written before the statement's rows.
+    """
+    db = SessionLocal()
+    exported = 0
+    try:
+        result = db.execute(build_statement(db), execution_options={
+            "stream_results": True,
+            "yield_per": settings.EXPORT_BATCH_SIZE
+        })
+        keys = list(result.keys())
+        if export_format == "csv":
+            yield _encode_csv([], keys)
+        batches = leading_batches(db, keys) if leading_batches is not None else iter(())
+        for rows in itertools.chain(batches, result.partitions()):
+            exported += len(rows)
+            yield _encode_csv(rows, None) if export_format == "csv" else _encode_ndjson(rows, keys)
+    except Exception as e:
+        # Headers are already sent; the truncated body is all the client can see
+        logger.error(f"Export of {name} failed after {exported} rows: {e}", exc_info=True)
+        raise
+    finally:
+        db.close()
+        metrics_service.increment("export_rows_total", exported, export=name)
+
+
+def export_response(
+    build_statement: Callable[[Session], object],
+    export_format: str,
+    name: str,
+    leading_batches: Optional[Callable[[Session, list], Iterator[list]]] = None
+) -> StreamingResponse:
+    filename = f"{name}-{datetime.utcnow().strftime('%Y%m%dT%H%M%SZ')}.{export_format}"
+    return StreamingResponse(
+        stream_rows(build_statement, export_format, name, leading_batches),
+        media_type=MEDIA_TYPES[export_format],
+        headers={"Content-Disposition": f'attachment; filename="{filename}"'}
+    )
+
+
+def require_hr(current_user: Principal):
+    if current_user.role != "HR":
+        raise HTTPException(status_code=403, detail="Only HR users can export data")
+
+
+@router.get("/requests")
+async def export_requests(
+    format: ExportFormat = "csv",
+    status: Optional[str] = None,
+    request_type: Optional[str] = None,
+    user_id: Optional[int] = None,
+    created_from: Optional[datetime] = None,
+    created_to: Optional[datetime] = None,
+    current_user: Principal = Depends(get_current_user)
+):
+    """Stream HR requests with employee and reviewer names, oldest first (HR only)"""
+    require_hr(current_user)
+
+    def build_statement(db: Session):
+        return apply_request_filters(
+            request_listing_query(db),
+            status=status,
+            request_type=request_type,
+            user_id=user_id,
+            created_from=created_from,
+            created_to=created_to
+        ).order_by(HRRequest.created_at, HRRequest.id).statement
+
+    return export_response(build_statement, format, "hr-requests")
+
+
+@router.get("/chat")
+async def export_chat_transcripts(
+    format: ExportFormat = "ndjson",
+    user_id: Optional[int] = None,
+    session_id: Optional[str] = None,
+    created_from: Optional[datetime] = None,
+    created_to: Optional[datetime] = None,
+    current_user: Principal = Depends(get_current_user)
+):
+    """Stream chat transcripts (HR only): archived sessions first, then live rows oldest first"""
+    require_hr(current_user)
+
+    def archived_batches(db: Session, keys: list) -> Iterator[list]:
+        turns = iter_archived_turns(
+            db, user_id=user_id, session_id=session_id, created_from=created_from, created_to=created_to
+        )
+        rows = ({**turn, "archived": True} for turn in turns)
+        while batch := [tuple(row[key] for key in keys) for row in itertools.islice(rows, settings.EXPORT_BATCH_SIZE)]:
+            yield batch
+
+    statement = select(*CHAT_COLUMNS)
+    if user_id is not None:
+        statement = statement.where(ChatSession.user_id == user_id)
+    if session_id:
+        statement = statement.where(ChatSession.session_id == session_id)
+    if created_from:
+        statement = statement.where(ChatSession.created_at >= created_from)
+    if created_to:
+        statement = statement.where(ChatSession.created_at < created_to)
+    statement = statement.order_by(ChatSession.created_at, ChatSession.id)
+    return export_response(lambda db: statement, format, "chat-transcripts", archived_batches)
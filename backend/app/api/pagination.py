@@ -0,0 +1,20 @@
+import base64
+from datetime import datetime
+from typing import Any, Callable, Tuple
+from fastapi import HTTPException
+
+# Keyset cursors encode the (timestamp, key) of the last row of a page, e.g. (created_at, id)
+
+
+def encode_cursor(timestamp: datetime, key: Any) -> str:
+    raw = f"{timestamp.isoformat()}|{key}"
+    return base64.urlsafe_b64encode(raw.encode("utf-8")).decode("ascii")
+
+
+def decode_cursor(cursor: str, key_type: Callable[[str], Any] = int) -> Tuple[datetime, Any]:
+    try:
+        raw = base64.urlsafe_b64decode(cursor.encode("ascii")).decode("utf-8")
+        timestamp, key = raw.split("|", 1)
+        return datetime.fromisoformat(timestamp), key_type(key)
+    except (ValueError, UnicodeError):
+        raise HTTPException(status_code=400, detail="Invalid cursor")
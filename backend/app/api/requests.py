@@ -1,123 +1,369 @@
-from fastapi import APIRouter, Depends, HTTPException
+import asyncio
+import json
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response
+from fastapi.responses import StreamingResponse
+from sqlalchemy import func, tuple_, select, update
 from sqlalchemy.orm import Session
-from typing import List
-from datetime import datetime
-from app.database import get_db
+from typing import List, Optional
+from datetime import date, datetime
+from app.config import settings
+from app.database import get_db, SessionLocal
 from app.models.hr_request import HRRequest
 from app.models.user import User
-from app.schemas.hr_request import HRRequestResponse, HRRequestUpdate
+from app.schemas.hr_request import (
+    HRRequestResponse,
+    HRRequestUpdate,
+    BulkReviewRequest,
+    BulkReviewResult,
+    BulkReviewResponse,
+    LeaveCalendarResponse,
+    LeaveBalanceItem
+)
 from app.api.auth import get_current_user
+from app.services.principal_cache import Principal
+from app.api.pagination import encode_cursor, decode_cursor
+from app.api.etag import make_etag, not_modified
+from app.api.serialization import json_response, rows_to_dicts
+from app.services.balance_service import record_status_changes, get_balances
+from app.services.leave_service import ACTIVE_STATUSES, find_conflicting_requests, lock_user_for_leave, leave_calendar
+from app.services.event_bus import event_bus
+from app.services.request_events import (
+    REQUEST_UPDATED,
+    request_listing_query,
+    publish_request_changes
+)
 
 router = APIRouter()
 
+DEFAULT_PAGE_SIZE = 100
+MAX_PAGE_SIZE = 500
+MAX_CALENDAR_DAYS = 366
+
+
+def apply_request_filters(
+    query,
+    status: Optional[str] = None,
+    request_type: Optional[str] = None,
+    user_id: Optional[int] = None,
+    created_from: Optional[datetime] = None,
+    created_to: Optional[datetime] = None
+):
+    """Apply the optional listing filters"""
+    if status:
+        query = query.filter(HRRequest.status == status)
+    if request_type:
+        query = query.filter(HRRequest.request_type == request_type)
+    if user_id is not None:
+        query = query.filter(HRRequest.user_id == user_id)
+    if created_from:
+        query = query.filter(HRRequest.created_at >= created_from)
+    if created_to:
+        query = query.filter(HRRequest.created_at < created_to)
+    return query
+
+
+def listing_etag(db: Session, scope: str, filters: dict, limit: int, cursor: Optional[str]) -> str:
+    """ETag from the newest updated_at of hr_requests and users, plus the query parameters.
+    
+    Two unfiltered max() lookups on the updated_at indexes, so the check stays O(log N)
+    whatever the filters. Requests are never deleted, so every insert or update moves it,
+    and users are included because listings embed employee and reviewer names. It is
+    coarse: any change invalidates every listing's ETag.
+    """
+    marker = db.query(
+        select(func.max(HRRequest.updated_at)).scalar_subquery(),
+        select(func.max(User.updated_at)).scalar_subquery()
+    ).one()
+    return make_etag(scope, *marker, *sorted(filters.items()), limit, cursor)
+
+
+def fetch_request_page(query, limit: int, cursor: Optional[str], response: Response) -> List[dict]:
+    """Keyset pagination newest-first on (created_at, id); sets X-Next-Cursor when more rows exist.
+    
+    Rows are returned as plain dicts shaped like HRRequestResponse.
+    """
+    if cursor:
+        cursor_created_at, cursor_id = decode_cursor(cursor)
+        query = query.filter(tuple_(HRRequest.created_at, HRRequest.id) < tuple_(cursor_created_at, cursor_id))
+    
+    rows = query.order_by(HRRequest.created_at.desc(), HRRequest.id.desc()).limit(limit + 1).all()
+    
+    if len(rows) > limit:
+        rows = rows[:limit]
+        response.headers["X-Next-Cursor"] = encode_cursor(rows[-1].created_at, rows[-1].id)
+    
+    return rows_to_dicts(rows)
+
 
 @router.get("", response_model=List[HRRequestResponse])
 async def get_my_requests(
-    current_user: User = Depends(get_current_user),
+    request: Request,
+    response: Response,
+    limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+    cursor: Optional[str] = None,
+    status: Optional[str] = None,
+    request_type: Optional[str] = None,
+    current_user: Principal = Depends(get_current_user),
     db: Session = Depends(get_db)
 ):
-    """Get current user's HR requests"""
-    requests = db.query(HRRequest).filter(HRRequest.user_id == current_user.id).order_by(HRRequest.created_at.desc()).all()
-    
-    # Add user information to each request
-    result = []
-    for req in requests:
-        req_dict = {
-            **req.__dict__,
-            "user_name": current_user.full_name,
-            "user_email": current_user.email,
-            "reviewed_by_name": None
-        }
-        # Get reviewer name if exists
-        if req.reviewed_by:
-            reviewer = db.query(User).filter(User.id == req.reviewed_by).first()
-            if reviewer:
-                req_dict["reviewed_by_name"] = reviewer.full_name
-        result.append(HRRequestResponse.model_validate(req_dict))
+    """Get current user's HR requests (newest first, paginated via X-Next-Cursor, conditional via ETag)"""
+    filters = {"status": status, "request_type": request_type, "user_id": current_user.id}
+    cached = not_modified(request, response, listing_etag(db, "mine", filters, limit, cursor))
+    if cached:
+        return cached
     
-    return result
+    query = apply_request_filters(request_listing_query(db), **filters)
+    return json_response(fetch_request_page(query, limit, cursor, response), response)
 
 
 @router.get("/all", response_model=List[HRRequestResponse])
 async def get_all_requests(
-    current_user: User = Depends(get_current_user),
+    request: Request,
+    response: Response,
+    limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+    cursor: Optional[str] = None,
+    status: Optional[str] = None,
+    request_type: Optional[str] = None,
+    user_id: Optional[int] = None,
+    created_from: Optional[datetime] = None,
+    created_to: Optional[datetime] = None,
+    current_user: Principal = Depends(get_current_user),
     db: Session = Depends(get_db)
 ):
-    """Get all HR requests (HR only)"""
+    """Get all HR requests (HR only, newest first, paginated via X-Next-Cursor, conditional via ETag)"""
     if current_user.role != "HR":
         raise HTTPException(status_code=403, detail="Only HR users can view all requests")
     
-    # Join with User table to get employee information
-    requests = db.query(HRRequest).join(User, HRRequest.user_id == User.id).order_by(HRRequest.created_at.desc()).all()
-    
-    # Add user and reviewer information to each request
-    result = []
-    for req in requests:
-        # Get employee info
-        employee = db.query(User).filter(User.id == req.user_id).first()
-        
-        req_dict = {
-            **req.__dict__,
-            "user_name": employee.full_name if employee else None,
-            "user_email": employee.email if employee else None,
-            "reviewed_by_name": None
+    filters = {
+        "status": status,
+        "request_type": request_type,
+        "user_id": user_id,
+        "created_from": created_from,
+        "created_to": created_to
+    }
+    cached = not_modified(request, response, listing_etag(db, "all", filters, limit, cursor))
+    if cached:
+        return cached
+    
+    query = apply_request_filters(request_listing_query(db), **filters)
+    return json_response(fetch_request_page(query, limit, cursor, response), response)
+
+
+@router.get("/balance", response_model=List[LeaveBalanceItem])
+async def get_leave_balance(
+    year: Optional[int] = None,
+    user_id: Optional[int] = None,
+    current_user: Principal = Depends(get_current_user),
+    db: Session = Depends(get_db)
+):
+    """Leave balance per type for a year (default: current); HR may pass user_id"""
+    if user_id is not None and user_id != current_user.id and current_user.role != "HR":
+        raise HTTPException(status_code=403, detail="Only HR users can view other users' balances")
+    return get_balances(db, user_id if user_id is not None else current_user.id, year or date.today().year)
+
+
+@router.get("/calendar", response_model=LeaveCalendarResponse)
+async def get_leave_calendar(
+    date_from: date,
+    date_to: date,
+    status: Optional[List[str]] = Query(None),
+    include_people: bool = True,
+    current_user: Principal = Depends(get_current_user),
+    db: Session = Depends(get_db)
+):
+    """Per-day counts of people on leave in a date window, by request type and status (HR only).
+    
+    Defaults to pending and approved requests; repeat `status` to choose others.
+    """
+    if current_user.role != "HR":
+        raise HTTPException(status_code=403, detail="Only HR users can view the leave calendar")
+    if date_to < date_from:
+        raise HTTPException(status_code=400, detail="date_to must not be before date_from")
+    if (date_to - date_from).days + 1 > MAX_CALENDAR_DAYS:
+        raise HTTPException(status_code=400, detail=f"Window is limited to {MAX_CALENDAR_DAYS} days")
+    
+    calendar = leave_calendar(db, date_from, date_to, statuses=tuple(status or ACTIVE_STATUSES), include_people=include_people)
+    return json_response(calendar)
+
+
+@router.get("/events")
+async def stream_request_events(request: Request, token: str = Query(...)):
+    """Server-sent events for request changes (HR: all requests, employees: their own).
+
+    EventSource can't send headers, so the access token comes as a query parameter.
+    Event types: request.created, request.updated, and resync (refetch the listing).
+    """
+    db = SessionLocal()
+    try:
+        current_user = await get_current_user(token=token, db=db)
+    finally:
+        db.close()
+    
+    def visible(event: dict) -> bool:
+        if current_user.role == "HR" or "request" not in event:
+            return True
+        return event["request"]["user_id"] == current_user.id
+    
+    async def event_stream():
+        queue = event_bus.subscribe()
+        try:
+            yield "retry: 5000\n\n"
+            while not await request.is_disconnected():
+                try:
+                    event = await asyncio.wait_for(queue.get(), timeout=settings.SSE_KEEPALIVE_SECONDS)
+                except asyncio.TimeoutError:
+                    yield ": keepalive\n\n"
+                    continue
+                if visible(event):
+                    yield f"event: {event['type']}\ndata: {json.dumps(event)}\n\n"
+        finally:
+            event_bus.unsubscribe(queue)
+    
+    return StreamingResponse(
+        event_stream(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
+
+def review_pending_requests(db: Session, ids: List[int], decision: str, reviewer_id: int) -> List[BulkReviewResult]:
+    """Set-based review of pending requests and their balances; per-id outcomes in input order (the caller commits)"""
+    reviewed_at = datetime.utcnow()
+    pending = (HRRequest.id.in_(ids), HRRequest.status == "pending")
+    values = {"status": decision, "reviewed_by": reviewer_id, "reviewed_at": reviewed_at}
+    
+    balance_columns = (HRRequest.id, HRRequest.user_id, HRRequest.request_type, HRRequest.start_date, HRRequest.duration_days)
+    
+    if db.get_bind().dialect.update_returning:
+        stmt = update(HRRequest).where(*pending).values(**values).returning(*balance_columns)
+        updated = db.execute(stmt, execution_options={"synchronize_session": False}).all()
+    else:
+        # No UPDATE ... RETURNING: lock the pending rows first so the update hits exactly those
+        updated = db.execute(select(*balance_columns).where(*pending).with_for_update()).all()
+        if updated:
+            db.execute(
+                update(HRRequest).where(HRRequest.id.in_([row.id for row in updated])).values(**values),
+                execution_options={"synchronize_session": False}
+            )
+    updated_ids = {row.id for row in updated}
+    record_status_changes(db, [
+        (row.user_id, row.request_type, row.start_date, row.duration_days, "pending", decision)
+        for row in updated
+    ])
+    
+    remaining = [request_id for request_id in ids if request_id not in updated_ids]
+    existing = {}
+    if remaining:
+        existing = {
+            row.id: row for row in db.execute(
+                select(HRRequest.id, HRRequest.status, HRRequest.reviewed_by, HRRequest.reviewed_at)
+                .where(HRRequest.id.in_(remaining))
+            )
         }
-        
-        # Get reviewer name if exists
-        if req.reviewed_by:
-            reviewer = db.query(User).filter(User.id == req.reviewed_by).first()
-            if reviewer:
-                req_dict["reviewed_by_name"] = reviewer.full_name
-        
-        result.append(HRRequestResponse.model_validate(req_dict))
     
-    return result
+    results = []
+    for request_id in ids:
+        if request_id in updated_ids:
+            results.append(BulkReviewResult(
+                id=request_id, outcome="updated", status=decision, reviewed_by=reviewer_id, reviewed_at=reviewed_at
+            ))
+        elif request_id in existing:
+            row = existing[request_id]
+            results.append(BulkReviewResult(
+                id=request_id, outcome="conflict", status=row.status, reviewed_by=row.reviewed_by, reviewed_at=row.reviewed_at
+            ))
+        else:
+            results.append(BulkReviewResult(id=request_id, outcome="not_found"))
+    return results
+
+
+@router.post("/bulk-review", response_model=BulkReviewResponse)
+async def bulk_review_requests(
+    review: BulkReviewRequest,
+    current_user: Principal = Depends(get_current_user),
+    db: Session = Depends(get_db)
+):
+    """Approve or reject many pending requests at once (HR only); already-reviewed ids are reported as conflicts"""
+    if current_user.role != "HR":
+        raise HTTPException(status_code=403, detail="Only HR users can review requests")
+    
+    ids = list(dict.fromkeys(review.ids))  # De-duplicate, keep order
+    results = review_pending_requests(db, ids, review.decision, current_user.id)
+    db.commit()
+    publish_request_changes(db, REQUEST_UPDATED, [r.id for r in results if r.outcome == "updated"])
+    
+    return BulkReviewResponse(
+        updated=sum(1 for r in results if r.outcome == "updated"),
+        conflicts=sum(1 for r in results if r.outcome == "conflict"),
+        not_found=sum(1 for r in results if r.outcome == "not_found"),
+        results=results
+    )
 
 
 @router.patch("/{request_id}/approve", response_model=HRRequestResponse)
 async def approve_request(
     request_id: int,
-    current_user: User = Depends(get_current_user),
+    current_user: Principal = Depends(get_current_user),
     db: Session = Depends(get_db)
 ):
     """Approve a leave request (HR only)"""
     if current_user.role != "HR":
         raise HTTPException(status_code=403, detail="Only HR users can approve requests")
     
-    request = db.query(HRRequest).filter(HRRequest.id == request_id).first()
+    # Row lock: the balance delta depends on the status we read
+    request = db.query(HRRequest).filter(HRRequest.id == request_id).with_for_update().first()
     if not request:
         raise HTTPException(status_code=404, detail="Request not found")
     
+    # Re-activating a rejected request must not overlap the employee's other leave
+    if request.status not in ACTIVE_STATUSES:
+        lock_user_for_leave(db, request.user_id)
+        conflicts = find_conflicting_requests(db, request.user_id, request.start_date, request.end_date, exclude_id=request.id)
+        if conflicts:
+            raise HTTPException(
+                status_code=409,
+                detail=f"Overlaps the employee's active requests: {[c.id for c in conflicts]}"
+            )
+    
+    record_status_changes(db, [
+        (request.user_id, request.request_type, request.start_date, request.duration_days, request.status, "approved")
+    ])
     request.status = "approved"
     request.reviewed_by = current_user.id
     request.reviewed_at = datetime.utcnow()
     
     db.commit()
     db.refresh(request)
+    publish_request_changes(db, REQUEST_UPDATED, [request.id])
     
-    return HRRequestResponse.model_validate(request)
+    return request  # Serialized by response_model (from_attributes)
 
 
 @router.patch("/{request_id}/reject", response_model=HRRequestResponse)
 async def reject_request(
     request_id: int,
-    current_user: User = Depends(get_current_user),
+    current_user: Principal = Depends(get_current_user),
     db: Session = Depends(get_db)
 ):
     """Reject a leave request (HR only)"""
     if current_user.role != "HR":
         raise HTTPException(status_code=403, detail="Only HR users can reject requests")
     
-    request = db.query(HRRequest).filter(HRRequest.id == request_id).first()
+    # Row lock: the balance delta depends on the status we read
+    request = db.query(HRRequest).filter(HRRequest.id == request_id).with_for_update().first()
     if not request:
         raise HTTPException(status_code=404, detail="Request not found")
     
+    record_status_changes(db, [
+        (request.user_id, request.request_type, request.start_date, request.duration_days, request.status, "rejected")
+    ])
     request.status = "rejected"
     request.reviewed_by = current_user.id
     request.reviewed_at = datetime.utcnow()
     
     db.commit()
     db.refresh(request)
+    publish_request_changes(db, REQUEST_UPDATED, [request.id])
     
-    return HRRequestResponse.model_validate(request)
+    return request  # Serialized by response_model (from_attributes)
 
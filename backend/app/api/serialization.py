@@ -0,0 +1,40 @@
+import json
+from datetime import date, datetime
+from typing import Any, Optional
+from fastapi import Response
+
+try:
+    import orjson
+except ImportError:  # Optional: fall back to the stdlib encoder
+    orjson = None
+
+# Fast path for large listings: endpoints project rows to plain dicts and encode them
+# directly, skipping per-row model construction, response_model re-validation and
+# field serializers. orjson writes dates/datetimes as ISO 8601, same as the schemas.
+
+
+def _default(value: Any):
+    if isinstance(value, (date, datetime)):
+        return value.isoformat()
+    raise TypeError(f"Object of type {type(value).__name__} is not JSON serializable")
+
+
+def dumps(content: Any) -> bytes:
+    if orjson is not None:
+        return orjson.dumps(content)
+    return json.dumps(content, default=_default, separators=(",", ":")).encode("utf-8")
+
+
+def rows_to_dicts(rows) -> list:
+    """Column-projection rows (Row objects) to plain dicts"""
+    return [dict(row._mapping) for row in rows]
+
+
+def json_response(content: Any, response: Optional[Response] = None, status_code: int = 200) -> Response:
+    """Encoded JSON response carrying over headers set on the injected `response` (cursors, ETags)"""
+    fast = Response(content=dumps(content), status_code=status_code, media_type="application/json")
+    if response is not None:
+        for key, value in response.headers.items():
+            if key.lower() not in ("content-length", "content-type"):
+                fast.headers[key] = value
+    return fast
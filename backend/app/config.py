@@ -1,15 +1,45 @@
+from pydantic import PrivateAttr, model_validator
 from pydantic_settings import BaseSettings
-from typing import List, Optional
+from typing import Dict, List, Optional
 
 
 class Settings(BaseSettings):
     # Database
     DATABASE_URL: str
+    DATABASE_ASYNC_URL: Optional[str] = None  # Defaults to DATABASE_URL with an async driver (asyncpg)
+    DB_POOL_SIZE: int = 10
+    DB_MAX_OVERFLOW: int = 20
+    DB_POOL_TIMEOUT: float = 30.0  # Seconds to wait for a pooled connection
+    DB_POOL_RECYCLE: int = 1800  # Recycle connections older than this (seconds)
+    DB_POOL_PRE_PING: bool = True
+    DB_CREATE_ALL: bool = True  # Create missing tables at startup (migrations remain the way to change schema)
+    
+    # Startup and server (python -m app.server)
+    STARTUP_WARMUP: bool = False  # Initialize Gemini, Qdrant and the chat graph at startup instead of on first use
+    WARMUP_QUERIES: str = ""  # "|"-separated common questions embedded during warm-up
+    WEB_CONCURRENCY: int = 1  # Worker processes
+    SERVER_HOST: str = "0.0.0.0"
+    SERVER_PORT: int = 8000
+    SERVER_PRELOAD: bool = True  # Import the app and SDKs once in the master, before forking workers
+    SERVER_GRACEFUL_TIMEOUT: float = 30.0  # Seconds workers get to finish in-flight requests on shutdown
     
     # Gemini API
     GEMINI_API_KEY: str
     GEMINI_MODEL: str
     GEMINI_EMBEDDING_MODEL: str
+    GEMINI_FAST_MODEL: Optional[str] = None  # Small/fast tier, defaults to GEMINI_MODEL
+    GEMINI_STRONG_MODEL: Optional[str] = None  # Strong tier, defaults to GEMINI_MODEL
+    NODE_MODEL_TIERS: str = "intent_classifier=fast,leave_extraction=fast,policy_qa=strong"
+    LLM_PROVIDER: str = "gemini"  # "gemini", or "stub" for offline deterministic outputs (load tests, CI)
+    
+    # Stub LLM provider (LLM_PROVIDER=stub)
+    STUB_LATENCY_MEDIAN_MS: float = 0.0  # Log-normal generation latency; 0 answers immediately
+    STUB_LATENCY_P99_MS: float = 0.0
+    STUB_EMBEDDING_LATENCY_MEDIAN_MS: float = 0.0
+    STUB_EMBEDDING_LATENCY_P99_MS: float = 0.0
+    STUB_ERROR_RATE: float = 0.0  # Fraction of calls that raise
+    STUB_SEED: Optional[int] = None  # Seed for latency/error draws (outputs are always deterministic)
+    STUB_EMBEDDING_DIM: Optional[int] = None  # Defaults to QDRANT_VECTOR_SIZE, else 768
     
     # Qdrant
     QDRANT_HOST: str
@@ -19,17 +49,96 @@ class Settings(BaseSettings):
     QDRANT_USE_CLOUD: bool = False  # Set to true if using Qdrant Cloud
     QDRANT_VECTOR_SIZE: Optional[int] = None  # Optional, will auto-detect from first embedding if not set
     
+    # Chat transcript write-behind
+    CHAT_WRITE_BEHIND: bool = False  # Queue stateless transcript rows and bulk-insert them in the background
+    CHAT_WRITE_BATCH_SIZE: int = 100
+    CHAT_WRITE_FLUSH_INTERVAL: float = 0.5  # Seconds
+    CHAT_WRITE_QUEUE_SIZE: int = 10000  # Beyond this, turns are written synchronously
+    CHAT_WRITE_RETRIES: int = 5  # Flush attempts per batch, backing off from 0.5s
+    CHAT_WRITE_SPILL_PATH: Optional[str] = "chat_write_spill.jsonl"  # Batches that still fail land here and are replayed on start
+    CHAT_ARCHIVE_AFTER_DAYS: float = 90.0  # Sessions idle this long move to the compressed archive table
+    CHAT_ARCHIVE_INTERVAL_SECONDS: float = 3600.0  # Retention job period; 0 disables the background job
+    CHAT_ARCHIVE_BATCH_SIZE: int = 500  # Sessions archived per transaction
+    
+    # HR request push events (SSE)
+    EVENT_BUS_BACKEND: str = "memory"  # memory (single worker) or postgres (LISTEN/NOTIFY across workers)
+    EVENT_BUS_CHANNEL: str = "hr_request_events"
+    EVENT_BUS_MAX_PENDING: int = 100  # Per-subscriber backlog before it is told to resync
+    SSE_KEEPALIVE_SECONDS: float = 15.0
+    
+    # Leave balances
+    LEAVE_ENTITLEMENTS: str = "annual=20,sick=10,parental=90"  # Default days per year by leave type
+    
+    # Analytics rollups
+    ANALYTICS_ROLLUP_INTERVAL_SECONDS: float = 300.0  # Background refresh period; 0 disables the task
+    ANALYTICS_ROLLUP_LAG_SECONDS: float = 60.0  # Rows newer than this are left for the next run
+    
+    # Exports
+    EXPORT_BATCH_SIZE: int = 1000  # Rows fetched from the server-side cursor and encoded per chunk
+    
+    # Response compression
+    COMPRESSION_MIN_SIZE: int = 1024  # Bytes; smaller responses go out uncompressed
+    COMPRESSION_LEVEL: int = 5  # gzip level (1-9)
+    COMPRESSION_BROTLI: bool = True  # Prefer brotli when brotli-asgi is installed and the client accepts it
+    
     # Security
     SECRET_KEY: str
     ALGORITHM: str
+    AUTH_CACHE_TTL_SECONDS: int = 300  # Longest a user goes unchecked against the database (principal cache, token claims)
+    AUTH_CACHE_MAX_ENTRIES: int = 10000
+    BCRYPT_ROUNDS: int = 12  # bcrypt cost factor for new password hashes
+    PASSWORD_HASH_WORKERS: int = 4  # Threads verifying passwords off the event loop
+    PASSWORD_HASH_PROCESSES: Optional[int] = None  # Processes for bulk hashing (default: CPU count)
     
     # CORS
     CORS_ORIGINS: str
     
+    # Request deadlines (seconds)
+    CHAT_DEADLINE_SECONDS: float = 20.0  # Default end-to-end budget for a chat turn
+    ROUTE_DEADLINES: str = ""  # Per-route overrides, e.g. "chat=15,chat_replay=60"
+    POLICY_RETRIEVAL_MIN_SECONDS: float = 4.0  # Skip RAG retrieval below this remaining budget
+    LLM_CALL_MIN_SECONDS: float = 1.5  # Skip LLM calls below this remaining budget
+    _route_deadlines: Dict[str, float] = PrivateAttr(default_factory=dict)
+    
+    @model_validator(mode="after")
+    def parse_route_deadlines(self) -> "Settings":
+        """Parse ROUTE_DEADLINES once, so a malformed entry fails at startup rather than per request"""
+        for entry in self.ROUTE_DEADLINES.split(","):
+            if not entry.strip():
+                continue
+            name, _, value = entry.partition("=")
+            try:
+                seconds = float(value)
+            except ValueError:
+                raise ValueError(f"ROUTE_DEADLINES entry {entry.strip()!r} is not route=seconds") from None
+            if not name.strip() or seconds <= 0:
+                raise ValueError(f"ROUTE_DEADLINES entry {entry.strip()!r} needs a route name and positive seconds")
+            self._route_deadlines[name.strip()] = seconds
+        return self
+    
     @property
     def cors_origins_list(self) -> List[str]:
         return [origin.strip() for origin in self.CORS_ORIGINS.split(",")]
     
+    def route_deadline(self, route: str) -> float:
+        """Time budget in seconds for a route, falling back to CHAT_DEADLINE_SECONDS"""
+        return self._route_deadlines.get(route, self.CHAT_DEADLINE_SECONDS)
+    
+    @property
+    def warmup_queries(self) -> List[str]:
+        """WARMUP_QUERIES as a list"""
+        return [query.strip() for query in self.WARMUP_QUERIES.split("|") if query.strip()]
+    
+    @property
+    def leave_entitlements(self) -> Dict[str, int]:
+        """Yearly entitlement in days per leave type, from LEAVE_ENTITLEMENTS"""
+        entitlements = {}
+        for entry in self.LEAVE_ENTITLEMENTS.split(","):
+            name, _, value = entry.partition("=")
+            if name.strip() and value.strip():
+                entitlements[name.strip()] = int(value)
+        return entitlements
+    
     class Config:
         env_file = ".env"
         case_sensitive = True
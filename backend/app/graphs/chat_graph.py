@@ -1,6 +1,6 @@
 import logging
+import threading
 from typing import TypedDict, Optional, Literal
-from langgraph.graph import StateGraph, END
 from app.graphs.nodes.intent_classifier import classify_intent, ChatState
 from app.graphs.nodes.policy_qa import handle_policy_question
 from app.graphs.nodes.leave_request_tool import handle_leave_request
@@ -23,6 +23,8 @@ def route_by_intent(state: ChatState) -> Literal["policy_qa", "leave_request"]:
 
 def create_chat_graph():
     """Create and compile the chat graph"""
+    from langgraph.graph import StateGraph, END
+    
     workflow = StateGraph(ChatState)
     
     # Add nodes
@@ -51,6 +53,20 @@ def create_chat_graph():
     return workflow.compile()
 
 
-# Create the graph instance
-chat_graph = create_chat_graph()
+_chat_graph = None
+_chat_graph_lock = threading.Lock()
+
+
+def get_chat_graph():
+    """The compiled graph, built on first use (langgraph is slow to import)"""
+    global _chat_graph
+    if _chat_graph is None:
+        with _chat_graph_lock:
+            if _chat_graph is None:
+                _chat_graph = create_chat_graph()
+    return _chat_graph
+
+
+def is_initialized() -> bool:
+    return _chat_graph is not None
 
@@ -0,0 +1,41 @@
+import logging
+import time
+from typing import Optional
+from app.services import metrics_service
+
+logger = logging.getLogger(__name__)
+
+
+class DeadlineExceededError(Exception):
+    """The turn's deadline passed before a side effect could be committed"""
+
+
+def new_deadline(budget_seconds: float) -> float:
+    """Absolute deadline (monotonic clock) for a budget starting now"""
+    return time.monotonic() + budget_seconds
+
+
+def remaining_budget(state: dict) -> Optional[float]:
+    """Seconds left before the state's deadline, or None if the turn has no deadline"""
+    deadline = state.get("deadline")
+    if deadline is None:
+        return None
+    return max(0.0, deadline - time.monotonic())
+
+
+def has_budget(state: dict, needed_seconds: float) -> bool:
+    """Check whether at least `needed_seconds` remain for this turn"""
+    remaining = remaining_budget(state)
+    return remaining is None or remaining >= needed_seconds
+
+
+def deadline_exceeded(state: dict) -> bool:
+    """True once a turn with a deadline has used up its whole budget"""
+    return remaining_budget(state) == 0.0
+
+
+def record_degradation(node: str, reason: str):
+    """Record that a node degraded its answer because the deadline was close"""
+    logger.warning(f"   ⏱ Deadline short in {node}: {reason}")
+    metrics_service.increment("chat_degraded_total", node=node, reason=reason)
+
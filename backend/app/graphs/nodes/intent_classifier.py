@@ -1,6 +1,8 @@
 import logging
 from typing import TypedDict, Optional
-from app.services.gemini_service import get_gemini_model
+from app.config import settings
+from app.services.gemini_service import generate_for_node, strip_code_fences
+from app.graphs.deadline import has_budget, record_degradation
 import json
 
 logger = logging.getLogger(__name__)
@@ -14,6 +16,28 @@ class ChatState(TypedDict):
     tool_result: Optional[dict]
     response: str
     conversation_data: Optional[dict]  # Store conversation state for multi-turn conversations
+    deadline: Optional[float]  # Monotonic-clock deadline for this turn
+
+
+LEAVE_KEYWORDS = ["leave", "day off", "days off", "time off", "vacation", "sick day", "holiday"]
+
+
+def classify_intent_by_keywords(message: str) -> str:
+    """Cheap keyword fallback used when there is no time left for an LLM call"""
+    lowered = message.lower()
+    asks_question = lowered.rstrip().endswith("?") or lowered.startswith(("what", "how", "when", "can", "is", "do"))
+    if any(keyword in lowered for keyword in LEAVE_KEYWORDS) and not asks_question:
+        return "leave_request"
+    return "policy_question"
+
+
+def parse_intent(response_text: str) -> Optional[str]:
+    """Parse the classifier's JSON answer, returning None if it is unusable"""
+    try:
+        intent = json.loads(strip_code_fences(response_text)).get("intent")
+    except (ValueError, AttributeError):
+        return None
+    return intent if intent in ["policy_question", "leave_request"] else None
 
 
 def classify_intent(state: ChatState) -> ChatState:
@@ -30,6 +54,12 @@ def classify_intent(state: ChatState) -> ChatState:
     
     message = state["message"]
     
+    if not has_budget(state, settings.LLM_CALL_MIN_SECONDS):
+        record_degradation("intent_classifier", "keyword_fallback")
+        state["intent"] = classify_intent_by_keywords(message)
+        logger.info(f"   Node output (keyword fallback): intent = '{state['intent']}'")
+        return state
+    
     prompt = f"""You are an intent classifier for an HR AI agent. Classify the following user message into one of two categories:
 1. "policy_question" - User is asking about HR policies (e.g., "What is the work from home policy?", "How many sick days do I get?")
 2. "leave_request" - User wants to create a leave request (e.g., "I need to take leave", "Apply for annual leave", "I need a sick day")
@@ -42,31 +72,26 @@ Respond with ONLY a JSON object in this exact format:
 Do not include any other text or explanation."""
 
     logger.info("   Calling Gemini for intent classification...")
-    model = get_gemini_model()
-    response = model.generate_content(prompt)
-    logger.info(f"   Gemini raw response: {response.text[:200]}...")
-    
     try:
-        # Extract JSON from response
-        response_text = response.text.strip()
-        # Remove markdown code blocks if present
-        if "```json" in response_text:
-            response_text = response_text.split("```json")[1].split("```")[0].strip()
-        elif "```" in response_text:
-            response_text = response_text.split("```")[1].split("```")[0].strip()
+        response_text = generate_for_node(
+            "intent_classifier",
+            prompt,
+            is_valid=lambda text: parse_intent(text) is not None,
+            deadline=state.get("deadline")
+        )
+        logger.info(f"   Gemini raw response: {response_text[:200]}...")
         
-        intent_data = json.loads(response_text)
-        intent = intent_data.get("intent", "policy_question")
+        intent = parse_intent(response_text)
         
         # Validate intent
-        if intent not in ["policy_question", "leave_request"]:
-            logger.warning(f"   Invalid intent '{intent}', defaulting to 'policy_question'")
+        if intent is None:
+            logger.warning("   Invalid intent response, defaulting to 'policy_question'")
             intent = "policy_question"  # Default fallback
         else:
             logger.info(f"   ✓ Classified intent: '{intent}'")
     except Exception as e:
         logger.error(f"   ✗ Error classifying intent: {e}")
-        intent = "policy_question"  # Default fallback
+        intent = classify_intent_by_keywords(message)  # Keyword fallback (covers LLM timeouts)
     
     state["intent"] = intent
     logger.info(f"   Node output: intent = '{intent}'")
@@ -1,8 +1,13 @@
 import logging
 from typing import TypedDict, Optional
+from langchain_core.runnables import RunnableConfig
 from datetime import datetime, date, timedelta
-from app.services.gemini_service import get_gemini_model
+from app.config import settings
+from app.services.gemini_service import generate_for_node, strip_code_fences
 from app.graphs.tools.create_leave_request import create_leave_request
+from app.graphs.deadline import DeadlineExceededError, has_budget, deadline_exceeded, record_degradation
+from app.services.leave_service import LeaveConflictError, describe_conflicts
+from app.services.balance_service import InsufficientBalanceError
 import json
 
 logger = logging.getLogger(__name__)
@@ -16,9 +21,27 @@ class ChatState(TypedDict):
     tool_result: Optional[dict]
     response: str
     conversation_data: Optional[dict]
+    deadline: Optional[float]
 
 
-def extract_from_message(message: str, extract_type: str) -> Optional[str]:
+RETRY_HINT = "Sorry, I'm responding slowly right now. Could you please send that again?"
+
+
+def is_usable_extraction(extract_type: str, response_text: str) -> bool:
+    """Whether an extraction answer can be used as-is (otherwise it is escalated to the strong tier)"""
+    text = strip_code_fences(response_text)
+    if extract_type == "leave_type":
+        return text.strip('"').lower() in ["sick", "annual", "parental"]
+    if extract_type == "dates":
+        try:
+            dates = json.loads(text)
+            return "unknown" not in (dates.get("start_date"), dates.get("end_date"))
+        except (ValueError, AttributeError):
+            return False
+    return bool(text)
+
+
+def extract_from_message(message: str, extract_type: str, deadline: Optional[float] = None) -> Optional[str]:
     """Extract specific information from user message using Gemini"""
     
     today = date.today()
@@ -94,24 +117,25 @@ Respond with ONLY the reason text, no other formatting."""
         return None
 
     try:
-        model = get_gemini_model()
-        response = model.generate_content(prompt)
-        response_text = response.text.strip()
+        response_text = generate_for_node(
+            "leave_extraction",
+            prompt,
+            is_valid=lambda text: is_usable_extraction(extract_type, text),
+            deadline=deadline
+        )
         
         # Clean up response
-        if "```json" in response_text:
-            response_text = response_text.split("```json")[1].split("```")[0].strip()
-        elif "```" in response_text:
-            response_text = response_text.split("```")[1].split("```")[0].strip()
-        
-        return response_text
+        return strip_code_fences(response_text)
     except Exception as e:
         logger.error(f"Error extracting {extract_type}: {e}")
         return None
 
 
-def handle_leave_request(state: ChatState) -> ChatState:
-    """Handle leave request with conversational flow"""
+def handle_leave_request(state: ChatState, config: Optional[RunnableConfig] = None) -> ChatState:
+    """Handle leave request with conversational flow.
+    
+    The graph run's database session, if any, is passed in config["configurable"]["db"].
+    """
     logger.info("🛠️  NODE: Leave Request Tool (Conversational)")
     logger.info(f"   User ID: {state['user_id']}")
     logger.info(f"   Message: {state['message']}")
@@ -134,10 +158,17 @@ def handle_leave_request(state: ChatState) -> ChatState:
     stage = conversation_data.get("stage")
     collected_data = conversation_data.get("data", {})
     
+    # Every stage except confirmation may need an LLM extraction; keep the stage and ask again if time is short
+    if stage != "confirm" and not has_budget(state, settings.LLM_CALL_MIN_SECONDS):
+        record_degradation("leave_request", f"retry_{stage}")
+        state["conversation_data"] = conversation_data
+        state["response"] = RETRY_HINT
+        return state
+    
     # Stage 1: Ask for leave type (and try to extract everything from initial message)
     if stage == "ask_type":
         # Try to extract ALL information from the initial message
-        leave_type = extract_from_message(state["message"], "leave_type")
+        leave_type = extract_from_message(state["message"], "leave_type", state.get("deadline"))
         dates_text = None
         
         if leave_type and leave_type in ["sick", "annual", "parental"]:
@@ -145,7 +176,7 @@ def handle_leave_request(state: ChatState) -> ChatState:
             collected_data["leave_type"] = leave_type
             
             # Also try to extract dates from the same message
-            dates_text = extract_from_message(state["message"], "dates")
+            dates_text = extract_from_message(state["message"], "dates", state.get("deadline"))
             
             try:
                 if dates_text:
@@ -204,14 +235,14 @@ def handle_leave_request(state: ChatState) -> ChatState:
     
     # Stage 2: Collect leave type (and check if dates are also provided)
     elif stage == "collect_type":
-        leave_type = extract_from_message(state["message"], "leave_type")
+        leave_type = extract_from_message(state["message"], "leave_type", state.get("deadline"))
         
         if leave_type and leave_type in ["sick", "annual", "parental"]:
             logger.info(f"   ✓ Leave type collected: {leave_type}")
             collected_data["leave_type"] = leave_type
             
             # Also check if user provided dates in this message
-            dates_text = extract_from_message(state["message"], "dates")
+            dates_text = extract_from_message(state["message"], "dates", state.get("deadline"))
             
             try:
                 if dates_text:
@@ -252,7 +283,7 @@ def handle_leave_request(state: ChatState) -> ChatState:
     
     # Stage 3: Ask for dates
     elif stage == "ask_dates":
-        dates_text = extract_from_message(state["message"], "dates")
+        dates_text = extract_from_message(state["message"], "dates", state.get("deadline"))
         
         try:
             dates = json.loads(dates_text)
@@ -300,7 +331,7 @@ def handle_leave_request(state: ChatState) -> ChatState:
     
     # Stage 4: Ask for reason
     elif stage == "ask_reason":
-        reason = extract_from_message(state["message"], "reason")
+        reason = extract_from_message(state["message"], "reason", state.get("deadline"))
         
         if reason:
             logger.info(f"   ✓ Reason collected: {reason}")
@@ -337,6 +368,13 @@ Is this correct? Please reply 'yes' to submit or 'no' to cancel."""
         user_response = message.strip().lower()
         
         if user_response in ["yes", "y", "confirm", "correct", "submit", "ok", "okay", "sure"]:
+            # The API has already answered this turn; don't create a request the user was told to retry
+            if deadline_exceeded(state):
+                record_degradation("leave_request", "skip_create")
+                state["conversation_data"] = conversation_data
+                state["response"] = RETRY_HINT
+                return state
+            
             logger.info("   ✓ User confirmed, creating leave request...")
             
             try:
@@ -346,7 +384,9 @@ Is this correct? Please reply 'yes' to submit or 'no' to cancel."""
                     end_date=collected_data["end_date"],
                     request_type=collected_data["leave_type"],
                     duration_days=collected_data["duration_days"],
-                    reason=collected_data.get("reason")
+                    reason=collected_data.get("reason"),
+                    db=((config or {}).get("configurable") or {}).get("db"),
+                    deadline=state.get("deadline")
                 )
                 
                 logger.info(f"   ✓ Leave request created: ID={result.get('id')}")
@@ -365,6 +405,30 @@ Is this correct? Please reply 'yes' to submit or 'no' to cancel."""
 
 Your request will be reviewed by HR and you'll be notified of the decision soon. Is there anything else I can help you with?"""
                 
+            except LeaveConflictError as e:
+                logger.info(f"   ✗ Leave request conflicts: {e}")
+                # Keep the leave type and ask for different dates
+                conversation_data["stage"] = "ask_dates"
+                conversation_data["data"] = {"leave_type": collected_data["leave_type"]}
+                state["conversation_data"] = conversation_data
+                state["response"] = f"""These dates overlap leave you've already requested:
+
+{describe_conflicts(e.conflicts)}
+
+Please choose different dates for your {collected_data['leave_type']} leave."""
+            
+            except DeadlineExceededError:
+                record_degradation("leave_request", "skip_create")
+                state["conversation_data"] = conversation_data
+                state["response"] = RETRY_HINT
+            
+            except InsufficientBalanceError as e:
+                logger.info(f"   ✗ Insufficient balance: {e}")
+                conversation_data["stage"] = "ask_dates"
+                conversation_data["data"] = {"leave_type": collected_data["leave_type"]}
+                state["conversation_data"] = conversation_data
+                state["response"] = f"You have {max(e.available, 0)} {e.leave_type} leave day(s) left for {e.year}, but this request needs {e.requested}. Please choose shorter dates, or contact HR if you think your balance is wrong."
+            
             except Exception as e:
                 logger.error(f"   ✗ Error creating leave request: {e}")
                 state["conversation_data"] = None
@@ -1,10 +1,28 @@
 import logging
+import threading
+from collections import OrderedDict
+from datetime import date
 from typing import TypedDict, Optional
-from app.services.gemini_service import get_gemini_model
+from langchain_core.runnables import RunnableConfig
+from app.config import settings
+from app.database import SessionLocal
+from app.services.balance_service import get_balances, describe_balances
+from app.services.gemini_service import generate_for_node
 from app.services.rag_service import get_rag_context
+from app.graphs.deadline import has_budget, deadline_exceeded, record_degradation
 
 logger = logging.getLogger(__name__)
 
+# Recent answers, reused when a turn has no time left for retrieval/generation
+ANSWER_CACHE_SIZE = 256
+_answer_cache: "OrderedDict[str, str]" = OrderedDict()
+_answer_cache_lock = threading.Lock()
+
+RETRY_HINT = "I'm taking longer than usual to look this up. Please try asking again in a moment."
+
+# Questions about the user's own remaining leave are answered from leave_balances
+BALANCE_PHRASES = ("balance", "days left", "days do i have", "days remaining", "remaining days", "left this year")
+
 
 class ChatState(TypedDict):
     message: str
@@ -13,15 +31,80 @@ class ChatState(TypedDict):
     context: Optional[str]
     tool_result: Optional[dict]
     response: str
+    deadline: Optional[float]
+
+
+def _cache_key(message: str) -> str:
+    return " ".join(message.lower().split())
+
+
+def get_cached_answer(message: str) -> Optional[str]:
+    with _answer_cache_lock:
+        key = _cache_key(message)
+        answer = _answer_cache.get(key)
+        if answer is not None:
+            _answer_cache.move_to_end(key)
+        return answer
+
+
+def cache_answer(message: str, answer: str):
+    with _answer_cache_lock:
+        _answer_cache[_cache_key(message)] = answer
+        _answer_cache.move_to_end(_cache_key(message))
+        while len(_answer_cache) > ANSWER_CACHE_SIZE:
+            _answer_cache.popitem(last=False)
+
+
+def degraded_answer(message: str, context: str = "") -> str:
+    """Best answer available without a full generation: cached, partial (raw excerpt) or canned"""
+    cached = get_cached_answer(message)
+    if cached:
+        return cached
+    if context:
+        excerpt = context.split("\n\n")[0][:600]
+        return f"Here is the most relevant part of our HR policies I found:\n\n{excerpt}\n\n{RETRY_HINT}"
+    return RETRY_HINT
+
+
+def is_balance_question(message: str) -> bool:
+    text = message.lower()
+    return any(phrase in text for phrase in BALANCE_PHRASES)
 
 
-def handle_policy_question(state: ChatState) -> ChatState:
+def user_balance_text(user_id: int, config: Optional[RunnableConfig] = None) -> str:
+    """The user's leave balances for this year (primary-key read), using the graph run's session if given"""
+    db = ((config or {}).get("configurable") or {}).get("db")
+    owns_session = db is None
+    if owns_session:
+        db = SessionLocal()
+    try:
+        year = date.today().year
+        return f"leave balance for {year}:\n{describe_balances(get_balances(db, user_id, year))}"
+    finally:
+        if owns_session:
+            db.close()
+
+
+def handle_policy_question(state: ChatState, config: Optional[RunnableConfig] = None) -> ChatState:
     """Handle policy question using RAG"""
     logger.info("📚 NODE: Policy Q&A (RAG)")
     logger.info(f"   User question: {state['message']}")
     
     message = state["message"]
     
+    # Personal balance answers come from the balance table and never go into the shared answer cache
+    balance_text = None
+    if is_balance_question(message):
+        balance_text = user_balance_text(state["user_id"], config)
+        logger.info("   Added the user's leave balance to the context")
+    
+    # Without enough time for retrieval, answer from the cache or a canned response
+    if not has_budget(state, settings.POLICY_RETRIEVAL_MIN_SECONDS):
+        record_degradation("policy_qa", "skip_retrieval")
+        state["context"] = None
+        state["response"] = f"Here is your {balance_text}" if balance_text else degraded_answer(message)
+        return state
+    
     # Get relevant context from RAG
     logger.info("   Retrieving relevant policy chunks from Qdrant...")
     context = get_rag_context(message, top_k=3)
@@ -32,22 +115,37 @@ def handle_policy_question(state: ChatState) -> ChatState:
         logger.warning("   ⚠ No context retrieved from RAG")
     
     # Generate answer using Gemini with context
+    balance_context = f"\nThe user's current {balance_text}\n" if balance_text else ""
     prompt = f"""You are a helpful HR assistant. Answer the user's question about company HR policies based on the following context from policy documents.
 
 Context from HR Policies:
 {context}
-
+{balance_context}
 User Question: {message}
 
 Provide a clear, helpful answer based on the context. If the context doesn't contain enough information, say so politely. Be conversational and friendly."""
 
+    state["context"] = context
+    if not has_budget(state, settings.LLM_CALL_MIN_SECONDS):
+        record_degradation("policy_qa", "skip_generation")
+        state["response"] = f"Here is your {balance_text}" if balance_text else degraded_answer(message, context)
+        return state
+    
     logger.info("   Generating answer with Gemini...")
-    model = get_gemini_model()
-    response = model.generate_content(prompt)
-    logger.info(f"   ✓ Answer generated ({len(response.text)} characters)")
+    try:
+        answer = generate_for_node("policy_qa", prompt, deadline=state.get("deadline"))
+    except Exception as e:
+        if not deadline_exceeded(state):
+            raise
+        logger.error(f"   ✗ Generation did not finish within the deadline: {e}")
+        record_degradation("policy_qa", "generation_timeout")
+        state["response"] = f"Here is your {balance_text}" if balance_text else degraded_answer(message, context)
+        return state
+    logger.info(f"   ✓ Answer generated ({len(answer)} characters)")
     
-    state["context"] = context
-    state["response"] = response.text
+    if context and not balance_text:
+        cache_answer(message, answer)
+    state["response"] = answer
     logger.info("   Node completed successfully")
     return state
 
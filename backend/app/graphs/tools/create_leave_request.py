@@ -1,8 +1,20 @@
 import logging
+import time
 from datetime import date, datetime
+from typing import Optional
+from sqlalchemy.exc import IntegrityError
 from sqlalchemy.orm import Session
 from app.database import SessionLocal
+from app.graphs.deadline import DeadlineExceededError
 from app.models.hr_request import HRRequest
+from app.services.request_events import REQUEST_CREATED, publish_request_changes
+from app.services.leave_service import (
+    LeaveConflictError,
+    find_conflicting_requests,
+    lock_user_for_leave,
+    is_overlap_violation
+)
+from app.services.balance_service import InsufficientBalanceError, check_available, record_status_changes
 
 logger = logging.getLogger(__name__)
 
@@ -13,13 +25,23 @@ def create_leave_request(
     end_date: str,
     request_type: str,
     duration_days: int,
-    reason: str = None
+    reason: str = None,
+    db: Optional[Session] = None,
+    deadline: Optional[float] = None
 ) -> dict:
-    """Create a leave request in the database"""
+    """Create a leave request in the database.
+    
+    Uses the caller's session (the graph run's) when given, otherwise opens its own.
+    Raises LeaveConflictError if the dates overlap the user's pending/approved leave,
+    InsufficientBalanceError if the user's balance for that type and year is too low, and
+    DeadlineExceededError (nothing committed) if `deadline` passed before the commit.
+    """
     logger.info(f"🔧 TOOL: create_leave_request")
     logger.info(f"   Parameters: user_id={user_id}, type={request_type}, dates={start_date} to {end_date}, days={duration_days}")
     
-    db: Session = SessionLocal()
+    owns_session = db is None
+    if owns_session:
+        db = SessionLocal()
     
     try:
         # Parse dates
@@ -27,6 +49,14 @@ def create_leave_request(
         end = datetime.strptime(end_date, "%Y-%m-%d").date()
         logger.info(f"   Parsed dates: start={start}, end={end}")
         
+        # Check for overlaps while holding the user's row lock, so concurrent submissions can't both pass
+        lock_user_for_leave(db, user_id)
+        conflicts = find_conflicting_requests(db, user_id, start, end)
+        if conflicts:
+            logger.info(f"   ✗ Overlaps existing requests: {[c.id for c in conflicts]}")
+            raise LeaveConflictError(conflicts)
+        check_available(db, user_id, request_type, start, duration_days)
+        
         # Create HR request
         logger.info("   Creating HRRequest object...")
         hr_request = HRRequest(
@@ -41,10 +71,22 @@ def create_leave_request(
         
         logger.info("   Adding to database session...")
         db.add(hr_request)
+        record_status_changes(db, [(user_id, request_type, start, duration_days, None, "pending")])
+        if deadline is not None and time.monotonic() >= deadline:
+            # The caller has already answered; don't create a request the user was told to retry
+            raise DeadlineExceededError("Deadline passed before the leave request was committed")
         logger.info("   Committing to database...")
-        db.commit()
+        try:
+            db.commit()
+        except IntegrityError as e:
+            # Postgres exclusion constraint: the backstop if a writer bypassed the lock
+            if not is_overlap_violation(e):
+                raise
+            db.rollback()
+            raise LeaveConflictError(find_conflicting_requests(db, user_id, start, end))
         db.refresh(hr_request)
         logger.info(f"   ✓ Leave request created successfully: ID={hr_request.id}")
+        publish_request_changes(db, REQUEST_CREATED, [hr_request.id])
         
         result = {
             "id": hr_request.id,
@@ -58,11 +100,15 @@ def create_leave_request(
         }
         logger.info(f"   Tool result: {result}")
         return result
+    except (LeaveConflictError, InsufficientBalanceError, DeadlineExceededError):
+        db.rollback()
+        raise
     except Exception as e:
         logger.error(f"   ✗ Error creating leave request: {e}", exc_info=True)
         db.rollback()
         raise e
     finally:
-        db.close()
-        logger.info("   Database session closed")
+        if owns_session:
+            db.close()
+            logger.info("   Database session closed")
 
@@ -1,9 +1,21 @@
+import asyncio
 import logging
-from fastapi import FastAPI
+from contextlib import asynccontextmanager
+from fastapi import Depends, FastAPI, HTTPException
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import JSONResponse
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.middleware.gzip import GZipMiddleware
 from app.config import settings
 from app.database import engine, Base
-from app.api import auth, chat, requests, users
+from app.api import auth, chat, requests, users, analytics, exports
+from app.api.auth import get_current_user
+from app.services import metrics_service, gemini_service, rag_service, readiness_service
+from app.services.principal_cache import Principal
+from app.services.transcript_writer import transcript_writer
+from app.services import event_bus
+from app.services.analytics_service import rollup_loop
+from app.services.chat_archive_service import archive_loop
 
 # Configure logging
 logging.basicConfig(
@@ -11,11 +23,34 @@ logging.basicConfig(
     format='%(asctime)s - %(name)s - %(levelname)s - %(message)s',
     datefmt='%Y-%m-%d %H:%M:%S'
 )
+logger = logging.getLogger(__name__)
 
-# Create tables
-Base.metadata.create_all(bind=engine)
 
-app = FastAPI(title="HR AI Agent API", version="1.0.0")
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Nothing touches the database or external services at import time
+    if settings.DB_CREATE_ALL:
+        await run_in_threadpool(Base.metadata.create_all, bind=engine)
+    if settings.STARTUP_WARMUP:
+        await run_in_threadpool(readiness_service.warm_up)
+    if settings.CHAT_WRITE_BEHIND:
+        transcript_writer.start()
+    event_bus.start_bridge()
+    background_tasks = []
+    if settings.ANALYTICS_ROLLUP_INTERVAL_SECONDS > 0:
+        background_tasks.append(asyncio.create_task(rollup_loop(settings.ANALYTICS_ROLLUP_INTERVAL_SECONDS)))
+    if settings.CHAT_ARCHIVE_INTERVAL_SECONDS > 0:
+        background_tasks.append(asyncio.create_task(archive_loop(settings.CHAT_ARCHIVE_INTERVAL_SECONDS)))
+    yield
+    for task in background_tasks:
+        task.cancel()
+    rag_service.close_client()
+    # Drain queued transcript rows before the worker exits
+    transcript_writer.stop()
+    event_bus.stop_bridge()
+
+
+app = FastAPI(title="HR AI Agent API", version="1.0.0", lifespan=lifespan)
 
 # CORS middleware - Get allowed origins from environment variables
 app.add_middleware(
@@ -24,13 +59,38 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["X-Next-Cursor", "ETag"],
 )
 
+# Compress large payloads (listings, history); Starlette's gzip leaves the SSE stream alone
+BrotliMiddleware = None
+if settings.COMPRESSION_BROTLI:
+    try:
+        from brotli_asgi import BrotliMiddleware
+    except ImportError:
+        logger.info("brotli-asgi not installed, using gzip compression")
+
+if BrotliMiddleware is not None:
+    app.add_middleware(
+        BrotliMiddleware,
+        minimum_size=settings.COMPRESSION_MIN_SIZE,
+        gzip_fallback=True,
+        excluded_handlers=[r"^/api/requests/events"]
+    )
+else:
+    app.add_middleware(
+        GZipMiddleware,
+        minimum_size=settings.COMPRESSION_MIN_SIZE,
+        compresslevel=settings.COMPRESSION_LEVEL
+    )
+
 # Include routers
 app.include_router(auth.router, prefix="/api/auth", tags=["auth"])
 app.include_router(chat.router, prefix="/api/chat", tags=["chat"])
 app.include_router(requests.router, prefix="/api/requests", tags=["requests"])
 app.include_router(users.router, prefix="/api/users", tags=["users"])
+app.include_router(analytics.router, prefix="/api/analytics", tags=["analytics"])
+app.include_router(exports.router, prefix="/api/exports", tags=["exports"])
 
 
 @app.get("/api/health")
@@ -38,6 +98,21 @@ async def health_check():
     return {"status": "healthy"}
 
 
+@app.get("/api/ready")
+async def readiness():
+    """Per-dependency state; 503 until the database is reachable or while any initialized dependency fails"""
+    report = await run_in_threadpool(readiness_service.dependency_report)
+    return JSONResponse(report, status_code=200 if report["ready"] else 503)
+
+
+@app.get("/api/metrics")
+async def metrics(current_user: Principal = Depends(get_current_user)):
+    """In-process counters and latency summaries for this worker (HR only)"""
+    if current_user.role != "HR":
+        raise HTTPException(status_code=403, detail="Only HR users can view metrics")
+    return {**metrics_service.snapshot(), "llm": gemini_service.tier_report()}
+
+
 @app.get("/")
 async def root():
     return {"message": "HR AI Agent API"}
@@ -1,7 +1,22 @@
 from app.models.user import User
 from app.models.hr_request import HRRequest
 from app.models.chat_session import ChatSession
+from app.models.chat_session_summary import ChatSessionSummary
+from app.models.chat_session_archive import ChatSessionArchive
+from app.models.leave_balance import LeaveBalance
+from app.models.analytics_rollup import RequestDailyStats, ReviewTimeHistogram, ChatIntentDailyStats, RollupWatermark
 
-__all__ = ["User", "HRRequest", "ChatSession"]
+__all__ = [
+    "User",
+    "HRRequest",
+    "ChatSession",
+    "ChatSessionSummary",
+    "ChatSessionArchive",
+    "LeaveBalance",
+    "RequestDailyStats",
+    "ReviewTimeHistogram",
+    "ChatIntentDailyStats",
+    "RollupWatermark",
+]
 
 
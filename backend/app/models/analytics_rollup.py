@@ -0,0 +1,44 @@
+from sqlalchemy import Column, Integer, String, Date, DateTime
+from sqlalchemy.sql import func
+from app.database import Base
+
+# Daily aggregates behind /api/analytics, maintained incrementally by analytics_service
+
+
+class RequestDailyStats(Base):
+    """HR requests created and reviewed per UTC day and request type"""
+    __tablename__ = "request_daily_stats"
+    
+    day = Column(Date, primary_key=True)
+    request_type = Column(String(50), primary_key=True)
+    created_count = Column(Integer, nullable=False, default=0)  # By created_at day
+    approved_count = Column(Integer, nullable=False, default=0)  # By reviewed_at day
+    rejected_count = Column(Integer, nullable=False, default=0)
+
+
+class ReviewTimeHistogram(Base):
+    """Time-to-review (reviewed_at - created_at) per review day and type, in log2-second buckets"""
+    __tablename__ = "review_time_histogram"
+    
+    day = Column(Date, primary_key=True)
+    request_type = Column(String(50), primary_key=True)
+    bucket = Column(Integer, primary_key=True)  # Reviews taking [2^(bucket-1), 2^bucket) seconds
+    review_count = Column(Integer, nullable=False, default=0)
+
+
+class ChatIntentDailyStats(Base):
+    """Chat turns per UTC day and classified intent"""
+    __tablename__ = "chat_intent_daily_stats"
+    
+    day = Column(Date, primary_key=True)
+    intent = Column(String(50), primary_key=True)
+    turn_count = Column(Integer, nullable=False, default=0)
+
+
+class RollupWatermark(Base):
+    """How far each rollup has processed its source table"""
+    __tablename__ = "rollup_watermarks"
+    
+    name = Column(String(50), primary_key=True)
+    processed_until = Column(DateTime(timezone=True), nullable=True)  # None: nothing processed yet
+    updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now())
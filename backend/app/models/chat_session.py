@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, Text, DateTime, ForeignKey, JSON
+from sqlalchemy import Column, Integer, String, Text, DateTime, ForeignKey, JSON, Index
 from sqlalchemy.orm import relationship
 from sqlalchemy.sql import func
 from app.database import Base
@@ -7,6 +7,14 @@ import uuid
 
 class ChatSession(Base):
     __tablename__ = "chat_sessions"
+    __table_args__ = (
+        # History pages and the last-turn lookup are range scans on this index
+        Index("ix_chat_sessions_session_user_created", "session_id", "user_id", "created_at", "id"),
+        # Exports read turns in time order
+        Index("ix_chat_sessions_created_at", "created_at"),
+        # Analytics rollups read newly inserted turns
+        Index("ix_chat_sessions_inserted_at", "inserted_at"),
+    )
     
     id = Column(Integer, primary_key=True, index=True)
     session_id = Column(String(36), default=lambda: str(uuid.uuid4()), index=True)
@@ -16,6 +24,8 @@ class ChatSession(Base):
     intent = Column(String(50))
     conversation_data = Column(JSON, nullable=True)  # Store conversation state
     created_at = Column(DateTime(timezone=True), server_default=func.now())
+    # Stamped by the database on insert; write-behind rows carry an earlier, app-set created_at
+    inserted_at = Column(DateTime(timezone=True), server_default=func.now())
     
     # Relationships
     user = relationship("User", back_populates="chat_sessions")
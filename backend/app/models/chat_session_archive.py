@@ -0,0 +1,21 @@
+from sqlalchemy import Column, Integer, String, DateTime, ForeignKey, JSON, LargeBinary
+from sqlalchemy.sql import func
+from app.database import Base
+
+
+class ChatSessionArchive(Base):
+    """Cold storage for a session's transcript: all archived turns in one compressed payload.
+
+    Written by chat_archive_service once a session has been idle for CHAT_ARCHIVE_AFTER_DAYS;
+    the session's chat_sessions rows are deleted in the same transaction.
+    """
+    __tablename__ = "chat_session_archives"
+    
+    session_id = Column(String(36), primary_key=True)
+    user_id = Column(Integer, ForeignKey("users.id"), primary_key=True)
+    turn_count = Column(Integer, nullable=False)
+    first_created_at = Column(DateTime(timezone=True), nullable=False)
+    last_created_at = Column(DateTime(timezone=True), nullable=False)
+    last_conversation_data = Column(JSON, nullable=True)  # State of the last turn, read without decompressing
+    payload = Column(LargeBinary, nullable=False)  # zlib-compressed JSON list of turns, oldest first
+    archived_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now())
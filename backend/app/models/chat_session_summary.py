@@ -0,0 +1,26 @@
+from sqlalchemy import Column, Integer, String, DateTime, ForeignKey, Index
+from sqlalchemy.orm import relationship
+from sqlalchemy.sql import func
+from app.database import Base
+
+
+class ChatSessionSummary(Base):
+    """One row per (session, user), maintained incrementally on every chat turn"""
+    __tablename__ = "chat_session_summaries"
+    __table_args__ = (
+        # Sessions list: newest activity first for a user
+        Index("ix_chat_session_summaries_user_activity", "user_id", "last_activity_at", "session_id"),
+        # Archival picks idle sessions across all users
+        Index("ix_chat_session_summaries_last_activity_at", "last_activity_at"),
+    )
+    
+    session_id = Column(String(36), primary_key=True)
+    user_id = Column(Integer, ForeignKey("users.id"), primary_key=True)
+    first_message_preview = Column(String(200))
+    last_activity_at = Column(DateTime(timezone=True), nullable=False)
+    turn_count = Column(Integer, nullable=False, default=0)
+    last_intent = Column(String(50))
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+    
+    # Relationships
+    user = relationship("User")
@@ -1,4 +1,5 @@
-from sqlalchemy import Column, Integer, String, Date, Text, DateTime, ForeignKey
+from datetime import datetime
+from sqlalchemy import Column, Integer, String, Date, Text, DateTime, ForeignKey, Index
 from sqlalchemy.orm import relationship
 from sqlalchemy.sql import func
 from app.database import Base
@@ -6,6 +7,20 @@ from app.database import Base
 
 class HRRequest(Base):
     __tablename__ = "hr_requests"
+    __table_args__ = (
+        # Keyset pagination on (created_at, id), optionally filtered by status or user
+        Index("ix_hr_requests_created_at_id", "created_at", "id"),
+        Index("ix_hr_requests_status_created_at", "status", "created_at", "id"),
+        Index("ix_hr_requests_user_id_created_at", "user_id", "created_at", "id"),
+        # Overlap checks per user (Postgres also has a GiST exclusion constraint, see leave_service)
+        Index("ix_hr_requests_user_id_start_date", "user_id", "start_date"),
+        # Calendar windows: end_date >= window start AND start_date <= window end
+        Index("ix_hr_requests_end_date_start_date", "end_date", "start_date"),
+        # Analytics rollups recompute a day's reviews
+        Index("ix_hr_requests_reviewed_at", "reviewed_at"),
+        # Listing ETags read max(updated_at)
+        Index("ix_hr_requests_updated_at", "updated_at"),
+    )
     
     id = Column(Integer, primary_key=True, index=True)
     user_id = Column(Integer, ForeignKey("users.id"), nullable=False)
@@ -18,6 +33,8 @@ class HRRequest(Base):
     reviewed_by = Column(Integer, ForeignKey("users.id"), nullable=True)
     reviewed_at = Column(DateTime(timezone=True), nullable=True)
     created_at = Column(DateTime(timezone=True), server_default=func.now())
+    # Set in Python (microsecond resolution) so back-to-back changes always move the listing ETag
+    updated_at = Column(DateTime(timezone=True), default=datetime.utcnow, onupdate=datetime.utcnow, nullable=False)
     
     # Relationships
     user = relationship("User", back_populates="hr_requests", foreign_keys=[user_id])
@@ -0,0 +1,23 @@
+from sqlalchemy import Column, Integer, String, DateTime, ForeignKey
+from sqlalchemy.orm import relationship
+from sqlalchemy.sql import func
+from app.database import Base
+
+
+class LeaveBalance(Base):
+    """Per-user, per-type, per-year leave counters, updated in the same transaction as request changes.
+
+    Requests count toward the year of their start_date.
+    """
+    __tablename__ = "leave_balances"
+    
+    user_id = Column(Integer, ForeignKey("users.id"), primary_key=True)
+    leave_type = Column(String(50), primary_key=True)
+    year = Column(Integer, primary_key=True)
+    entitled_days = Column(Integer, nullable=False)
+    used_days = Column(Integer, nullable=False, default=0)  # Approved
+    pending_days = Column(Integer, nullable=False, default=0)
+    updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now())
+    
+    # Relationships
+    user = relationship("User")
@@ -1,4 +1,5 @@
-from sqlalchemy import Column, Integer, String, DateTime
+from datetime import datetime
+from sqlalchemy import Column, Integer, String, DateTime, Index
 from sqlalchemy.orm import relationship
 from sqlalchemy.sql import func
 from app.database import Base
@@ -6,6 +7,10 @@ from app.database import Base
 
 class User(Base):
     __tablename__ = "users"
+    __table_args__ = (
+        # Request listings embed user names; their ETags read max(updated_at)
+        Index("ix_users_updated_at", "updated_at"),
+    )
     
     id = Column(Integer, primary_key=True, index=True)
     email = Column(String(255), unique=True, nullable=False, index=True)
@@ -13,6 +18,7 @@ class User(Base):
     role = Column(String(20), nullable=False)  # 'HR' or 'employee'
     password_hash = Column(String(255), nullable=False)
     created_at = Column(DateTime(timezone=True), server_default=func.now())
+    updated_at = Column(DateTime(timezone=True), default=datetime.utcnow, onupdate=datetime.utcnow, nullable=False)
     
     # Relationships
     hr_requests = relationship("HRRequest", back_populates="user", foreign_keys="HRRequest.user_id")
@@ -34,4 +34,28 @@ class ChatHistoryItem(BaseModel):
 class ChatHistoryResponse(BaseModel):
     session_id: str
     messages: List[ChatHistoryItem]
+    next_cursor: Optional[str] = None  # Pass as `before` to fetch older messages
 
+
+
+class ChatSessionSummaryItem(BaseModel):
+    session_id: str
+    first_message_preview: Optional[str] = None
+    last_activity_at: datetime
+    turn_count: int
+    last_intent: Optional[str] = None
+    created_at: Optional[datetime] = None
+    
+    @field_serializer('last_activity_at', 'created_at')
+    def serialize_datetime(self, dt: Optional[datetime], _info):
+        if dt is None:
+            return None
+        return dt.isoformat()
+    
+    class Config:
+        from_attributes = True
+
+
+class ChatSessionListResponse(BaseModel):
+    sessions: List[ChatSessionSummaryItem]
+    next_cursor: Optional[str] = None  # Pass as `before` to fetch older sessions
@@ -1,5 +1,5 @@
-from pydantic import BaseModel, field_serializer
-from typing import Optional
+from pydantic import BaseModel, Field, field_serializer
+from typing import Dict, List, Literal, Optional
 from datetime import date, datetime
 
 
@@ -44,3 +44,63 @@ class HRRequestUpdate(BaseModel):
     status: str
     reviewed_by: int
 
+
+
+class BulkReviewRequest(BaseModel):
+    ids: List[int] = Field(..., min_length=1, max_length=500)
+    decision: Literal["approved", "rejected"]
+
+
+class BulkReviewResult(BaseModel):
+    id: int
+    outcome: Literal["updated", "conflict", "not_found"]
+    status: Optional[str] = None  # Current status (the existing one for conflicts)
+    reviewed_by: Optional[int] = None
+    reviewed_at: Optional[datetime] = None
+    
+    @field_serializer('reviewed_at')
+    def serialize_datetime(self, dt: Optional[datetime], _info):
+        if dt is None:
+            return None
+        return dt.isoformat()
+
+
+class BulkReviewResponse(BaseModel):
+    updated: int
+    conflicts: int
+    not_found: int
+    results: List[BulkReviewResult]
+
+
+class LeaveCalendarRequest(BaseModel):
+    id: int
+    user_id: int
+    user_name: Optional[str] = None
+    request_type: str
+    status: str
+    start_date: date
+    end_date: date
+
+
+class LeaveCalendarDay(BaseModel):
+    date: date
+    total: int
+    by_type: Dict[str, int]
+    by_status: Dict[str, int]
+    request_ids: Optional[List[int]] = None  # Only with include_people
+
+
+class LeaveCalendarResponse(BaseModel):
+    date_from: date
+    date_to: date
+    days: List[LeaveCalendarDay]
+    requests: Optional[List[LeaveCalendarRequest]] = None  # Who is off (only with include_people)
+
+
+class LeaveBalanceItem(BaseModel):
+    leave_type: str
+    year: int
+    entitled_days: int
+    used_days: int  # Approved
+    pending_days: int
+    available_days: int
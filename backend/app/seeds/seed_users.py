@@ -1,16 +1,36 @@
 import sys
-import bcrypt
+from typing import List
 from sqlalchemy.orm import Session
 from app.models.user import User
 from app.database import SessionLocal
+from app.services.password_service import bulk_hash_passwords
 
 
-def hash_password(password: str) -> str:
-    """Hash a password using bcrypt"""
-    # Generate salt and hash password
-    salt = bcrypt.gensalt()
-    hashed = bcrypt.hashpw(password.encode('utf-8'), salt)
-    return hashed.decode('utf-8')
+def provision_users(db: Session, users_data: List[dict]) -> List[User]:
+    """Add users in bulk (dicts with email, full_name, role, password), hashing passwords in parallel.
+    
+    Users whose email already exists are skipped. The caller commits.
+    """
+    emails = [user_data["email"] for user_data in users_data]
+    existing = {email for (email,) in db.query(User.email).filter(User.email.in_(emails))}
+    for email in existing:
+        print(f"  - WARNING: User with email {email} already exists. Skipping...")
+    
+    new_users_data = [user_data for user_data in users_data if user_data["email"] not in existing]
+    print(f"  - Hashing {len(new_users_data)} passwords in parallel...")
+    password_hashes = bulk_hash_passwords([user_data["password"] for user_data in new_users_data])
+    
+    users = [
+        User(
+            email=user_data["email"],
+            full_name=user_data["full_name"],
+            role=user_data["role"],
+            password_hash=password_hash
+        )
+        for user_data, password_hash in zip(new_users_data, password_hashes)
+    ]
+    db.add_all(users)
+    return users
 
 
 def seed_users(db: Session):
@@ -56,25 +76,12 @@ def seed_users(db: Session):
     
     for idx, user_data in enumerate(users_data, 1):
         print(f"\n[{idx}/{len(users_data)}] Processing user: {user_data['email']}")
-        password = user_data.pop("password")
         print(f"  - Full name: {user_data['full_name']}")
         print(f"  - Role: {user_data['role']}")
-        print(f"  - Hashing password...")
-        
-        password_hash = hash_password(password)
-        
-        # Check if user already exists
-        existing_user = db.query(User).filter(User.email == user_data['email']).first()
-        if existing_user:
-            print(f"  - WARNING: User with email {user_data['email']} already exists. Skipping...")
-            continue
-        
-        user = User(
-            **user_data,
-            password_hash=password_hash
-        )
-        db.add(user)
-        print(f"  - ✓ User added to session")
+    
+    print()
+    users = provision_users(db, users_data)
+    print(f"  - ✓ {len(users)} users added to session")
     
     print("\nCommitting changes to database...")
     try:
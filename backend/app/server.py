@@ -0,0 +1,178 @@
+"""
+Production entry point: a pre-forking launcher for uvicorn workers.
+
+    python -m app.server
+
+The master binds the listening socket, optionally preloads the app (and the slow
+SDK imports) so workers share those pages copy-on-write, then forks WEB_CONCURRENCY
+workers that all accept on the same socket. Each worker runs the app's lifespan with
+STARTUP_WARMUP forced on, so it only starts accepting connections once its database
+pool, Gemini client, Qdrant client and chat graph are ready; /api/ready reports the
+same. Crashed workers are replaced; SIGTERM/SIGINT shut every worker down gracefully.
+
+Nothing holding a connection, thread or event loop is created before the fork.
+Requires os.fork (Linux/macOS); with WEB_CONCURRENCY=1 the worker runs in-process.
+"""
+import importlib
+import logging
+import os
+import signal
+import socket
+import sys
+import time
+from typing import Dict
+import uvicorn
+from app.config import settings
+
+logger = logging.getLogger("app.server")
+
+# Imported by the master when preloading; their clients are still created per worker
+PRELOAD_MODULES = ("google.generativeai", "langgraph.graph", "qdrant_client")
+
+# A worker dying sooner than this after it started counts as a crash loop
+MIN_WORKER_LIFETIME = 5.0
+
+
+def bind_socket(host: str, port: int) -> socket.socket:
+    sock = socket.socket(socket.AF_INET6 if ":" in host else socket.AF_INET, socket.SOCK_STREAM)
+    sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+    sock.bind((host, port))
+    sock.listen(2048)
+    sock.set_inheritable(True)
+    return sock
+
+
+def preload():
+    """Import the app and heavy SDKs once in the master; create tables here instead of in every worker"""
+    started = time.monotonic()
+    from app.main import app
+    from app.database import Base, engine
+    for name in PRELOAD_MODULES:
+        try:
+            importlib.import_module(name)
+        except ImportError as e:
+            logger.warning(f"Preload of {name} skipped: {e}")
+    if settings.DB_CREATE_ALL:
+        Base.metadata.create_all(bind=engine)
+        settings.DB_CREATE_ALL = False
+    # Workers must open their own connections
+    engine.dispose()
+    logger.info(f"Preloaded app in {time.monotonic() - started:.2f}s")
+    return app
+
+
+def worker_config(app) -> uvicorn.Config:
+    return uvicorn.Config(
+        app,
+        proxy_headers=True,
+        timeout_graceful_shutdown=settings.SERVER_GRACEFUL_TIMEOUT,
+        log_config=None,  # Keep the app's logging setup
+    )
+
+
+def run_worker(app, sock: socket.socket):
+    settings.STARTUP_WARMUP = True
+    if app is None:
+        from app.main import app
+    uvicorn.Server(worker_config(app)).run(sockets=[sock])
+
+
+class Supervisor:
+    """Forks the workers, replaces ones that die and stops them all on SIGTERM/SIGINT"""
+
+    def __init__(self, app, sock: socket.socket, num_workers: int):
+        self.app = app
+        self.sock = sock
+        self.num_workers = num_workers
+        self.workers: Dict[int, float] = {}  # pid -> start time
+        self.stopping = False
+
+    def spawn(self):
+        pid = os.fork()
+        if pid == 0:
+            signal.signal(signal.SIGTERM, signal.SIG_DFL)
+            signal.signal(signal.SIGINT, signal.SIG_DFL)
+            code = 0
+            try:
+                run_worker(self.app, self.sock)
+            except Exception:
+                logger.exception("Worker failed")
+                code = 1
+            finally:
+                os._exit(code)
+        self.workers[pid] = time.monotonic()
+        logger.info(f"Started worker {pid}")
+
+    def handle_stop(self, signum, frame):
+        self.stopping = True
+
+    def run(self):
+        signal.signal(signal.SIGTERM, self.handle_stop)
+        signal.signal(signal.SIGINT, self.handle_stop)
+        for _ in range(self.num_workers):
+            self.spawn()
+        while not self.stopping:
+            self.reap(respawn=True)
+            time.sleep(0.5)
+        self.shutdown()
+
+    def reap(self, respawn: bool):
+        while self.workers:
+            try:
+                pid, status = os.waitpid(-1, os.WNOHANG)
+            except ChildProcessError:
+                self.workers.clear()
+                return
+            if pid == 0:
+                return
+            started = self.workers.pop(pid, None)
+            if started is None:
+                continue
+            exit_code = os.waitstatus_to_exitcode(status)
+            if self.stopping:
+                logger.info(f"Worker {pid} stopped ({exit_code})")
+                continue
+            logger.warning(f"Worker {pid} exited with status {exit_code}")
+            if respawn:
+                if time.monotonic() - started < MIN_WORKER_LIFETIME:
+                    # Back off instead of fork-bombing on a worker that cannot start
+                    time.sleep(MIN_WORKER_LIFETIME)
+                self.spawn()
+
+    def shutdown(self):
+        logger.info(f"Stopping {len(self.workers)} workers")
+        for pid in list(self.workers):
+            try:
+                os.kill(pid, signal.SIGTERM)
+            except ProcessLookupError:
+                self.workers.pop(pid, None)
+        deadline = time.monotonic() + settings.SERVER_GRACEFUL_TIMEOUT + 5
+        while self.workers and time.monotonic() < deadline:
+            self.reap(respawn=False)
+            time.sleep(0.1)
+        for pid in list(self.workers):
+            logger.warning(f"Worker {pid} did not stop in time, killing it")
+            os.kill(pid, signal.SIGKILL)
+            os.waitpid(pid, 0)
+
+
+def main():
+    # Uvicorn's own --workers spawns fresh interpreters, which would defeat preloading
+    sock = bind_socket(settings.SERVER_HOST, settings.SERVER_PORT)
+    app = preload() if settings.SERVER_PRELOAD else None
+    num_workers = max(settings.WEB_CONCURRENCY, 1)
+    logger.info(f"Listening on {settings.SERVER_HOST}:{settings.SERVER_PORT} with {num_workers} worker(s)")
+    if num_workers == 1 or not hasattr(os, "fork"):
+        run_worker(app, sock)
+    else:
+        Supervisor(app, sock, num_workers).run()
+    sock.close()
+
+
+if __name__ == "__main__":
+    logging.basicConfig(
+        level=logging.INFO,
+        format='%(asctime)s - %(name)s - %(levelname)s - %(message)s',
+        datefmt='%Y-%m-%d %H:%M:%S'
+    )
+    sys.exit(main())
@@ -0,0 +1,307 @@
+import asyncio
+import logging
+from collections import Counter, defaultdict
+from datetime import date, datetime, time, timedelta
+from typing import Dict, Optional, Tuple
+from fastapi.concurrency import run_in_threadpool
+from sqlalchemy import func, insert
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+from app.config import settings
+from app.database import SessionLocal
+from app.models.analytics_rollup import RequestDailyStats, ReviewTimeHistogram, ChatIntentDailyStats, RollupWatermark
+from app.models.chat_session import ChatSession
+from app.models.hr_request import HRRequest
+from app.services import metrics_service
+from app.services.chat_archive_service import iter_archived_turns
+
+logger = logging.getLogger(__name__)
+
+REQUESTS_ROLLUP = "hr_requests"
+CHAT_ROLLUP = "chat_intents"
+REVIEWED_STATUSES = ("approved", "rejected")
+
+
+def review_bucket(seconds: float) -> int:
+    """log2 bucket: bucket b holds reviews taking [2^(b-1), 2^b) seconds (bucket 0: under a second)"""
+    return int(max(seconds, 0)).bit_length()
+
+
+def histogram_median(buckets: Dict[int, int]) -> Optional[float]:
+    """Approximate median in seconds, interpolating linearly inside the median bucket"""
+    total = sum(buckets.values())
+    if not total:
+        return None
+    half = total / 2
+    seen = 0
+    for bucket in sorted(buckets):
+        count = buckets[bucket]
+        if seen + count >= half:
+            low = 0 if bucket == 0 else 2 ** (bucket - 1)
+            high = 2 ** bucket
+            return low + (high - low) * (half - seen) / count
+        seen += count
+    return None
+
+
+def _ensure_watermark(db: Session, name: str):
+    """Create the watermark row if missing, without failing when another worker creates it concurrently"""
+    stmt = _upsert_statement(db.get_bind().dialect.name, RollupWatermark)
+    if stmt is not None:
+        db.execute(stmt.values(name=name, processed_until=None).on_conflict_do_nothing(index_elements=["name"]))
+        return
+    if db.get(RollupWatermark, name) is None:
+        try:
+            with db.begin_nested():
+                db.add(RollupWatermark(name=name, processed_until=None))
+        except IntegrityError:
+            pass  # Created by a concurrent refresh
+
+
+def _lock_watermark(db: Session, name: str) -> RollupWatermark:
+    """The rollup's watermark row, locked so concurrent refreshes (other workers) wait for this one.
+
+    The row is created first: FOR UPDATE locks nothing while it doesn't exist, and every
+    worker's first refresh would race to insert it.
+    """
+    _ensure_watermark(db, name)
+    return db.query(RollupWatermark).filter(RollupWatermark.name == name).with_for_update().populate_existing().one()
+
+
+def _day_bounds(day: date) -> Tuple[datetime, datetime]:
+    start = datetime.combine(day, time.min)
+    return start, start + timedelta(days=1)
+
+
+def _recompute_request_day(db: Session, day: date):
+    """Rebuild one day's request aggregates from hr_requests (index range reads on created_at/reviewed_at)"""
+    start, end = _day_bounds(day)
+    db.query(RequestDailyStats).filter(RequestDailyStats.day == day).delete(synchronize_session=False)
+    db.query(ReviewTimeHistogram).filter(ReviewTimeHistogram.day == day).delete(synchronize_session=False)
+    
+    stats: Dict[str, Counter] = defaultdict(Counter)
+    created = db.query(HRRequest.request_type, func.count(HRRequest.id)).filter(
+        HRRequest.created_at >= start, HRRequest.created_at < end
+    ).group_by(HRRequest.request_type)
+    for request_type, count in created:
+        stats[request_type]["created_count"] = count
+    
+    histogram: Counter = Counter()
+    reviewed = db.query(HRRequest.request_type, HRRequest.status, HRRequest.created_at, HRRequest.reviewed_at).filter(
+        HRRequest.reviewed_at >= start,
+        HRRequest.reviewed_at < end,
+        HRRequest.status.in_(REVIEWED_STATUSES)
+    )
+    for request_type, status, created_at, reviewed_at in reviewed:
+        stats[request_type][f"{status}_count"] += 1
+        if created_at is not None:
+            seconds = (reviewed_at.replace(tzinfo=None) - created_at.replace(tzinfo=None)).total_seconds()
+            histogram[(request_type, review_bucket(seconds))] += 1
+    
+    if stats:
+        db.execute(insert(RequestDailyStats), [
+            {"day": day, "request_type": request_type, "created_count": 0, "approved_count": 0, "rejected_count": 0, **counts}
+            for request_type, counts in stats.items()
+        ])
+    if histogram:
+        db.execute(insert(ReviewTimeHistogram), [
+            {"day": day, "request_type": request_type, "bucket": bucket, "review_count": count}
+            for (request_type, bucket), count in histogram.items()
+        ])
+
+
+def refresh_request_rollups(db: Session, cutoff: datetime) -> int:
+    """Recompute the days touched by requests changed since the watermark; returns days recomputed.
+
+    Recomputing whole days keeps this idempotent: a row created one day and reviewed another
+    updates both days, and status flips never double count.
+    """
+    watermark = _lock_watermark(db, REQUESTS_ROLLUP)
+    changed = db.query(HRRequest.created_at, HRRequest.reviewed_at).filter(HRRequest.updated_at <= cutoff)
+    if watermark.processed_until is not None:
+        changed = changed.filter(HRRequest.updated_at > watermark.processed_until)
+    
+    days = set()
+    for created_at, reviewed_at in changed.yield_per(1000):
+        if created_at is not None:
+            days.add(created_at.date())
+        if reviewed_at is not None:
+            days.add(reviewed_at.date())
+    for day in sorted(days):
+        _recompute_request_day(db, day)
+    
+    watermark.processed_until = cutoff
+    return len(days)
+
+
+def _upsert_statement(dialect_name: str, model=ChatIntentDailyStats):
+    """INSERT ... ON CONFLICT for dialects that support it, else None"""
+    if dialect_name == "postgresql":
+        from sqlalchemy.dialects.postgresql import insert as dialect_insert
+    elif dialect_name == "sqlite":
+        from sqlalchemy.dialects.sqlite import insert as dialect_insert
+    else:
+        return None
+    return dialect_insert(model)
+
+
+def _add_chat_counts(db: Session, counts: Counter):
+    """Add {(day, intent): turns} to the daily intent counts (one upsert)"""
+    if not counts:
+        return
+    values = [{"day": day, "intent": intent, "turn_count": count} for (day, intent), count in counts.items()]
+    stmt = _upsert_statement(db.get_bind().dialect.name)
+    if stmt is not None:
+        table = ChatIntentDailyStats.__table__
+        stmt = stmt.values(values)
+        stmt = stmt.on_conflict_do_update(
+            index_elements=[table.c.day, table.c.intent],
+            set_={"turn_count": table.c.turn_count + stmt.excluded.turn_count}
+        )
+        db.execute(stmt)
+    else:
+        for row in values:
+            stats = db.get(ChatIntentDailyStats, (row["day"], row["intent"]))
+            if stats is None:
+                db.add(ChatIntentDailyStats(**row))
+            else:
+                stats.turn_count += row["turn_count"]
+
+
+def refresh_chat_rollups(db: Session, cutoff: datetime) -> int:
+    """Add chat turns inserted since the watermark to the daily intent counts; returns turns processed.
+
+    Transcript rows never change, so their counts are simply added (one upsert). The
+    watermark follows the database-stamped inserted_at: write-behind rows can be inserted
+    well after their created_at, which a created_at watermark would already have passed.
+    Turns still count towards their created_at day.
+    """
+    watermark = _lock_watermark(db, CHAT_ROLLUP)
+    turns = db.query(ChatSession.created_at, ChatSession.intent).filter(ChatSession.inserted_at <= cutoff)
+    if watermark.processed_until is not None:
+        turns = turns.filter(ChatSession.inserted_at > watermark.processed_until)
+    
+    counts: Counter = Counter()
+    for created_at, intent in turns.yield_per(1000):
+        counts[(created_at.date(), intent or "unknown")] += 1
+    _add_chat_counts(db, counts)
+    
+    watermark.processed_until = cutoff
+    return sum(counts.values())
+
+
+def count_archived_chat_turns(db: Session) -> int:
+    """Add archived chat turns to the daily intent counts; returns turns counted.
+
+    Only for rebuilds: archiving deletes hot rows, so a rebuild from chat_sessions alone
+    would lose them, while incremental runs counted them before they were archived.
+    """
+    counts: Counter = Counter()
+    for turn in iter_archived_turns(db):
+        counts[(turn["created_at"].date(), turn["intent"] or "unknown")] += 1
+    _add_chat_counts(db, counts)
+    return sum(counts.values())
+
+
+def refresh_rollups(rebuild: bool = False) -> dict:
+    """Bring all rollups up to now - ANALYTICS_ROLLUP_LAG_SECONDS in one transaction.
+
+    The lag leaves time for in-flight transactions to commit rows stamped before the cutoff.
+    With rebuild, the aggregates and watermarks are cleared first and archived chat
+    turns are counted back in.
+    """
+    cutoff = datetime.utcnow() - timedelta(seconds=settings.ANALYTICS_ROLLUP_LAG_SECONDS)
+    db = SessionLocal()
+    try:
+        if rebuild:
+            for model in (RequestDailyStats, ReviewTimeHistogram, ChatIntentDailyStats, RollupWatermark):
+                db.query(model).delete(synchronize_session=False)
+        result = {
+            "request_days": refresh_request_rollups(db, cutoff),
+            "chat_turns": refresh_chat_rollups(db, cutoff),
+            "processed_until": cutoff,
+        }
+        if rebuild:
+            result["archived_chat_turns"] = count_archived_chat_turns(db)
+        db.commit()
+        metrics_service.increment("analytics_rollup_runs_total")
+        logger.info(f"Analytics rollups refreshed: {result}")
+        return result
+    except Exception:
+        db.rollback()
+        raise
+    finally:
+        db.close()
+
+
+async def rollup_loop(interval_seconds: float):
+    """Background task: refresh rollups every interval until cancelled"""
+    while True:
+        try:
+            await run_in_threadpool(refresh_rollups)
+        except Exception as e:
+            metrics_service.increment("analytics_rollup_errors_total")
+            logger.error(f"Analytics rollup refresh failed: {e}", exc_info=True)
+        await asyncio.sleep(interval_seconds)
+
+
+def analytics_summary(db: Session, date_from: date, date_to: date) -> dict:
+    """Dashboard stats for [date_from, date_to], read from the daily aggregates only"""
+    by_month: Dict[Tuple[str, str], int] = Counter()
+    approved: Counter = Counter()
+    rejected: Counter = Counter()
+    for row in db.query(RequestDailyStats).filter(RequestDailyStats.day >= date_from, RequestDailyStats.day <= date_to):
+        if row.created_count:
+            by_month[(row.day.strftime("%Y-%m"), row.request_type)] += row.created_count
+        approved[row.request_type] += row.approved_count
+        rejected[row.request_type] += row.rejected_count
+    
+    histograms: Dict[str, Counter] = defaultdict(Counter)
+    for request_type, bucket, count in db.query(
+        ReviewTimeHistogram.request_type, ReviewTimeHistogram.bucket, func.sum(ReviewTimeHistogram.review_count)
+    ).filter(
+        ReviewTimeHistogram.day >= date_from, ReviewTimeHistogram.day <= date_to
+    ).group_by(ReviewTimeHistogram.request_type, ReviewTimeHistogram.bucket):
+        histograms[request_type][bucket] += int(count)
+        histograms["all"][bucket] += int(count)
+    
+    intents = dict(db.query(ChatIntentDailyStats.intent, func.sum(ChatIntentDailyStats.turn_count)).filter(
+        ChatIntentDailyStats.day >= date_from, ChatIntentDailyStats.day <= date_to
+    ).group_by(ChatIntentDailyStats.intent).all())
+    total_turns = sum(intents.values())
+    
+    def approval_rate(approved_count: int, rejected_count: int) -> Optional[float]:
+        reviewed = approved_count + rejected_count
+        return round(approved_count / reviewed, 4) if reviewed else None
+    
+    def median_hours(buckets: Counter) -> Optional[float]:
+        median = histogram_median(buckets)
+        return round(median / 3600, 2) if median is not None else None
+    
+    request_types = sorted(set(approved) | set(rejected) | set(histograms) - {"all"})
+    watermark = db.get(RollupWatermark, REQUESTS_ROLLUP)
+    return {
+        "date_from": date_from,
+        "date_to": date_to,
+        "as_of": watermark.processed_until if watermark else None,
+        "requests_by_month": [
+            {"month": month, "request_type": request_type, "created": count}
+            for (month, request_type), count in sorted(by_month.items())
+        ],
+        "approval_rate": approval_rate(sum(approved.values()), sum(rejected.values())),
+        "median_review_hours": median_hours(histograms["all"]),
+        "by_type": [
+            {
+                "request_type": request_type,
+                "approved": approved[request_type],
+                "rejected": rejected[request_type],
+                "approval_rate": approval_rate(approved[request_type], rejected[request_type]),
+                "median_review_hours": median_hours(histograms[request_type]),
+            }
+            for request_type in request_types
+        ],
+        "chat_intents": [
+            {"intent": intent, "turns": int(turns), "share": round(int(turns) / total_turns, 4)}
+            for intent, turns in sorted(intents.items(), key=lambda item: -item[1])
+        ],
+    }
@@ -0,0 +1,188 @@
+import logging
+from collections import defaultdict
+from datetime import date
+from typing import Dict, Iterable, List, Optional, Tuple
+from sqlalchemy import case, extract, func, insert
+from sqlalchemy.orm import Session
+from app.config import settings
+from app.models.hr_request import HRRequest
+from app.models.leave_balance import LeaveBalance
+
+logger = logging.getLogger(__name__)
+
+BalanceKey = Tuple[int, str, int]  # (user_id, leave_type, year)
+
+
+class InsufficientBalanceError(Exception):
+    """A leave request needs more days than the user has left for that type and year"""
+
+    def __init__(self, leave_type: str, year: int, requested: int, available: int):
+        self.leave_type = leave_type
+        self.year = year
+        self.requested = requested
+        self.available = available
+        super().__init__(f"{requested} {leave_type} day(s) requested for {year}, {available} available")
+
+
+def _contribution(status: Optional[str], days: int) -> Tuple[int, int]:
+    """(used, pending) days a request in `status` holds"""
+    if status == "approved":
+        return days, 0
+    if status == "pending":
+        return 0, days
+    return 0, 0
+
+
+def status_change_deltas(changes: Iterable[tuple]) -> Dict[BalanceKey, List[int]]:
+    """Fold (user_id, leave_type, start_date, duration_days, old_status, new_status) changes into
+    per-balance [used, pending] deltas; old_status None means a newly created request."""
+    deltas: Dict[BalanceKey, List[int]] = defaultdict(lambda: [0, 0])
+    for user_id, leave_type, start_date, days, old_status, new_status in changes:
+        old_used, old_pending = _contribution(old_status, days)
+        new_used, new_pending = _contribution(new_status, days)
+        delta = deltas[(user_id, leave_type, start_date.year)]
+        delta[0] += new_used - old_used
+        delta[1] += new_pending - old_pending
+    return {key: delta for key, delta in deltas.items() if delta != [0, 0]}
+
+
+def _upsert_statement(dialect_name: str):
+    """INSERT ... ON CONFLICT for dialects that support it, else None"""
+    if dialect_name == "postgresql":
+        from sqlalchemy.dialects.postgresql import insert
+    elif dialect_name == "sqlite":
+        from sqlalchemy.dialects.sqlite import insert
+    else:
+        return None
+    return insert(LeaveBalance)
+
+
+def apply_deltas(db: Session, deltas: Dict[BalanceKey, List[int]]):
+    """Add [used, pending] deltas to balance rows in one statement (the caller commits)"""
+    if not deltas:
+        return
+    entitlements = settings.leave_entitlements
+    values = [
+        {
+            "user_id": user_id,
+            "leave_type": leave_type,
+            "year": year,
+            "entitled_days": entitlements.get(leave_type, 0),
+            "used_days": used,
+            "pending_days": pending,
+        }
+        for (user_id, leave_type, year), (used, pending) in deltas.items()
+    ]
+    
+    stmt = _upsert_statement(db.get_bind().dialect.name)
+    if stmt is not None:
+        table = LeaveBalance.__table__
+        stmt = stmt.values(values)
+        stmt = stmt.on_conflict_do_update(
+            index_elements=[table.c.user_id, table.c.leave_type, table.c.year],
+            set_={
+                "used_days": table.c.used_days + stmt.excluded.used_days,
+                "pending_days": table.c.pending_days + stmt.excluded.pending_days,
+                "updated_at": func.now(),
+            }
+        )
+        db.execute(stmt)
+        return
+    
+    # Portable fallback: read-modify-write per balance
+    for row in values:
+        balance = db.get(LeaveBalance, (row["user_id"], row["leave_type"], row["year"]))
+        if balance is None:
+            db.add(LeaveBalance(**row))
+        else:
+            balance.used_days += row["used_days"]
+            balance.pending_days += row["pending_days"]
+
+
+def record_status_changes(db: Session, changes: Iterable[tuple]):
+    """Apply request creations/status changes to balances (see status_change_deltas; the caller commits)"""
+    apply_deltas(db, status_change_deltas(changes))
+
+
+def get_balances(db: Session, user_id: int, year: int) -> List[dict]:
+    """The user's balances for a year (one primary-key range read), including untouched entitlements"""
+    entitlements = settings.leave_entitlements
+    rows = {b.leave_type: b for b in db.query(LeaveBalance).filter(LeaveBalance.user_id == user_id, LeaveBalance.year == year)}
+    balances = []
+    for leave_type in sorted(set(entitlements) | set(rows)):
+        balance = rows.get(leave_type)
+        entitled = balance.entitled_days if balance else entitlements.get(leave_type, 0)
+        used = balance.used_days if balance else 0
+        pending = balance.pending_days if balance else 0
+        balances.append({
+            "leave_type": leave_type,
+            "year": year,
+            "entitled_days": entitled,
+            "used_days": used,
+            "pending_days": pending,
+            "available_days": entitled - used - pending,
+        })
+    return balances
+
+
+def available_days(db: Session, user_id: int, leave_type: str, year: int) -> int:
+    balance = db.get(LeaveBalance, (user_id, leave_type, year))
+    if balance is None:
+        return settings.leave_entitlements.get(leave_type, 0)
+    return balance.entitled_days - balance.used_days - balance.pending_days
+
+
+def check_available(db: Session, user_id: int, leave_type: str, start_date: date, duration_days: int):
+    """Raise InsufficientBalanceError if the request doesn't fit (types without an entitlement are unlimited)"""
+    if leave_type not in settings.leave_entitlements:
+        return
+    available = available_days(db, user_id, leave_type, start_date.year)
+    if duration_days > available:
+        raise InsufficientBalanceError(leave_type, start_date.year, duration_days, available)
+
+
+def describe_balances(balances: List[dict]) -> str:
+    return "\n".join(
+        f"- {b['leave_type'].title()}: {b['available_days']} of {b['entitled_days']} day(s) left"
+        f" ({b['used_days']} used, {b['pending_days']} pending approval)"
+        for b in balances
+    )
+
+
+def reconcile_balances(db: Session, year: Optional[int] = None) -> int:
+    """Rebuild balances from request history in bulk (one aggregate query; the caller commits).
+
+    Entitlements are reset from LEAVE_ENTITLEMENTS. Returns the number of balance rows written.
+    """
+    request_year = extract("year", HRRequest.start_date)
+    query = db.query(
+        HRRequest.user_id,
+        HRRequest.request_type,
+        request_year.label("year"),
+        func.sum(case((HRRequest.status == "approved", HRRequest.duration_days), else_=0)).label("used_days"),
+        func.sum(case((HRRequest.status == "pending", HRRequest.duration_days), else_=0)).label("pending_days"),
+    ).group_by(HRRequest.user_id, HRRequest.request_type, request_year)
+    if year is not None:
+        query = query.filter(request_year == year)
+    
+    entitlements = settings.leave_entitlements
+    rows = [
+        {
+            "user_id": row.user_id,
+            "leave_type": row.request_type,
+            "year": int(row.year),
+            "entitled_days": entitlements.get(row.request_type, 0),
+            "used_days": int(row.used_days or 0),
+            "pending_days": int(row.pending_days or 0),
+        }
+        for row in query
+    ]
+    
+    stale = db.query(LeaveBalance)
+    if year is not None:
+        stale = stale.filter(LeaveBalance.year == year)
+    stale.delete(synchronize_session=False)
+    if rows:
+        db.execute(insert(LeaveBalance), rows)
+    logger.info(f"Reconciled {len(rows)} leave balance rows" + (f" for {year}" if year else ""))
+    return len(rows)
@@ -0,0 +1,191 @@
+import asyncio
+import json
+import logging
+import zlib
+from datetime import datetime, timedelta, timezone
+from typing import Iterator, List, Optional, Tuple
+from fastapi.concurrency import run_in_threadpool
+from sqlalchemy import exists, tuple_
+from sqlalchemy.orm import Session
+from app.config import settings
+from app.database import SessionLocal
+from app.models.chat_session import ChatSession
+from app.models.chat_session_archive import ChatSessionArchive
+from app.models.chat_session_summary import ChatSessionSummary
+from app.services import metrics_service
+
+logger = logging.getLogger(__name__)
+
+# Hot/cold split for transcripts: sessions idle for CHAT_ARCHIVE_AFTER_DAYS move out of
+# chat_sessions into one compressed chat_session_archives row each. Summaries stay in
+# place, so the sessions list and history ETags are unaffected.
+
+COMPRESSION_LEVEL = 6
+
+TRANSCRIPT_COLUMNS = (
+    ChatSession.id,
+    ChatSession.message,
+    ChatSession.response,
+    ChatSession.intent,
+    ChatSession.conversation_data,
+    ChatSession.created_at,
+)
+
+
+def compress_turns(turns: List[dict]) -> bytes:
+    """zlib-compressed JSON; created_at is kept as ISO 8601 so keyset cursors round-trip"""
+    raw = json.dumps(turns, default=lambda value: value.isoformat(), separators=(",", ":"))
+    return zlib.compress(raw.encode("utf-8"), COMPRESSION_LEVEL)
+
+
+def decompress_turns(payload: bytes) -> List[dict]:
+    turns = json.loads(zlib.decompress(payload))
+    for turn in turns:
+        turn["created_at"] = datetime.fromisoformat(turn["created_at"])
+    return turns
+
+
+def archived_turns(db: Session, session_id: str, user_id: int) -> List[dict]:
+    """A session's archived turns, oldest first (empty if nothing is archived)"""
+    archive = db.get(ChatSessionArchive, (session_id, user_id))
+    return decompress_turns(archive.payload) if archive is not None else []
+
+
+def archived_state(db: Session, session_id: str, user_id: int) -> Optional[dict]:
+    """conversation_data of the last archived turn, for sessions resumed after archival"""
+    row = db.query(ChatSessionArchive.last_conversation_data).filter(
+        ChatSessionArchive.session_id == session_id,
+        ChatSessionArchive.user_id == user_id
+    ).first()
+    return row.last_conversation_data if row is not None else None
+
+
+def _utc_naive(value: datetime) -> datetime:
+    """Comparable form of aware (Postgres) and naive UTC (SQLite) timestamps"""
+    return value.astimezone(timezone.utc).replace(tzinfo=None) if value.tzinfo else value
+
+
+def iter_archived_turns(
+    db: Session,
+    user_id: Optional[int] = None,
+    session_id: Optional[str] = None,
+    created_from: Optional[datetime] = None,
+    created_to: Optional[datetime] = None,
+    batch_size: int = 100
+) -> Iterator[dict]:
+    """Archived turns (with session_id and user_id) in [created_from, created_to), archive by archive.
+
+    Archives are read batch_size at a time in first_created_at order and decompressed one
+    by one, so memory stays bounded; turns are oldest first within each session.
+    """
+    query = db.query(ChatSessionArchive.session_id, ChatSessionArchive.user_id, ChatSessionArchive.payload)
+    if user_id is not None:
+        query = query.filter(ChatSessionArchive.user_id == user_id)
+    if session_id:
+        query = query.filter(ChatSessionArchive.session_id == session_id)
+    if created_from:
+        query = query.filter(ChatSessionArchive.last_created_at >= created_from)
+    if created_to:
+        query = query.filter(ChatSessionArchive.first_created_at < created_to)
+    low = _utc_naive(created_from) if created_from else None
+    high = _utc_naive(created_to) if created_to else None
+    query = query.order_by(ChatSessionArchive.first_created_at, ChatSessionArchive.session_id)
+    for row in query.yield_per(batch_size):
+        for turn in decompress_turns(row.payload):
+            created_at = _utc_naive(turn["created_at"])
+            if (low is None or created_at >= low) and (high is None or created_at < high):
+                yield {"session_id": row.session_id, "user_id": row.user_id, **turn}
+
+
+def idle_sessions(db: Session, cutoff: datetime, limit: int) -> List[Tuple[str, int]]:
+    """Sessions idle since before cutoff that still have hot rows, locked against other archivers"""
+    has_hot_rows = exists().where(
+        ChatSession.session_id == ChatSessionSummary.session_id,
+        ChatSession.user_id == ChatSessionSummary.user_id
+    )
+    rows = db.query(ChatSessionSummary.session_id, ChatSessionSummary.user_id).filter(
+        ChatSessionSummary.last_activity_at < cutoff,
+        has_hot_rows
+    ).order_by(ChatSessionSummary.last_activity_at).limit(limit).with_for_update(skip_locked=True).all()
+    return [(row.session_id, row.user_id) for row in rows]
+
+
+def archive_sessions(db: Session, keys: List[Tuple[str, int]]) -> int:
+    """Move the hot rows of the given sessions into their archive rows (the caller commits).
+
+    A session resumed after an earlier archival has its new turns merged into the existing payload.
+    Returns the number of turns moved.
+    """
+    session_key = tuple_(ChatSession.session_id, ChatSession.user_id)
+    rows = db.query(ChatSession.session_id, ChatSession.user_id, *TRANSCRIPT_COLUMNS).filter(
+        session_key.in_(keys)
+    ).order_by(ChatSession.created_at, ChatSession.id).all()
+    if not rows:
+        return 0
+    
+    hot = {key: [] for key in keys}
+    for row in rows:
+        turn = dict(row._mapping)
+        hot[(turn.pop("session_id"), turn.pop("user_id"))].append(turn)
+    
+    existing = {
+        (archive.session_id, archive.user_id): archive
+        for archive in db.query(ChatSessionArchive).filter(
+            tuple_(ChatSessionArchive.session_id, ChatSessionArchive.user_id).in_(keys)
+        )
+    }
+    for (session_id, user_id), turns in hot.items():
+        if not turns:
+            continue
+        archive = existing.get((session_id, user_id))
+        if archive is not None:
+            turns = decompress_turns(archive.payload) + turns
+        else:
+            archive = ChatSessionArchive(session_id=session_id, user_id=user_id)
+            db.add(archive)
+        archive.turn_count = len(turns)
+        archive.first_created_at = turns[0]["created_at"]
+        archive.last_created_at = turns[-1]["created_at"]
+        archive.last_conversation_data = turns[-1]["conversation_data"]
+        archive.payload = compress_turns(turns)
+    
+    db.query(ChatSession).filter(ChatSession.id.in_([row.id for row in rows])).delete(synchronize_session=False)
+    return len(rows)
+
+
+def archive_idle_sessions(older_than_days: Optional[float] = None, batch_size: Optional[int] = None) -> dict:
+    """Retention job: archive every session idle longer than the threshold, one transaction per batch"""
+    days = settings.CHAT_ARCHIVE_AFTER_DAYS if older_than_days is None else older_than_days
+    batch_size = batch_size or settings.CHAT_ARCHIVE_BATCH_SIZE
+    cutoff = datetime.now(timezone.utc) - timedelta(days=days)
+    sessions = turns = 0
+    db = SessionLocal()
+    try:
+        while True:
+            keys = idle_sessions(db, cutoff, batch_size)
+            if not keys:
+                break
+            turns += archive_sessions(db, keys)
+            db.commit()
+            sessions += len(keys)
+    except Exception:
+        db.rollback()
+        raise
+    finally:
+        db.close()
+    metrics_service.increment("chat_archived_sessions_total", sessions)
+    metrics_service.increment("chat_archived_turns_total", turns)
+    result = {"sessions": sessions, "turns": turns, "cutoff": cutoff}
+    logger.info(f"Chat archival finished: {result}")
+    return result
+
+
+async def archive_loop(interval_seconds: float):
+    """Background task: run the retention job every interval until cancelled"""
+    while True:
+        try:
+            await run_in_threadpool(archive_idle_sessions)
+        except Exception as e:
+            metrics_service.increment("chat_archive_errors_total")
+            logger.error(f"Chat archival failed: {e}", exc_info=True)
+        await asyncio.sleep(interval_seconds)
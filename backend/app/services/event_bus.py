@@ -0,0 +1,151 @@
+import asyncio
+import json
+import logging
+import select
+import threading
+from typing import Dict, Optional
+from sqlalchemy import text
+from sqlalchemy.engine import make_url
+from app.config import settings
+from app.services import metrics_service
+
+logger = logging.getLogger(__name__)
+
+RESYNC = {"type": "resync"}
+
+
+class EventBus:
+    """In-process pub/sub fanning events out to asyncio subscriber queues.
+
+    publish() is thread-safe, so it can be called from sync endpoints and graph
+    nodes running in the threadpool. With a Postgres bridge attached, publish()
+    goes through NOTIFY and every worker (this one included) delivers the event
+    when its LISTEN connection receives it.
+    """
+
+    def __init__(self, max_pending: int = 100):
+        self.max_pending = max_pending
+        self._subscribers: Dict[asyncio.Queue, asyncio.AbstractEventLoop] = {}
+        self._lock = threading.Lock()
+        self.bridge: Optional["PostgresNotifyBridge"] = None
+
+    def subscribe(self) -> asyncio.Queue:
+        """Register a queue on the running event loop"""
+        queue = asyncio.Queue(maxsize=self.max_pending)
+        with self._lock:
+            self._subscribers[queue] = asyncio.get_running_loop()
+        return queue
+
+    def unsubscribe(self, queue: asyncio.Queue):
+        with self._lock:
+            self._subscribers.pop(queue, None)
+
+    @property
+    def subscriber_count(self) -> int:
+        return len(self._subscribers)
+
+    def publish(self, event: dict):
+        if self.bridge is not None and self.bridge.notify(event):
+            return
+        self.deliver(event)
+
+    def deliver(self, event: dict):
+        """Hand an event to every local subscriber"""
+        with self._lock:
+            subscribers = list(self._subscribers.items())
+        for queue, loop in subscribers:
+            try:
+                loop.call_soon_threadsafe(self._offer, queue, event)
+            except RuntimeError:
+                # Loop already closed; the subscriber is gone
+                self.unsubscribe(queue)
+
+    @staticmethod
+    def _offer(queue: asyncio.Queue, event: dict):
+        try:
+            queue.put_nowait(event)
+        except asyncio.QueueFull:
+            # Slow consumer: drop its backlog and tell it to refetch instead
+            metrics_service.increment("event_bus_overflow_total")
+            while not queue.empty():
+                queue.get_nowait()
+            queue.put_nowait(RESYNC)
+
+
+class PostgresNotifyBridge:
+    """Relays events between workers over Postgres LISTEN/NOTIFY"""
+
+    def __init__(self, bus: EventBus, database_url: str, channel: str):
+        self.bus = bus
+        self.channel = channel
+        # psycopg2 accepts libpq URIs, so drop any SQLAlchemy driver suffix
+        self.dsn = make_url(database_url).set(drivername="postgresql").render_as_string(hide_password=False)
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def start(self):
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._listen_forever, name="event-bus-listener", daemon=True)
+        self._thread.start()
+        logger.info(f"Event bus bridged over Postgres channel '{self.channel}'")
+
+    def stop(self):
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(5)
+            self._thread = None
+
+    def notify(self, event: dict) -> bool:
+        """NOTIFY the channel; False if it failed and the caller should deliver locally"""
+        from app.database import engine
+        try:
+            with engine.connect() as conn:
+                conn.execute(text("SELECT pg_notify(:channel, :payload)"), {
+                    "channel": self.channel,
+                    "payload": json.dumps(event)
+                })
+                conn.commit()
+            return True
+        except Exception as e:
+            logger.warning(f"pg_notify failed, delivering locally only: {e}")
+            return False
+
+    def _listen_forever(self):
+        import psycopg2
+        import psycopg2.extensions
+        while not self._stop.is_set():
+            try:
+                conn = psycopg2.connect(self.dsn)
+                conn.set_isolation_level(psycopg2.extensions.ISOLATION_LEVEL_AUTOCOMMIT)
+                with conn.cursor() as cursor:
+                    cursor.execute(f'LISTEN "{self.channel}"')
+                # Anything missed while (re)connecting is recovered by a client resync
+                self.bus.deliver(RESYNC)
+                while not self._stop.is_set():
+                    if select.select([conn], [], [], 1.0)[0]:
+                        conn.poll()
+                        while conn.notifies:
+                            notification = conn.notifies.pop(0)
+                            self.bus.deliver(json.loads(notification.payload))
+                conn.close()
+            except Exception as e:
+                logger.error(f"Event bus listener error, reconnecting: {e}")
+                self._stop.wait(5)
+
+
+event_bus = EventBus(max_pending=settings.EVENT_BUS_MAX_PENDING)
+
+
+def start_bridge():
+    """Attach the Postgres bridge when EVENT_BUS_BACKEND=postgres"""
+    if settings.EVENT_BUS_BACKEND != "postgres" or event_bus.bridge is not None:
+        return
+    bridge = PostgresNotifyBridge(event_bus, settings.DATABASE_URL, settings.EVENT_BUS_CHANNEL)
+    bridge.start()
+    event_bus.bridge = bridge
+
+
+def stop_bridge():
+    if event_bus.bridge is not None:
+        event_bus.bridge.stop()
+        event_bus.bridge = None
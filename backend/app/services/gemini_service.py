@@ -1,17 +1,88 @@
-import google.generativeai as genai
+import importlib
+import logging
+import threading
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Callable, Optional
 from app.config import settings
+from app.services import metrics_service
 
-# Configure API key
-# Note: google.generativeai is deprecated but still functional
-# TODO: Migrate to google.genai when stable
-genai.configure(api_key=settings.GEMINI_API_KEY)
+logger = logging.getLogger(__name__)
+
+TIERS = ("fast", "strong")
+
+_genai = None
+_genai_lock = threading.Lock()
+
+
+def get_genai():
+    """google.generativeai, imported and configured on first use (the import alone takes most of a second)"""
+    global _genai
+    if _genai is None:
+        with _genai_lock:
+            if _genai is None:
+                # Note: google.generativeai is deprecated but still functional
+                # TODO: Migrate to google.genai when stable
+                import google.generativeai as genai
+                genai.configure(api_key=settings.GEMINI_API_KEY)
+                _genai = genai
+    return _genai
+
+
+class GeminiProvider:
+    """Google Gemini through google.generativeai"""
+
+    name = "gemini"
+
+    def __init__(self):
+        get_genai()
+
+    def model(self, model_name: str):
+        return get_genai().GenerativeModel(model_name)
+
+    def embed(self, text: str) -> list:
+        result = get_genai().embed_content(
+            model=settings.GEMINI_EMBEDDING_MODEL,
+            content=text,
+            task_type="retrieval_document"
+        )
+        return result['embedding']
+
+
+# LLM_PROVIDER -> provider factory. A provider has model(name) returning an object with
+# generate_content(prompt, request_options=None) -> response with .text, and embed(text) -> list
+PROVIDERS = {
+    "gemini": GeminiProvider,
+    "stub": lambda: importlib.import_module("app.services.stub_llm").StubProvider(),
+}
+
+_provider = None
+_provider_lock = threading.Lock()
+
+
+def get_provider():
+    """The configured LLM provider, created on first use"""
+    global _provider
+    if _provider is None:
+        with _provider_lock:
+            if _provider is None:
+                factory = PROVIDERS.get(settings.LLM_PROVIDER)
+                if factory is None:
+                    raise ValueError(f"Unknown LLM_PROVIDER '{settings.LLM_PROVIDER}' (expected one of {sorted(PROVIDERS)})")
+                _provider = factory()
+    return _provider
+
+
+def is_initialized() -> bool:
+    return _provider is not None
 
 
 def get_gemini_model(model_name: str = None):
-    """Get a Gemini model instance"""
+    """Get a model instance from the configured provider"""
     if model_name is None:
         model_name = settings.GEMINI_MODEL
-    return genai.GenerativeModel(model_name)
+    return get_provider().model(model_name)
 
 
 def get_embedding_model():
@@ -28,17 +99,126 @@ def generate_text(prompt: str, model_name: str = None) -> str:
     return response.text
 
 
+def model_for_tier(tier: str) -> str:
+    """Model name configured for a tier ('fast' or 'strong')"""
+    if tier == "fast":
+        return settings.GEMINI_FAST_MODEL or settings.GEMINI_MODEL
+    return settings.GEMINI_STRONG_MODEL or settings.GEMINI_MODEL
+
+
+def tier_for_node(node: str) -> str:
+    """Tier configured for a graph node in NODE_MODEL_TIERS (defaults to 'strong')"""
+    for entry in settings.NODE_MODEL_TIERS.split(","):
+        name, _, tier = entry.partition("=")
+        if name.strip() == node and tier.strip() in TIERS:
+            return tier.strip()
+    return "strong"
+
+
+def strip_code_fences(text: str) -> str:
+    """Remove markdown code blocks around a model response"""
+    text = text.strip()
+    if "```json" in text:
+        text = text.split("```json")[1].split("```")[0].strip()
+    elif "```" in text:
+        text = text.split("```")[1].split("```")[0].strip()
+    return text
+
+
+def _request_options(deadline: Optional[float]) -> dict:
+    if deadline is None:
+        return {}
+    return {"timeout": max(0.0, deadline - time.monotonic())}
+
+
+# Per-node token counts of the LLM calls made inside track_usage() (transcript replays)
+_usage: ContextVar[Optional[dict]] = ContextVar("llm_usage", default=None)
+
+
+@contextmanager
+def track_usage():
+    """Collect {node: {"calls", "prompt_tokens", "output_tokens"}} for LLM calls made in this context"""
+    usage = {}
+    token = _usage.set(usage)
+    try:
+        yield usage
+    finally:
+        _usage.reset(token)
+
+
+def _record_usage(node: str, response):
+    metadata = getattr(response, "usage_metadata", None)
+    prompt_tokens = getattr(metadata, "prompt_token_count", 0) or 0
+    output_tokens = getattr(metadata, "candidates_token_count", 0) or 0
+    metrics_service.increment("llm_tokens_total", prompt_tokens, node=node, kind="prompt")
+    metrics_service.increment("llm_tokens_total", output_tokens, node=node, kind="output")
+    usage = _usage.get()
+    if usage is not None:
+        entry = usage.setdefault(node, {"calls": 0, "prompt_tokens": 0, "output_tokens": 0})
+        entry["calls"] += 1
+        entry["prompt_tokens"] += prompt_tokens
+        entry["output_tokens"] += output_tokens
+
+
+def _generate_on_tier(node: str, tier: str, prompt: str, deadline: Optional[float]) -> str:
+    model_name = model_for_tier(tier)
+    started = time.monotonic()
+    try:
+        response = get_gemini_model(model_name).generate_content(prompt, request_options=_request_options(deadline))
+        _record_usage(node, response)
+        return response.text
+    except Exception:
+        metrics_service.increment("llm_errors_total", node=node, tier=tier)
+        raise
+    finally:
+        metrics_service.increment("llm_calls_total", node=node, tier=tier)
+        metrics_service.observe("llm_latency_seconds", time.monotonic() - started, tier=tier)
+
+
+def generate_for_node(
+    node: str,
+    prompt: str,
+    is_valid: Optional[Callable[[str], bool]] = None,
+    deadline: Optional[float] = None
+) -> str:
+    """Generate text with the node's model tier, escalating to the strong tier on unusable fast-tier output"""
+    tier = tier_for_node(node)
+    text = _generate_on_tier(node, tier, prompt, deadline)
+
+    can_escalate = tier == "fast" and model_for_tier("fast") != model_for_tier("strong")
+    if can_escalate and is_valid is not None and not is_valid(text):
+        if deadline is not None and deadline <= time.monotonic():
+            logger.warning(f"   Fast tier output unusable for {node}, no time left to escalate")
+            return text
+        logger.info(f"   ↑ Escalating {node} to strong tier ({model_for_tier('strong')})")
+        metrics_service.increment("llm_escalations_total", node=node)
+        text = _generate_on_tier(node, "strong", prompt, deadline)
+    return text
+
+
+def tier_report() -> dict:
+    """Per-tier latency summary and per-node escalation rate from the metrics registry"""
+    summaries = metrics_service.snapshot()["summaries"]
+    report = {"tiers": {}, "escalation_rate": {}}
+    for tier in TIERS:
+        report["tiers"][tier] = {
+            "model": model_for_tier(tier),
+            "latency_seconds": summaries.get(f"llm_latency_seconds{{tier={tier}}}", metrics_service.summarize([]))
+        }
+    for entry in settings.NODE_MODEL_TIERS.split(","):
+        node = entry.partition("=")[0].strip()
+        fast_calls = metrics_service.get_counter("llm_calls_total", node=node, tier="fast")
+        if node and fast_calls:
+            escalations = metrics_service.get_counter("llm_escalations_total", node=node)
+            report["escalation_rate"][node] = escalations / fast_calls
+    return report
+
+
 def generate_embedding(text: str) -> list:
-    """Generate embedding for text using Gemini"""
+    """Generate embedding for text with the configured provider"""
     try:
-        result = genai.embed_content(
-            model=settings.GEMINI_EMBEDDING_MODEL,
-            content=text,
-            task_type="retrieval_document"
-        )
-        return result['embedding']
+        return get_provider().embed(text)
     except Exception as e:
         print(f"Error generating embedding: {e}")
         # Return empty list - dimension will be detected from first successful embedding
         return []
-
@@ -0,0 +1,173 @@
+import logging
+from collections import defaultdict
+from dataclasses import dataclass
+from datetime import date, timedelta
+from itertools import accumulate
+from typing import Dict, List, Optional, Tuple
+from sqlalchemy import text
+from sqlalchemy.orm import Session
+from app.models.hr_request import HRRequest
+from app.models.user import User
+
+logger = logging.getLogger(__name__)
+
+# Requests that hold their dates; rejected ones free them up
+ACTIVE_STATUSES = ("pending", "approved")
+
+# Name of the Postgres exclusion constraint backing the check (see migration 8a2d4f6c1b93)
+OVERLAP_CONSTRAINT = "ex_hr_requests_no_overlap"
+
+
+@dataclass(frozen=True)
+class ConflictingRequest:
+    """An overlapping request as plain values, still readable after a rollback or close"""
+    id: int
+    request_type: str
+    start_date: date
+    end_date: date
+    status: str
+
+
+class LeaveConflictError(Exception):
+    """A leave request overlaps the user's existing pending/approved leave"""
+
+    def __init__(self, conflicts: List[ConflictingRequest]):
+        self.conflicts = conflicts
+        super().__init__(f"Overlaps {len(conflicts)} existing request(s): {[c.id for c in conflicts]}")
+
+
+def find_conflicting_requests(
+    db: Session,
+    user_id: int,
+    start_date: date,
+    end_date: date,
+    exclude_id: Optional[int] = None
+) -> List[ConflictingRequest]:
+    """The user's active requests overlapping [start_date, end_date] (inclusive).
+
+    Served by ix_hr_requests_user_id_start_date (and the GiST exclusion index on Postgres),
+    so the cost depends on the user's own requests, not the table size.
+    """
+    query = db.query(
+        HRRequest.id, HRRequest.request_type, HRRequest.start_date, HRRequest.end_date, HRRequest.status
+    ).filter(
+        HRRequest.user_id == user_id,
+        HRRequest.status.in_(ACTIVE_STATUSES),
+        HRRequest.start_date <= end_date,
+        HRRequest.end_date >= start_date
+    )
+    if exclude_id is not None:
+        query = query.filter(HRRequest.id != exclude_id)
+    return [ConflictingRequest(*row) for row in query.order_by(HRRequest.start_date)]
+
+
+def lock_user_for_leave(db: Session, user_id: int):
+    """Serialize leave submissions per user (SELECT ... FOR UPDATE on the user row) until commit"""
+    db.query(User.id).filter(User.id == user_id).with_for_update().first()
+
+
+def is_overlap_violation(error: Exception) -> bool:
+    """Whether an IntegrityError came from the overlap exclusion constraint"""
+    return OVERLAP_CONSTRAINT in str(getattr(error, "orig", error))
+
+
+def describe_conflicts(conflicts: List[ConflictingRequest]) -> str:
+    return "\n".join(
+        f"- {c.request_type.title()} leave {c.start_date} to {c.end_date} ({c.status})"
+        for c in conflicts
+    )
+
+
+def _daily_counts_postgres(db: Session, date_from: date, date_to: date, statuses) -> Dict[Tuple[str, str], List[int]]:
+    """Per-(type, status) day counts: each overlapping request expanded with generate_series, clipped to the window"""
+    rows = db.execute(text("""
+        SELECT (gs.day)::date AS day, r.request_type, r.status, count(*) AS n
+        FROM hr_requests r
+        CROSS JOIN LATERAL generate_series(
+            GREATEST(r.start_date, :date_from), LEAST(r.end_date, :date_to), interval '1 day'
+        ) AS gs(day)
+        WHERE r.end_date >= :date_from AND r.start_date <= :date_to AND r.status = ANY(:statuses)
+        GROUP BY 1, 2, 3
+    """), {"date_from": date_from, "date_to": date_to, "statuses": list(statuses)})
+    num_days = (date_to - date_from).days + 1
+    counts: Dict[Tuple[str, str], List[int]] = defaultdict(lambda: [0] * num_days)
+    for day, request_type, status, n in rows:
+        counts[(request_type, status)][(day - date_from).days] = n
+    return counts
+
+
+def _daily_counts_portable(db: Session, date_from: date, date_to: date, statuses) -> Dict[Tuple[str, str], List[int]]:
+    """Same counts via a difference array over the overlapping ranges (O(requests + days))"""
+    num_days = (date_to - date_from).days + 1
+    diffs: Dict[Tuple[str, str], List[int]] = defaultdict(lambda: [0] * (num_days + 1))
+    rows = db.query(HRRequest.start_date, HRRequest.end_date, HRRequest.request_type, HRRequest.status).filter(
+        HRRequest.end_date >= date_from,
+        HRRequest.start_date <= date_to,
+        HRRequest.status.in_(statuses)
+    )
+    for start, end, request_type, status in rows:
+        diff = diffs[(request_type, status)]
+        diff[max((start - date_from).days, 0)] += 1
+        diff[min((end - date_from).days, num_days - 1) + 1] -= 1
+    return {key: list(accumulate(diff[:num_days])) for key, diff in diffs.items()}
+
+
+def leave_calendar(
+    db: Session,
+    date_from: date,
+    date_to: date,
+    statuses=ACTIVE_STATUSES,
+    include_people: bool = True
+) -> dict:
+    """Per-day counts of people on leave in [date_from, date_to], by request_type and status.
+
+    With include_people, each day also lists its request ids and `requests` maps those ids
+    to who is off.
+    """
+    if db.get_bind().dialect.name == "postgresql":
+        counts = _daily_counts_postgres(db, date_from, date_to, statuses)
+    else:
+        counts = _daily_counts_portable(db, date_from, date_to, statuses)
+    
+    num_days = (date_to - date_from).days + 1
+    days = []
+    for i in range(num_days):
+        by_type: Dict[str, int] = defaultdict(int)
+        by_status: Dict[str, int] = defaultdict(int)
+        for (request_type, status), series in counts.items():
+            if series[i]:
+                by_type[request_type] += series[i]
+                by_status[status] += series[i]
+        days.append({
+            "date": date_from + timedelta(days=i),
+            "total": sum(by_type.values()),
+            "by_type": dict(by_type),
+            "by_status": dict(by_status),
+        })
+    
+    calendar = {"date_from": date_from, "date_to": date_to, "days": days}
+    if not include_people:
+        return calendar
+    
+    rows = db.query(
+        HRRequest.id,
+        HRRequest.user_id,
+        User.full_name.label("user_name"),
+        HRRequest.request_type,
+        HRRequest.status,
+        HRRequest.start_date,
+        HRRequest.end_date
+    ).join(User, HRRequest.user_id == User.id).filter(
+        HRRequest.end_date >= date_from,
+        HRRequest.start_date <= date_to,
+        HRRequest.status.in_(statuses)
+    ).all()
+    for day in days:
+        day["request_ids"] = []
+    for row in rows:
+        first = max((row.start_date - date_from).days, 0)
+        last = min((row.end_date - date_from).days, num_days - 1)
+        for i in range(first, last + 1):
+            days[i]["request_ids"].append(row.id)
+    calendar["requests"] = [dict(row._mapping) for row in rows]
+    return calendar
@@ -0,0 +1,69 @@
+import threading
+from collections import defaultdict, deque
+from typing import Dict, Deque
+
+# In-process metrics registry (per worker process)
+_lock = threading.Lock()
+_counters: Dict[str, float] = defaultdict(float)
+_samples: Dict[str, Deque[float]] = defaultdict(lambda: deque(maxlen=2048))
+
+
+def _key(name: str, labels: dict) -> str:
+    if not labels:
+        return name
+    label_str = ",".join(f"{k}={v}" for k, v in sorted(labels.items()))
+    return f"{name}{{{label_str}}}"
+
+
+def increment(name: str, amount: float = 1, **labels):
+    """Increment a counter"""
+    with _lock:
+        _counters[_key(name, labels)] += amount
+
+
+def observe(name: str, value: float, **labels):
+    """Record a sample (e.g. a latency in seconds) for a summary metric"""
+    with _lock:
+        _samples[_key(name, labels)].append(value)
+
+
+def get_counter(name: str, **labels) -> float:
+    with _lock:
+        return _counters.get(_key(name, labels), 0)
+
+
+def _percentile(sorted_values: list, pct: float) -> float:
+    if not sorted_values:
+        return 0.0
+    index = min(len(sorted_values) - 1, int(round(pct / 100 * (len(sorted_values) - 1))))
+    return sorted_values[index]
+
+
+def summarize(values) -> dict:
+    """Count, mean and p50/p95/p99 of a list of samples"""
+    ordered = sorted(values)
+    return {
+        "count": len(ordered),
+        "mean": sum(ordered) / len(ordered) if ordered else 0.0,
+        "p50": _percentile(ordered, 50),
+        "p95": _percentile(ordered, 95),
+        "p99": _percentile(ordered, 99),
+    }
+
+
+def snapshot() -> dict:
+    """Return all counters and summaries of recent samples"""
+    with _lock:
+        counters = dict(_counters)
+        samples = {key: list(values) for key, values in _samples.items()}
+    return {
+        "counters": counters,
+        "summaries": {key: summarize(values) for key, values in samples.items()},
+    }
+
+
+def reset():
+    """Clear all metrics"""
+    with _lock:
+        _counters.clear()
+        _samples.clear()
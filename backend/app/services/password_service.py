@@ -0,0 +1,47 @@
+import asyncio
+import logging
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from typing import List, Optional
+import bcrypt
+from app.config import settings
+
+logger = logging.getLogger(__name__)
+
+# bcrypt releases the GIL, so a small thread pool keeps hashing off the event loop
+# while bounding how many CPU-heavy checks run at once during a login storm
+_executor = ThreadPoolExecutor(max_workers=settings.PASSWORD_HASH_WORKERS, thread_name_prefix="bcrypt")
+
+
+def hash_password(password: str, rounds: Optional[int] = None) -> str:
+    """Hash a password using bcrypt"""
+    salt = bcrypt.gensalt(rounds=rounds or settings.BCRYPT_ROUNDS)
+    hashed = bcrypt.hashpw(password.encode('utf-8'), salt)
+    return hashed.decode('utf-8')
+
+
+def verify_password(plain_password: str, hashed_password: str) -> bool:
+    """Verify a password against a bcrypt hash"""
+    try:
+        return bcrypt.checkpw(
+            plain_password.encode('utf-8'),
+            hashed_password.encode('utf-8')
+        )
+    except Exception as e:
+        logger.error(f"Error verifying password: {e}")
+        return False
+
+
+async def verify_password_async(plain_password: str, hashed_password: str) -> bool:
+    """Verify a password in the bounded bcrypt worker pool"""
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(_executor, verify_password, plain_password, hashed_password)
+
+
+def bulk_hash_passwords(passwords: List[str], processes: Optional[int] = None) -> List[str]:
+    """Hash many passwords in parallel across a process pool (order is preserved)"""
+    if len(passwords) <= 1:
+        return [hash_password(password) for password in passwords]
+    processes = processes or settings.PASSWORD_HASH_PROCESSES
+    rounds = [settings.BCRYPT_ROUNDS] * len(passwords)
+    with ProcessPoolExecutor(max_workers=processes) as pool:
+        return list(pool.map(hash_password, passwords, rounds, chunksize=max(1, len(passwords) // 64)))
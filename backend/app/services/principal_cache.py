@@ -0,0 +1,111 @@
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Dict, Optional, Set
+from sqlalchemy import event, inspect
+from app.config import settings
+from app.models.user import User
+
+
+@dataclass(frozen=True)
+class Principal:
+    """Authenticated user as seen by route handlers (no database session attached)"""
+    id: int
+    email: str
+    full_name: str
+    role: str
+    created_at: Optional[datetime] = None
+
+    @classmethod
+    def from_user(cls, user: User) -> "Principal":
+        return cls(id=user.id, email=user.email, full_name=user.full_name, role=user.role, created_at=user.created_at)
+
+
+class PrincipalCache:
+    """Bounded TTL cache of verified principals keyed on the bearer token.
+
+    AUTH_CACHE_TTL_SECONDS is the only window in which a user is not re-read from
+    the database: cached principals expire after it, and claims embedded in a token
+    are trusted only for that long after the token was issued. Role changes and
+    deletions therefore reach every worker (and survive restarts) within the TTL;
+    in the worker that made them they take effect immediately.
+    """
+
+    def __init__(self, max_entries: int, ttl_seconds: float):
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self._entries: "OrderedDict[str, tuple]" = OrderedDict()  # token -> (principal, expires_at)
+        self._tokens_by_user: Dict[int, Set[str]] = {}
+        self._invalidated_at: Dict[int, float] = {}
+        self._lock = threading.Lock()
+
+    def get(self, token: str) -> Optional[Principal]:
+        with self._lock:
+            entry = self._entries.get(token)
+            if entry is None:
+                return None
+            principal, expires_at = entry
+            if expires_at <= time.time():
+                self._remove(token)
+                return None
+            self._entries.move_to_end(token)
+            return principal
+
+    def put(self, token: str, principal: Principal, token_expires_at: Optional[float] = None):
+        expires_at = time.time() + self.ttl_seconds
+        if token_expires_at is not None:
+            expires_at = min(expires_at, token_expires_at)
+        with self._lock:
+            self._entries[token] = (principal, expires_at)
+            self._entries.move_to_end(token)
+            self._tokens_by_user.setdefault(principal.id, set()).add(token)
+            while len(self._entries) > self.max_entries:
+                oldest_token, _ = next(iter(self._entries.items()))
+                self._remove(oldest_token)
+
+    def invalidate_user(self, user_id: int):
+        """Evict a user's cached principals and distrust claims in tokens issued before now"""
+        with self._lock:
+            self._invalidated_at[user_id] = time.time()
+            for token in list(self._tokens_by_user.get(user_id, ())):
+                self._remove(token)
+
+    def claims_trusted(self, user_id: int, issued_at: Optional[float]) -> bool:
+        """Embedded claims are trusted for the TTL after issue, unless this worker saw the user change since"""
+        if issued_at is None or time.time() - issued_at > self.ttl_seconds:
+            return False
+        with self._lock:
+            invalidated_at = self._invalidated_at.get(user_id)
+        return invalidated_at is None or issued_at > invalidated_at
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._tokens_by_user.clear()
+            self._invalidated_at.clear()
+
+    def _remove(self, token: str):
+        entry = self._entries.pop(token, None)
+        if entry is not None:
+            tokens = self._tokens_by_user.get(entry[0].id)
+            if tokens is not None:
+                tokens.discard(token)
+                if not tokens:
+                    del self._tokens_by_user[entry[0].id]
+
+
+principal_cache = PrincipalCache(settings.AUTH_CACHE_MAX_ENTRIES, settings.AUTH_CACHE_TTL_SECONDS)
+
+
+@event.listens_for(User, "after_update")
+def _invalidate_on_update(mapper, connection, target):
+    state = inspect(target)
+    if any(state.attrs[attr].history.has_changes() for attr in ("role", "email", "full_name")):
+        principal_cache.invalidate_user(target.id)
+
+
+@event.listens_for(User, "after_delete")
+def _invalidate_on_delete(mapper, connection, target):
+    principal_cache.invalidate_user(target.id)
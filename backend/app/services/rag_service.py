@@ -1,6 +1,6 @@
 import logging
-from qdrant_client import QdrantClient
-from qdrant_client.models import Distance, VectorParams, PointStruct
+import threading
+from collections import OrderedDict
 from typing import List, Dict
 import os
 from app.config import settings
@@ -8,9 +8,18 @@ from app.services.gemini_service import generate_embedding
 
 logger = logging.getLogger(__name__)
 
-# Initialize Qdrant client
+_client = None
+_client_lock = threading.Lock()
+
+# Embeddings of recent search queries; common questions skip the embedding call (primed by warm-up)
+QUERY_EMBEDDING_CACHE_SIZE = 256
+_query_embeddings: "OrderedDict[str, list]" = OrderedDict()
+_query_embeddings_lock = threading.Lock()
+
+
 def get_qdrant_client():
     """Get Qdrant client - supports embedded, local, and cloud modes"""
+    from qdrant_client import QdrantClient
     if settings.QDRANT_USE_CLOUD:
         # Qdrant Cloud - requires URL and API key
         if not settings.QDRANT_API_KEY:
@@ -19,6 +28,9 @@ def get_qdrant_client():
             url=settings.QDRANT_HOST,  # Cloud URL format: https://xxx.qdrant.io
             api_key=settings.QDRANT_API_KEY
         )
+    elif settings.QDRANT_HOST == ":memory:":
+        # In-process and non-persistent (tests, load tests); each process gets its own copy
+        return QdrantClient(location=":memory:")
     elif settings.QDRANT_HOST == "localhost" or settings.QDRANT_HOST == "127.0.0.1":
         # Try embedded mode for localhost
         try:
@@ -40,11 +52,33 @@ def get_qdrant_client():
         else:
             return QdrantClient(host=settings.QDRANT_HOST, port=port)
 
-qdrant_client = get_qdrant_client()
+
+def get_client():
+    """Shared Qdrant client, created on first use (qdrant_client is slow to import and may open local storage)"""
+    global _client
+    if _client is None:
+        with _client_lock:
+            if _client is None:
+                _client = get_qdrant_client()
+    return _client
+
+
+def is_initialized() -> bool:
+    return _client is not None
+
+
+def close_client():
+    global _client
+    with _client_lock:
+        if _client is not None:
+            _client.close()
+            _client = None
 
 
 def initialize_qdrant_collection(collection_name: str = None, vector_size: int = None):
     """Initialize Qdrant collection for HR policies"""
+    from qdrant_client.models import Distance, VectorParams
+    qdrant_client = get_client()
     if collection_name is None:
         collection_name = settings.QDRANT_COLLECTION_NAME
     
@@ -99,6 +133,7 @@ def chunk_text(text: str, chunk_size: int = 500, overlap: int = 50) -> List[str]
 
 def ingest_policy_documents(policies_dir: str = "app/data/hr_policies"):
     """Ingest HR policy documents into Qdrant"""
+    from qdrant_client.models import PointStruct
     collection_name = settings.QDRANT_COLLECTION_NAME
     
     # First, detect embedding dimension by generating a test embedding
@@ -163,21 +198,39 @@ def ingest_policy_documents(policies_dir: str = "app/data/hr_policies"):
     
     # Upsert points to Qdrant
     if points:
-        qdrant_client.upsert(
+        get_client().upsert(
             collection_name=collection_name,
             points=points
         )
         print(f"Ingested {len(points)} chunks from policy documents")
 
 
+def embed_query(query: str) -> list:
+    """Embedding for a search query, from the cache when the same question was embedded recently"""
+    key = " ".join(query.lower().split())
+    with _query_embeddings_lock:
+        embedding = _query_embeddings.get(key)
+        if embedding is not None:
+            _query_embeddings.move_to_end(key)
+            return embedding
+    embedding = generate_embedding(query)
+    if embedding:
+        with _query_embeddings_lock:
+            _query_embeddings[key] = embedding
+            while len(_query_embeddings) > QUERY_EMBEDDING_CACHE_SIZE:
+                _query_embeddings.popitem(last=False)
+    return embedding
+
+
 def search_policies(query: str, top_k: int = 3) -> List[Dict]:
     """Search for relevant policy chunks"""
+    qdrant_client = get_client()
     logger.info(f"🔍 RAG: Searching policies for query: '{query[:100]}...'")
     collection_name = settings.QDRANT_COLLECTION_NAME
     
     # Generate query embedding
     logger.info("   Generating query embedding...")
-    query_embedding = generate_embedding(query)
+    query_embedding = embed_query(query)
     
     if not query_embedding:
         logger.warning("   ✗ Failed to generate query embedding")
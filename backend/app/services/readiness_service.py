@@ -0,0 +1,105 @@
+import logging
+import time
+from contextlib import ExitStack
+from sqlalchemy import text
+from app.config import settings
+from app.database import engine
+from app.graphs import chat_graph
+from app.services import gemini_service, rag_service
+
+logger = logging.getLogger(__name__)
+
+# Dependencies are initialized lazily, so "not_initialized" is a normal state for an idle
+# worker; only "error" (or an unreachable database) makes the worker unready. With
+# STARTUP_WARMUP the worker is also unready until warm_up() has finished.
+
+_warmup_finished = False
+
+
+def _timed(check) -> dict:
+    started = time.monotonic()
+    try:
+        check()
+        status = {"status": "ok"}
+    except Exception as e:
+        status = {"status": "error", "error": str(e)}
+    status["latency_ms"] = round((time.monotonic() - started) * 1000, 2)
+    return status
+
+
+def _ping_database():
+    with engine.connect() as conn:
+        conn.execute(text("SELECT 1"))
+
+
+def check_database() -> dict:
+    return _timed(_ping_database)
+
+
+def check_qdrant() -> dict:
+    if not rag_service.is_initialized():
+        return {"status": "not_initialized"}
+    return _timed(lambda: rag_service.get_client().get_collections())
+
+
+def check_llm() -> dict:
+    return {
+        "status": "ok" if gemini_service.is_initialized() else "not_initialized",
+        "provider": settings.LLM_PROVIDER
+    }
+
+
+def check_chat_graph() -> dict:
+    return {"status": "ok" if chat_graph.is_initialized() else "not_initialized"}
+
+
+def dependency_report() -> dict:
+    dependencies = {
+        "database": check_database(),
+        "qdrant": check_qdrant(),
+        "llm": check_llm(),
+        "chat_graph": check_chat_graph(),
+    }
+    ready = dependencies["database"]["status"] == "ok" and all(
+        dep["status"] != "error" for dep in dependencies.values()
+    )
+    report = {"ready": ready, "dependencies": dependencies}
+    if settings.STARTUP_WARMUP:
+        report["warmup"] = "finished" if _warmup_finished else "pending"
+        report["ready"] = ready and _warmup_finished
+    return report
+
+
+def _fill_pool():
+    """Open the pool's steady-state connections now rather than on the first requests"""
+    size = engine.pool.size() if hasattr(engine.pool, "size") else 1
+    with ExitStack() as stack:
+        for _ in range(max(size, 1)):
+            stack.enter_context(engine.connect()).execute(text("SELECT 1"))
+
+
+def _prime_queries():
+    """Embed WARMUP_QUERIES into the query embedding cache (also opens the Gemini and Qdrant connections)"""
+    for query in settings.warmup_queries:
+        rag_service.search_policies(query)
+
+
+def warm_up():
+    """Initialize every lazy dependency now instead of on the first request that needs it"""
+    global _warmup_finished
+    started = time.monotonic()
+    for name, init in (
+        ("database pool", _fill_pool),
+        ("llm provider", gemini_service.get_provider),
+        ("qdrant", rag_service.get_client),
+        ("chat_graph", chat_graph.get_chat_graph),
+        ("query embeddings", _prime_queries),
+    ):
+        step_started = time.monotonic()
+        try:
+            init()
+            logger.info(f"Warm-up: {name} ready in {time.monotonic() - step_started:.2f}s")
+        except Exception as e:
+            logger.error(f"Warm-up of {name} failed (will retry on first use): {e}")
+    _warmup_finished = True
+    logger.info(f"Warm-up finished in {time.monotonic() - started:.2f}s")
@@ -0,0 +1,59 @@
+import logging
+from typing import List
+from sqlalchemy.orm import Session, aliased
+from app.models.hr_request import HRRequest
+from app.models.user import User
+from app.schemas.hr_request import HRRequestResponse
+from app.services.event_bus import event_bus
+
+logger = logging.getLogger(__name__)
+
+REQUEST_CREATED = "request.created"
+REQUEST_UPDATED = "request.updated"
+
+# Employee and reviewer are both users, so the listings join the users table twice
+Employee = aliased(User)
+Reviewer = aliased(User)
+
+
+def request_listing_query(db: Session):
+    """Single query projecting HR requests with employee and reviewer names into response rows"""
+    return db.query(
+        HRRequest.id,
+        HRRequest.user_id,
+        HRRequest.request_type,
+        HRRequest.start_date,
+        HRRequest.end_date,
+        HRRequest.duration_days,
+        HRRequest.reason,
+        HRRequest.status,
+        HRRequest.reviewed_by,
+        HRRequest.reviewed_at,
+        HRRequest.created_at,
+        Employee.full_name.label("user_name"),
+        Employee.email.label("user_email"),
+        Reviewer.full_name.label("reviewed_by_name"),
+    ).join(
+        Employee, HRRequest.user_id == Employee.id
+    ).outerjoin(
+        Reviewer, HRRequest.reviewed_by == Reviewer.id
+    )
+
+
+def publish_request_changes(db: Session, event_type: str, request_ids: List[int]):
+    """Publish committed request rows as created/updated events (one listing query for all ids).
+
+    Call after commit. Failures are logged, never raised: push is best-effort and
+    clients resync from the listing endpoints.
+    """
+    if not request_ids:
+        return
+    try:
+        rows = request_listing_query(db).filter(HRRequest.id.in_(request_ids)).all()
+        for row in rows:
+            event_bus.publish({
+                "type": event_type,
+                "request": HRRequestResponse(**row._mapping).model_dump(mode="json")
+            })
+    except Exception as e:
+        logger.warning(f"Failed to publish {event_type} for requests {request_ids}: {e}")
@@ -0,0 +1,92 @@
+import logging
+from datetime import datetime, timezone
+from typing import Dict, List, Optional, Tuple
+from sqlalchemy import case
+from sqlalchemy.orm import Session
+from app.models.chat_session_summary import ChatSessionSummary
+
+logger = logging.getLogger(__name__)
+
+PREVIEW_LENGTH = 120
+
+
+def _upsert_statement(dialect_name: str):
+    """INSERT ... ON CONFLICT for dialects that support it, else None"""
+    if dialect_name == "postgresql":
+        from sqlalchemy.dialects.postgresql import insert
+    elif dialect_name == "sqlite":
+        from sqlalchemy.dialects.sqlite import insert
+    else:
+        return None
+    return insert(ChatSessionSummary)
+
+
+def record_turns(db: Session, turns: List[dict]):
+    """Fold chat turns into chat_session_summaries (the caller commits).
+
+    Each turn is a dict with session_id, user_id, message, intent and created_at.
+    Turns for the same session are aggregated first, so a batch costs one upsert per session.
+    """
+    aggregated: Dict[Tuple[str, int], dict] = {}
+    for turn in sorted(turns, key=lambda t: t["created_at"]):
+        key = (turn["session_id"], turn["user_id"])
+        summary = aggregated.get(key)
+        if summary is None:
+            summary = aggregated[key] = {
+                "session_id": turn["session_id"],
+                "user_id": turn["user_id"],
+                "first_message_preview": turn["message"][:PREVIEW_LENGTH],
+                "turn_count": 0,
+            }
+        summary["turn_count"] += 1
+        summary["last_activity_at"] = turn["created_at"]
+        summary["last_intent"] = turn["intent"]
+
+    if not aggregated:
+        return
+
+    stmt = _upsert_statement(db.get_bind().dialect.name)
+    if stmt is not None:
+        table = ChatSessionSummary.__table__
+        stmt = stmt.values(list(aggregated.values()))
+        # Turns may arrive out of order (e.g. batched writes), so only newer activity moves the summary forward
+        is_newer = stmt.excluded.last_activity_at > table.c.last_activity_at
+        stmt = stmt.on_conflict_do_update(
+            index_elements=[table.c.session_id, table.c.user_id],
+            set_={
+                "turn_count": table.c.turn_count + stmt.excluded.turn_count,
+                "last_activity_at": case((is_newer, stmt.excluded.last_activity_at), else_=table.c.last_activity_at),
+                "last_intent": case((is_newer, stmt.excluded.last_intent), else_=table.c.last_intent),
+            }
+        )
+        db.execute(stmt)
+        return
+
+    # Portable fallback: read-modify-write per session
+    for values in aggregated.values():
+        summary = db.get(ChatSessionSummary, (values["session_id"], values["user_id"]))
+        if summary is None:
+            db.add(ChatSessionSummary(**values))
+        else:
+            summary.turn_count += values["turn_count"]
+            if values["last_activity_at"] > summary.last_activity_at:
+                summary.last_activity_at = values["last_activity_at"]
+                summary.last_intent = values["last_intent"]
+
+
+def record_turn(
+    db: Session,
+    session_id: str,
+    user_id: int,
+    message: str,
+    intent: Optional[str],
+    created_at: Optional[datetime] = None
+):
+    """Fold a single chat turn into its session summary (the caller commits)"""
+    record_turns(db, [{
+        "session_id": session_id,
+        "user_id": user_id,
+        "message": message,
+        "intent": intent,
+        "created_at": created_at or datetime.now(timezone.utc),
+    }])
@@ -0,0 +1,210 @@
+import hashlib
+import json
+import logging
+import math
+import random
+import re
+import threading
+import time
+from datetime import date, timedelta
+from types import SimpleNamespace
+from typing import List, Optional
+from app.config import settings
+
+logger = logging.getLogger(__name__)
+
+# Offline stand-in for Gemini (LLM_PROVIDER=stub), for load tests and CI.
+#
+# Outputs depend only on the prompt: each prompt type the graph sends (intent JSON,
+# leave type, dates JSON, reason, policy answer) gets a well-formed answer derived from
+# the user message. Like the real model it answers "unknown" when the message does not
+# say, so multi-turn leave flows go through every stage. Embeddings are signed feature
+# hashes of the words, so texts sharing words still land near each other in Qdrant. Latency and failures are
+# the only random parts, drawn from the STUB_* settings.
+
+LEAVE_WORDS = ("leave", "day off", "days off", "time off", "vacation", "holiday", "sick day", "off on", "off from")
+QUESTION_STARTS = ("what", "how", "when", "can", "is", "do", "does", "who", "why", "where", "are")
+ISO_DATE = re.compile(r"\b(\d{4}-\d{2}-\d{2})\b")
+WORD = re.compile(r"[a-z0-9]+")
+
+
+class StubError(Exception):
+    """Injected provider failure (STUB_ERROR_RATE)"""
+
+
+def _digest(text: str) -> int:
+    return int.from_bytes(hashlib.blake2b(text.encode("utf-8"), digest_size=8).digest(), "big")
+
+
+def _field(prompt: str, label: str) -> str:
+    """The value after `label:` on its own line in a prompt, or ''"""
+    match = re.search(rf"^\s*{re.escape(label)}:\s*(.*)$", prompt, re.MULTILINE)
+    return match.group(1).strip() if match else ""
+
+
+def _count_tokens(text: str) -> int:
+    # Roughly what Gemini reports for English: ~4 characters per token
+    return max(1, len(text) // 4)
+
+
+class LatencyModel:
+    """Log-normal latency from a median and p99, plus an error rate; shared RNG so runs can be seeded"""
+
+    def __init__(self, median_ms: float, p99_ms: float, error_rate: float, rng: random.Random, lock: threading.Lock):
+        self.median = max(median_ms, 0.0) / 1000
+        # p99 of a log-normal is median * exp(2.326 * sigma)
+        self.sigma = math.log(p99_ms / median_ms) / 2.326 if median_ms > 0 and p99_ms > median_ms else 0.0
+        self.error_rate = error_rate
+        self._rng = rng
+        self._lock = lock
+
+    def sample(self):
+        """(seconds to wait, whether this call fails)"""
+        with self._lock:
+            fails = self._rng.random() < self.error_rate
+            if self.median <= 0:
+                return 0.0, fails
+            return self.median * math.exp(self.sigma * self._rng.gauss(0, 1)), fails
+
+    def wait(self, timeout: Optional[float] = None):
+        delay, fails = self.sample()
+        if timeout is not None and delay > timeout:
+            time.sleep(timeout)
+            raise TimeoutError(f"Stub call exceeded its {timeout:.2f}s timeout")
+        time.sleep(delay)
+        if fails:
+            raise StubError("Injected stub provider error")
+
+
+class StubModel:
+    """Quacks like genai.GenerativeModel for the calls the app makes"""
+
+    def __init__(self, model_name: str, latency: LatencyModel):
+        self.model_name = model_name
+        self.latency = latency
+
+    def generate_content(self, prompt: str, request_options: Optional[dict] = None):
+        self.latency.wait((request_options or {}).get("timeout"))
+        text = respond(prompt)
+        prompt_tokens, output_tokens = _count_tokens(prompt), _count_tokens(text)
+        return SimpleNamespace(
+            text=text,
+            usage_metadata=SimpleNamespace(
+                prompt_token_count=prompt_tokens,
+                candidates_token_count=output_tokens,
+                total_token_count=prompt_tokens + output_tokens
+            )
+        )
+
+
+class StubProvider:
+    """LLM provider returning deterministic, schema-valid outputs without network access"""
+
+    name = "stub"
+
+    def __init__(self):
+        rng = random.Random(settings.STUB_SEED)
+        lock = threading.Lock()
+        self.generation_latency = LatencyModel(
+            settings.STUB_LATENCY_MEDIAN_MS, settings.STUB_LATENCY_P99_MS, settings.STUB_ERROR_RATE, rng, lock
+        )
+        self.embedding_latency = LatencyModel(
+            settings.STUB_EMBEDDING_LATENCY_MEDIAN_MS, settings.STUB_EMBEDDING_LATENCY_P99_MS, settings.STUB_ERROR_RATE, rng, lock
+        )
+        self.dimension = settings.STUB_EMBEDDING_DIM or settings.QDRANT_VECTOR_SIZE or 768
+        logger.info(f"Using stub LLM provider (embedding dimension {self.dimension})")
+
+    def model(self, model_name: str) -> StubModel:
+        return StubModel(model_name, self.generation_latency)
+
+    def embed(self, text: str) -> List[float]:
+        self.embedding_latency.wait()
+        return hash_embedding(text, self.dimension)
+
+
+def hash_embedding(text: str, dimension: int) -> List[float]:
+    """Unit vector of signed word-hash counts (the hashing trick); deterministic for a given text"""
+    vector = [0.0] * dimension
+    words = WORD.findall(text.lower()) or [text]
+    for word in words:
+        h = _digest(word)
+        vector[h % dimension] += 1.0 if (h >> 32) & 1 else -1.0
+    norm = math.sqrt(sum(v * v for v in vector)) or 1.0
+    return [v / norm for v in vector]
+
+
+def respond(prompt: str) -> str:
+    """Deterministic answer for each prompt type the graph sends"""
+    message = _field(prompt, "User message") or _field(prompt, "User Question")
+    if "intent classifier" in prompt:
+        return json.dumps({"intent": classify(message)})
+    if "Extract the leave type" in prompt:
+        return leave_type(message)
+    if "Extract start and end dates" in prompt:
+        return json.dumps(leave_dates(message, _field(prompt, "TODAY'S DATE")))
+    if "Extract the reason for leave" in prompt:
+        return reason(message)
+    if "HR assistant" in prompt:
+        return policy_answer(message, prompt)
+    return "OK"
+
+
+def classify(message: str) -> str:
+    lowered = message.lower().strip()
+    is_question = lowered.endswith("?") or lowered.startswith(QUESTION_STARTS)
+    if any(word in lowered for word in LEAVE_WORDS) and not is_question:
+        return "leave_request"
+    return "policy_question"
+
+
+def leave_type(message: str) -> str:
+    words = set(WORD.findall(message.lower()))
+    if words & {"sick", "ill", "doctor", "unwell"}:
+        return "sick"
+    if words & {"parental", "maternity", "paternity", "baby"}:
+        return "parental"
+    if words & {"annual", "vacation", "holiday"}:
+        return "annual"
+    return "unknown"
+
+
+def leave_dates(message: str, today_text: str) -> dict:
+    try:
+        today = date.fromisoformat(today_text)
+    except ValueError:
+        today = date.today()
+    lowered = message.lower()
+    mentioned = ISO_DATE.findall(message)
+    if mentioned:
+        return {"start_date": mentioned[0], "end_date": mentioned[-1]}
+    if "tomorrow" in lowered:
+        day = today + timedelta(days=1)
+        return {"start_date": day.isoformat(), "end_date": day.isoformat()}
+    if "today" in lowered:
+        return {"start_date": today.isoformat(), "end_date": today.isoformat()}
+    return {"start_date": "unknown", "end_date": "unknown"}
+
+
+def reason(message: str) -> str:
+    lowered = message.lower()
+    for marker in (" because ", " for ", " due to "):
+        if marker in lowered:
+            start = lowered.index(marker) + len(marker)
+            return message[start:start + 120].strip().rstrip(".").capitalize() or "Personal reasons"
+    return "Personal reasons"
+
+
+def policy_answer(question: str, prompt: str) -> str:
+    sources = re.findall(r"\[From ([^\]]+)\]", prompt)
+    excerpt = ""
+    if "Context from HR Policies:" in prompt:
+        context = prompt.split("Context from HR Policies:", 1)[1].split("User Question:", 1)[0]
+        lines = [line.strip() for line in context.splitlines() if line.strip() and not line.startswith("[From")]
+        excerpt = lines[0][:300] if lines else ""
+    source_text = f" according to the {', '.join(dict.fromkeys(sources))}" if sources else ""
+    answer = f"Thanks for asking about \"{question[:80]}\"{source_text}."
+    if excerpt:
+        answer += f" The relevant policy says: {excerpt}"
+    else:
+        answer += " I couldn't find this in the policy documents, so please check with HR."
+    return answer + f" (ref {_digest(question) % 10000:04d})"
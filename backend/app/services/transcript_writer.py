@@ -0,0 +1,168 @@
+import json
+import logging
+import os
+import queue
+import threading
+import time
+from datetime import datetime
+from typing import List, Optional
+from sqlalchemy import insert
+from app.config import settings
+from app.database import SessionLocal
+from app.models.chat_session import ChatSession
+from app.services import metrics_service
+from app.services.session_summary_service import record_turns
+
+logger = logging.getLogger(__name__)
+
+
+class TranscriptWriter:
+    """Write-behind persister for chat transcript rows.
+
+    Rows are queued in-process and flushed by a background thread with one bulk
+    INSERT (plus one summary upsert per session) whenever BATCH_SIZE rows are
+    waiting or FLUSH_INTERVAL has passed. submit() returns False when the queue
+    is full so the caller can fall back to a synchronous write. Rows carry their
+    own created_at, so late flushes never reorder a session's history.
+
+    A failing flush is retried with exponential backoff; a batch that still fails
+    is appended to spill_path as JSONL and inserted again on the next start().
+    """
+
+    def __init__(
+        self,
+        batch_size: int,
+        flush_interval: float,
+        max_queue_size: int,
+        attempts: int = 5,
+        spill_path: Optional[str] = None,
+        session_factory=SessionLocal
+    ):
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.attempts = max(attempts, 1)
+        self.spill_path = spill_path
+        self.session_factory = session_factory
+        self._queue: "queue.Queue[dict]" = queue.Queue(maxsize=max_queue_size)
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def running(self) -> bool:
+        return self._thread is not None and self._thread.is_alive()
+
+    def start(self):
+        if self.running:
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name="transcript-writer", daemon=True)
+        self._thread.start()
+        logger.info(f"Transcript write-behind started (batch={self.batch_size}, interval={self.flush_interval}s)")
+
+    def stop(self, timeout: float = 10.0):
+        """Stop accepting work and drain everything still queued"""
+        if not self.running:
+            return
+        self._stop.set()
+        self._thread.join(timeout)
+        if self._thread.is_alive():
+            logger.error(f"Transcript writer did not drain within {timeout}s ({self._queue.qsize()} rows left)")
+        else:
+            logger.info("Transcript write-behind drained and stopped")
+        self._thread = None
+
+    def submit(self, row: dict) -> bool:
+        """Queue a transcript row; False if the writer is stopped or saturated"""
+        if not self.running or self._stop.is_set():
+            return False
+        try:
+            self._queue.put_nowait(row)
+        except queue.Full:
+            metrics_service.increment("chat_write_behind_saturated_total")
+            return False
+        return True
+
+    def _run(self):
+        self._replay_spilled()
+        while not (self._stop.is_set() and self._queue.empty()):
+            batch = self._collect_batch()
+            if batch:
+                self._flush(batch)
+
+    def _collect_batch(self) -> List[dict]:
+        batch: List[dict] = []
+        deadline = time.monotonic() + self.flush_interval
+        while len(batch) < self.batch_size:
+            timeout = deadline - time.monotonic()
+            if timeout <= 0:
+                break
+            try:
+                batch.append(self._queue.get(timeout=timeout))
+            except queue.Empty:
+                break
+        return batch
+
+    def _flush(self, batch: List[dict]):
+        """Insert the rows and their summaries, retrying with backoff; spill the batch if that fails"""
+        started = time.monotonic()
+        for attempt in range(1, self.attempts + 1):
+            db = self.session_factory()
+            try:
+                db.execute(insert(ChatSession), batch)
+                record_turns(db, batch)
+                db.commit()
+                metrics_service.increment("chat_write_behind_rows_total", len(batch))
+                metrics_service.observe("chat_write_behind_flush_seconds", time.monotonic() - started)
+                return
+            except Exception as e:
+                db.rollback()
+                logger.error(f"Error flushing {len(batch)} transcript rows (attempt {attempt}/{self.attempts}): {e}", exc_info=True)
+            finally:
+                db.close()
+            if attempt < self.attempts:
+                time.sleep(min(0.5 * 2 ** (attempt - 1), 10.0))
+        self._spill(batch)
+
+    def _spill(self, batch: List[dict]):
+        session_ids = sorted({row["session_id"] for row in batch})
+        if self.spill_path:
+            try:
+                with open(self.spill_path, "a", encoding="utf-8") as spill:
+                    spill.write("".join(
+                        json.dumps({**row, "created_at": row["created_at"].isoformat()}) + "\n" for row in batch
+                    ))
+                metrics_service.increment("chat_write_behind_spilled_total", len(batch))
+                logger.error(f"Spilled {len(batch)} transcript rows to {self.spill_path} (sessions: {session_ids})")
+                return
+            except Exception as e:
+                logger.error(f"Error spilling transcript rows to {self.spill_path}: {e}", exc_info=True)
+        metrics_service.increment("chat_write_behind_dropped_total", len(batch))
+        logger.error(f"Dropped {len(batch)} transcript rows (sessions: {session_ids}): {batch}")
+
+    def _replay_spilled(self):
+        """Insert rows spilled by an earlier run (a replay interrupted by a crash is picked up too)"""
+        if not self.spill_path:
+            return
+        replay_path = self.spill_path + ".replay"
+        if not os.path.exists(replay_path):
+            try:
+                os.replace(self.spill_path, replay_path)
+            except FileNotFoundError:
+                return
+        with open(replay_path, encoding="utf-8") as spill:
+            rows = [json.loads(line) for line in spill if line.strip()]
+        for row in rows:
+            row["created_at"] = datetime.fromisoformat(row["created_at"])
+        logger.warning(f"Replaying {len(rows)} spilled transcript rows from {self.spill_path}")
+        for i in range(0, len(rows), self.batch_size):
+            self._flush(rows[i:i + self.batch_size])
+        os.remove(replay_path)
+
+
+transcript_writer = TranscriptWriter(
+    batch_size=settings.CHAT_WRITE_BATCH_SIZE,
+    flush_interval=settings.CHAT_WRITE_FLUSH_INTERVAL,
+    max_queue_size=settings.CHAT_WRITE_QUEUE_SIZE,
+    attempts=settings.CHAT_WRITE_RETRIES,
+    spill_path=settings.CHAT_WRITE_SPILL_PATH
+)
@@ -0,0 +1,30 @@
+"""
+Move transcripts of idle chat sessions into the compressed archive table
+(the same work as the background retention job).
+
+Usage: python scripts/archive_chat_sessions.py [days]   (default: CHAT_ARCHIVE_AFTER_DAYS)
+"""
+import sys
+import os
+
+# Add parent directory to path
+sys.path.insert(0, os.path.dirname(os.path.dirname(__file__)))
+
+from app.services.chat_archive_service import archive_idle_sessions
+
+
+def main(days=None):
+    print(f"Archiving chat sessions idle for more than {days if days is not None else 'CHAT_ARCHIVE_AFTER_DAYS'} days...")
+    try:
+        result = archive_idle_sessions(older_than_days=days)
+        print(f"✓ Archived {result['turns']} turns from {result['sessions']} sessions (idle since before {result['cutoff']})")
+    except Exception as e:
+        print(f"✗ Error archiving chat sessions: {e}")
+        raise
+
+
+if __name__ == "__main__":
+    if len(sys.argv) > 2:
+        print(__doc__)
+        sys.exit(1)
+    main(float(sys.argv[1]) if len(sys.argv) == 2 else None)
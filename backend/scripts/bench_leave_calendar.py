@@ -0,0 +1,106 @@
+"""
+Benchmark the leave calendar: seed 100k requests into an in-memory SQLite database,
+build a 90-day calendar (with and without the per-day people lists) and check the
+counts against a naive day-by-day expansion.
+
+SQLite exercises the portable difference-array path; PostgreSQL uses generate_series.
+
+Usage: python scripts/bench_leave_calendar.py [num_requests] [window_days]
+"""
+import os
+import random
+import sys
+import time
+from collections import Counter
+from datetime import date, timedelta
+
+# Add parent directory to path
+sys.path.insert(0, os.path.dirname(os.path.dirname(__file__)))
+
+# The benchmark uses its own engine; settings only need to be loadable
+for key, value in {
+    "DATABASE_URL": "sqlite://",
+    "GEMINI_API_KEY": "unused",
+    "GEMINI_MODEL": "unused",
+    "GEMINI_EMBEDDING_MODEL": "unused",
+    "QDRANT_HOST": "localhost",
+    "QDRANT_COLLECTION_NAME": "unused",
+    "SECRET_KEY": "bench",
+    "ALGORITHM": "HS256",
+    "CORS_ORIGINS": "http://localhost",
+}.items():
+    os.environ.setdefault(key, value)
+
+from sqlalchemy import create_engine, insert
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+from app.database import Base
+from app.models import User, HRRequest
+from app.services.leave_service import ACTIVE_STATUSES, leave_calendar
+
+NUM_USERS = 2000
+FIRST_DAY = date(2024, 1, 1)
+SPAN_DAYS = 3 * 365
+
+
+def seed(db, num_requests: int):
+    db.execute(insert(User), [
+        {"email": f"user{i}@company.com", "full_name": f"User {i}", "role": "employee", "password_hash": "x"}
+        for i in range(NUM_USERS)
+    ])
+    rng = random.Random(11)
+    rows = []
+    for _ in range(num_requests):
+        start = FIRST_DAY + timedelta(days=rng.randrange(SPAN_DAYS))
+        rows.append({
+            "user_id": rng.randint(1, NUM_USERS),
+            "request_type": rng.choice(["annual", "sick", "parental"]),
+            "start_date": start,
+            "end_date": start + timedelta(days=rng.randint(0, 9)),
+            "duration_days": 1,
+            "status": rng.choice(["pending", "approved", "rejected"]),
+        })
+    db.execute(insert(HRRequest), rows)
+    db.commit()
+
+
+def naive_totals(db, date_from: date, date_to: date) -> Counter:
+    totals = Counter()
+    for start, end in db.query(HRRequest.start_date, HRRequest.end_date).filter(HRRequest.status.in_(ACTIVE_STATUSES)):
+        day = max(start, date_from)
+        while day <= min(end, date_to):
+            totals[day] += 1
+            day += timedelta(days=1)
+    return totals
+
+
+def main():
+    num_requests = int(sys.argv[1]) if len(sys.argv) > 1 else 100_000
+    window_days = int(sys.argv[2]) if len(sys.argv) > 2 else 90
+    engine = create_engine("sqlite://", poolclass=StaticPool, connect_args={"check_same_thread": False})
+    Base.metadata.create_all(bind=engine)
+    db = sessionmaker(bind=engine)()
+
+    print(f"Seeding {num_requests} requests over {SPAN_DAYS} days...")
+    seed(db, num_requests)
+
+    date_from = FIRST_DAY + timedelta(days=SPAN_DAYS // 2)
+    date_to = date_from + timedelta(days=window_days - 1)
+
+    for include_people in (False, True):
+        started = time.perf_counter()
+        calendar = leave_calendar(db, date_from, date_to, include_people=include_people)
+        elapsed = time.perf_counter() - started
+        label = "counts + people" if include_people else "counts only"
+        extra = f", {len(calendar['requests'])} requests listed" if include_people else ""
+        print(f"{window_days}-day calendar ({label}): {elapsed * 1000:.1f} ms{extra}")
+
+    expected = naive_totals(db, date_from, date_to)
+    for day in calendar["days"]:
+        assert day["total"] == expected[day["date"]], f"count mismatch on {day['date']}"
+        assert len(day["request_ids"]) == day["total"], f"people mismatch on {day['date']}"
+    print("✓ Calendar counts match a naive expansion")
+
+
+if __name__ == "__main__":
+    main()
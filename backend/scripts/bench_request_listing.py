@@ -0,0 +1,134 @@
+"""
+Benchmark the HR request listing endpoints: seed 50k requests into an in-memory
+SQLite database and check that every page of each listing runs a constant number
+of queries.
+
+Usage: python scripts/bench_request_listing.py [num_requests]
+"""
+import asyncio
+import os
+import random
+import sys
+import time
+from datetime import date, datetime, timedelta
+
+# Add parent directory to path
+sys.path.insert(0, os.path.dirname(os.path.dirname(__file__)))
+
+# The benchmark uses its own engine; settings only need to be loadable
+for key, value in {
+    "DATABASE_URL": "sqlite://",
+    "GEMINI_API_KEY": "unused",
+    "GEMINI_MODEL": "unused",
+    "GEMINI_EMBEDDING_MODEL": "unused",
+    "QDRANT_HOST": "localhost",
+    "QDRANT_COLLECTION_NAME": "unused",
+    "SECRET_KEY": "bench",
+    "ALGORITHM": "HS256",
+    "CORS_ORIGINS": "http://localhost",
+}.items():
+    os.environ.setdefault(key, value)
+
+import orjson
+from sqlalchemy import create_engine, event, insert
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+from fastapi import Request, Response
+from app.database import Base
+from app.models import User, HRRequest
+from app.api.requests import get_all_requests, get_my_requests
+
+NUM_USERS = 500
+
+
+def seed(db, num_requests: int):
+    db.execute(insert(User), [
+        {
+            "email": f"user{i}@company.com",
+            "full_name": f"User {i}",
+            "role": "HR" if i < 5 else "employee",
+            "password_hash": "x",
+        }
+        for i in range(NUM_USERS)
+    ])
+    rng = random.Random(42)
+    rows = []
+    for i in range(num_requests):
+        start = date(2025, 1, 1) + timedelta(days=rng.randrange(365))
+        duration = rng.randint(1, 10)
+        status = rng.choice(["pending", "approved", "rejected"])
+        rows.append({
+            "user_id": rng.randint(1, NUM_USERS),
+            "request_type": rng.choice(["annual", "sick", "parental"]),
+            "start_date": start,
+            "end_date": start + timedelta(days=duration - 1),
+            "duration_days": duration,
+            "reason": "Benchmark",
+            "status": status,
+            "reviewed_by": rng.randint(1, 5) if status != "pending" else None,
+            "reviewed_at": datetime(2025, 6, 1) if status != "pending" else None,
+            "created_at": datetime(2025, 1, 1) + timedelta(seconds=i),
+        })
+    db.execute(insert(HRRequest), rows)
+    db.commit()
+
+
+def walk_pages(engine, label, fetch_page):
+    """Fetch every page, returning the largest number of queries any single page needed"""
+    statements = []
+
+    def count(conn, cursor, statement, parameters, context, executemany):
+        statements.append(statement)
+
+    event.listen(engine, "before_cursor_execute", count)
+    started = time.perf_counter()
+    cursor, pages, rows, max_queries = None, 0, 0, 0
+    while True:
+        before = len(statements)
+        response = Response()
+        page = asyncio.run(fetch_page(Request({"type": "http", "headers": []}), response, cursor))
+        max_queries = max(max_queries, len(statements) - before)
+        pages += 1
+        # The listings return an already-encoded Response carrying the cursor header
+        rows += len(orjson.loads(page.body))
+        cursor = page.headers.get("X-Next-Cursor")
+        if not cursor:
+            break
+    elapsed = time.perf_counter() - started
+    event.remove(engine, "before_cursor_execute", count)
+    print(f"{label}: {rows} rows in {pages} pages, {len(statements)} queries (max {max_queries}/page), {elapsed * 1000:.1f} ms")
+    return max_queries
+
+
+def main():
+    num_requests = int(sys.argv[1]) if len(sys.argv) > 1 else 50_000
+    engine = create_engine("sqlite://", poolclass=StaticPool, connect_args={"check_same_thread": False})
+    Base.metadata.create_all(bind=engine)
+    db = sessionmaker(bind=engine)()
+
+    print(f"Seeding {num_requests} requests for {NUM_USERS} users...")
+    seed(db, num_requests)
+
+    hr_user = db.get(User, 1)
+    employee = db.get(User, NUM_USERS)
+
+    all_queries = walk_pages(engine, "GET /api/requests/all", lambda request, response, cursor: get_all_requests(
+        request=request, response=response, limit=500, cursor=cursor, status=None, request_type=None, user_id=None,
+        created_from=None, created_to=None, current_user=hr_user, db=db
+    ))
+    pending_queries = walk_pages(engine, "GET /api/requests/all?status=pending", lambda request, response, cursor: get_all_requests(
+        request=request, response=response, limit=500, cursor=cursor, status="pending", request_type=None, user_id=None,
+        created_from=None, created_to=None, current_user=hr_user, db=db
+    ))
+    my_queries = walk_pages(engine, "GET /api/requests", lambda request, response, cursor: get_my_requests(
+        request=request, response=response, limit=100, cursor=cursor, status=None, request_type=None, current_user=employee, db=db
+    ))
+
+    for label, queries in [("/all", all_queries), ("/all?status=pending", pending_queries), ("/", my_queries)]:
+        # ETag version marker + the page itself
+        assert queries == 2, f"expected 2 queries per page for {label}, got {queries}"
+    print("✓ Query count per page is constant")
+
+
+if __name__ == "__main__":
+    main()
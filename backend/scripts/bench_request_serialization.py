@@ -0,0 +1,114 @@
+"""
+Benchmark serialization of the /api/requests/all payload at 10k rows: the
+response_model path (build HRRequestResponse per row, re-validate, dump) versus
+the fast path (plain dicts encoded with orjson), plus gzip cost and size.
+
+Usage: python scripts/bench_request_serialization.py [num_rows] [repeats]
+"""
+import gzip
+import json
+import os
+import random
+import sys
+import time
+from datetime import date, datetime, timedelta
+from typing import List
+
+# Add parent directory to path
+sys.path.insert(0, os.path.dirname(os.path.dirname(__file__)))
+
+# The benchmark uses its own engine; settings only need to be loadable
+for key, value in {
+    "DATABASE_URL": "sqlite://",
+    "GEMINI_API_KEY": "unused",
+    "GEMINI_MODEL": "unused",
+    "GEMINI_EMBEDDING_MODEL": "unused",
+    "QDRANT_HOST": "localhost",
+    "QDRANT_COLLECTION_NAME": "unused",
+    "SECRET_KEY": "bench",
+    "ALGORITHM": "HS256",
+    "CORS_ORIGINS": "http://localhost",
+}.items():
+    os.environ.setdefault(key, value)
+
+from pydantic import TypeAdapter
+from sqlalchemy import create_engine, insert
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+from app.database import Base
+from app.models import User, HRRequest
+from app.schemas.hr_request import HRRequestResponse
+from app.services.request_events import request_listing_query
+from app.api.serialization import dumps, rows_to_dicts, orjson
+
+NUM_USERS = 200
+
+
+def seed(db, num_rows: int):
+    db.execute(insert(User), [
+        {"email": f"user{i}@company.com", "full_name": f"User {i}", "role": "employee", "password_hash": "x"}
+        for i in range(NUM_USERS)
+    ])
+    rng = random.Random(7)
+    rows = []
+    for i in range(num_rows):
+        start = date(2025, 1, 1) + timedelta(days=rng.randrange(365))
+        status = rng.choice(["pending", "approved", "rejected"])
+        rows.append({
+            "user_id": rng.randint(1, NUM_USERS),
+            "request_type": rng.choice(["annual", "sick", "parental"]),
+            "start_date": start,
+            "end_date": start + timedelta(days=2),
+            "duration_days": 3,
+            "reason": "Benchmark",
+            "status": status,
+            "reviewed_by": 1 if status != "pending" else None,
+            "reviewed_at": datetime(2025, 6, 1, 9, 30, 15, 123456) if status != "pending" else None,
+            "created_at": datetime(2025, 1, 1) + timedelta(seconds=i),
+        })
+    db.execute(insert(HRRequest), rows)
+    db.commit()
+
+
+def timed(label: str, fn, repeats: int, num_rows: int):
+    best = float("inf")
+    for _ in range(repeats):
+        started = time.perf_counter()
+        result = fn()
+        best = min(best, time.perf_counter() - started)
+    print(f"{label:<34} {best * 1000:8.1f} ms  {num_rows / best:>12,.0f} rows/s")
+    return result
+
+
+def main():
+    num_rows = int(sys.argv[1]) if len(sys.argv) > 1 else 10_000
+    repeats = int(sys.argv[2]) if len(sys.argv) > 2 else 5
+    engine = create_engine("sqlite://", poolclass=StaticPool, connect_args={"check_same_thread": False})
+    Base.metadata.create_all(bind=engine)
+    db = sessionmaker(bind=engine)()
+    seed(db, num_rows)
+
+    rows = request_listing_query(db).order_by(HRRequest.created_at.desc(), HRRequest.id.desc()).all()
+    adapter = TypeAdapter(List[HRRequestResponse])
+    print(f"{len(rows)} rows, encoder: {'orjson' if orjson else 'json (stdlib)'}")
+
+    def model_path():
+        # What a response_model endpoint does: build models, re-validate, serialize
+        models = [HRRequestResponse(**row._mapping) for row in rows]
+        return adapter.dump_json(adapter.validate_python(models))
+
+    def fast_path():
+        return dumps(rows_to_dicts(rows))
+
+    slow_body = timed("response_model (pydantic)", model_path, repeats, num_rows)
+    fast_body = timed("dicts + fast encoder", fast_path, repeats, num_rows)
+    compressed = timed("gzip level 5 of fast payload", lambda: gzip.compress(fast_body, compresslevel=5), repeats, num_rows)
+
+    assert json.loads(slow_body) == json.loads(fast_body), "fast path must produce the same JSON"
+    print(f"Payload: {len(fast_body) / 1024:.0f} KiB raw, {len(compressed) / 1024:.0f} KiB gzip "
+          f"({len(compressed) / len(fast_body):.0%})")
+    print("✓ Fast path output matches response_model output")
+
+
+if __name__ == "__main__":
+    main()
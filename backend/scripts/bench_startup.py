@@ -0,0 +1,102 @@
+"""
+Benchmark API cold start: importing app.main in a fresh interpreter, running the
+lifespan startup, and answering the first /api/ready, then the one-off cost of
+initializing each lazy dependency (what STARTUP_WARMUP or the first request pays).
+
+Every measurement runs in a new subprocess so nothing is already imported.
+
+Usage: python scripts/bench_startup.py [repeats]
+"""
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Settings only need to be loadable; the database is an in-memory SQLite
+ENV = {
+    "DATABASE_URL": "sqlite://",
+    "GEMINI_API_KEY": "unused",
+    "GEMINI_MODEL": "unused",
+    "GEMINI_EMBEDDING_MODEL": "unused",
+    "QDRANT_HOST": "localhost",
+    "QDRANT_COLLECTION_NAME": "unused",
+    "SECRET_KEY": "bench",
+    "ALGORITHM": "HS256",
+    "CORS_ORIGINS": "http://localhost",
+    "ANALYTICS_ROLLUP_INTERVAL_SECONDS": "0",
+    "CHAT_ARCHIVE_INTERVAL_SECONDS": "0",
+}
+
+HEAVY_MODULES = ("google.generativeai", "langgraph", "qdrant_client")
+
+COLD_START = """
+import json, logging, sys, time
+started = time.perf_counter()
+import app.main
+imported = time.perf_counter()
+logging.disable(logging.CRITICAL)
+from fastapi.testclient import TestClient
+with TestClient(app.main.app) as client:
+    booted = time.perf_counter()
+    status = client.get("/api/ready").status_code
+    ready = time.perf_counter()
+print(json.dumps({
+    "import_ms": (imported - started) * 1000,
+    "startup_ms": (booted - imported) * 1000,
+    "first_ready_ms": (ready - booted) * 1000,
+    "ready_status": status,
+    "modules": len(sys.modules),
+    "heavy_loaded": [m for m in %r if m in sys.modules],
+}))
+""" % (HEAVY_MODULES,)
+
+DEPENDENCY_INIT = """
+import json, logging, time
+import app.main
+logging.disable(logging.CRITICAL)
+from app.graphs import chat_graph
+from app.services import gemini_service, rag_service
+timings = {}
+for name, init in (("llm", gemini_service.get_provider), ("qdrant", rag_service.get_client), ("chat_graph", chat_graph.get_chat_graph)):
+    started = time.perf_counter()
+    init()
+    timings[name] = (time.perf_counter() - started) * 1000
+rag_service.close_client()
+print(json.dumps(timings))
+"""
+
+
+def run(code: str) -> dict:
+    env = {**os.environ, **{key: os.environ.get(key, value) for key, value in ENV.items()}}
+    env["PYTHONPATH"] = os.pathsep.join(filter(None, [BACKEND_DIR, env.get("PYTHONPATH")]))
+    # Run from a scratch directory so embedded Qdrant storage doesn't land in the repo
+    with tempfile.TemporaryDirectory() as scratch:
+        output = subprocess.run(
+            [sys.executable, "-c", code], cwd=scratch, env=env, capture_output=True, text=True, check=True
+        ).stdout
+    return json.loads(output.strip().splitlines()[-1])
+
+
+def main(repeats: int = 5):
+    print(f"Cold start, median of {repeats} fresh interpreters")
+    runs = [run(COLD_START) for _ in range(repeats)]
+    for key in ("import_ms", "startup_ms", "first_ready_ms"):
+        print(f"  {key:<16} {statistics.median(r[key] for r in runs):8.1f} ms")
+    print(f"  /api/ready status {runs[0]['ready_status']}, {runs[0]['modules']} modules loaded")
+    print(f"  heavy modules loaded at startup: {runs[0]['heavy_loaded'] or 'none'}")
+    
+    print("Lazy dependency initialization (first use)")
+    inits = [run(DEPENDENCY_INIT) for _ in range(repeats)]
+    for name in inits[0]:
+        print(f"  {name:<16} {statistics.median(r[name] for r in inits):8.1f} ms")
+
+
+if __name__ == "__main__":
+    if len(sys.argv) > 2:
+        print(__doc__)
+        sys.exit(1)
+    main(int(sys.argv[1]) if len(sys.argv) == 2 else 5)
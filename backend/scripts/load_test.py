@@ -0,0 +1,340 @@
+"""
+Load test for POST /api/chat: virtual users log in as the seeded accounts and hold
+policy-question and multi-turn leave-request conversations in a closed loop, then
+throughput and p50/p95/p99 latency are reported per intent and per leave-flow stage.
+
+By default everything runs in this process and offline: the app is served through
+httpx's ASGI transport with its normal lifespan, LLM_PROVIDER=stub stands in for
+Gemini (with realistic latencies), Qdrant runs in memory with the policy documents
+ingested, and the database is a fresh SQLite file seeded with seed_users. Any of
+those can be overridden through the usual environment variables.
+
+With --url the same traffic goes to a running stack instead; it must already be
+seeded (python app/seeds/seed_users.py) and should run with LLM_PROVIDER=stub.
+
+Each leave conversation books its own future dates, so runs don't trip over the
+overlap check; a conversation that doesn't reach the expected next stage is
+counted as derailed and abandoned.
+
+Usage: python scripts/load_test.py [--users 20] [--duration 60 | --conversations N]
+                                   [--leave-ratio 0.4] [--think-time 1.0] [--url URL] [--json] [--verbose]
+"""
+import argparse
+import asyncio
+import itertools
+import json
+import logging
+import os
+import random
+import shutil
+import sys
+import tempfile
+import time
+from collections import defaultdict
+from contextlib import asynccontextmanager
+from datetime import date, timedelta
+
+# Add parent directory to path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+DATA_DIR = tempfile.mkdtemp(prefix="hr-load-test-")
+
+# Offline stack: stub LLM, in-memory Qdrant, throwaway SQLite database
+for key, value in {
+    "DATABASE_URL": f"sqlite:///{os.path.join(DATA_DIR, 'load_test.db')}",
+    "GEMINI_API_KEY": "unused",
+    "GEMINI_MODEL": "stub",
+    "GEMINI_EMBEDDING_MODEL": "stub",
+    "LLM_PROVIDER": "stub",
+    "STUB_LATENCY_MEDIAN_MS": "300",
+    "STUB_LATENCY_P99_MS": "1500",
+    "STUB_EMBEDDING_LATENCY_MEDIAN_MS": "40",
+    "STUB_EMBEDDING_LATENCY_P99_MS": "150",
+    "QDRANT_HOST": ":memory:",
+    "QDRANT_COLLECTION_NAME": "hr_policies",
+    "SECRET_KEY": "load-test",
+    "ALGORITHM": "HS256",
+    "CORS_ORIGINS": "http://localhost",
+    "STARTUP_WARMUP": "true",
+    # Every conversation books new dates; keep balances out of the way
+    "LEAVE_ENTITLEMENTS": "annual=100000,sick=100000,parental=100000",
+    "ANALYTICS_ROLLUP_INTERVAL_SECONDS": "0",
+    "CHAT_ARCHIVE_INTERVAL_SECONDS": "0",
+}.items():
+    os.environ.setdefault(key, value)
+
+import httpx
+
+# Seeded accounts (app/seeds/seed_users.py)
+ACCOUNTS = [
+    ("hr@company.com", "hr123456"),
+    ("john.employee@company.com", "employee123"),
+    ("jane.employee@company.com", "employee123"),
+]
+
+POLICY_QUESTIONS = [
+    "How many days of annual leave do I get per year?",
+    "What is the sick leave policy?",
+    "Can I carry over unused vacation days?",
+    "How long is parental leave?",
+    "What is the work from home policy?",
+    "How many days a week can I work remotely?",
+    "What health insurance benefits do we have?",
+    "Is there a retirement plan?",
+    "What does the code of conduct say about conflicts of interest?",
+    "Who do I report harassment to?",
+    "Do I need a doctor's note for sick leave?",
+    "What equipment do I get for working from home?",
+]
+
+REASONS = [
+    "Going on a family trip for a wedding",
+    "Taking time off for a medical appointment",
+    "Moving house, for the whole day",
+    "Resting because of burnout",
+]
+
+# Scripted leave conversation: (stage the message is answering, message, text the reply must contain)
+# The dates message is filled in per conversation
+LEAVE_FLOW = [
+    ("start", "I need to take some time off", "What type of leave"),
+    ("collect_type", "Annual leave please", "When would you like"),
+    ("ask_dates", None, "reason"),
+    ("ask_reason", None, "Is this correct"),
+    ("confirm", "yes", None),  # Succeeds when the reply carries the created request
+]
+
+# A virtual user whose turn failed waits ERROR_BACKOFF_SECONDS, doubling per consecutive failure
+ERROR_BACKOFF_SECONDS = 0.5
+MAX_ERROR_BACKOFF_SECONDS = 30.0
+
+
+class Stats:
+    def __init__(self):
+        self.by_intent = defaultdict(list)
+        self.by_stage = defaultdict(list)
+        self.turns = 0
+        self.started = 0  # conversations begun, however they ended
+        self.http_errors = defaultdict(int)
+        self.conversations = defaultdict(int)  # kind -> completed
+        self.derailed = defaultdict(int)  # stage -> count
+
+    def record(self, latency: float, intent, stage=None):
+        self.turns += 1
+        self.by_intent[intent or "none"].append(latency)
+        if stage:
+            self.by_stage[stage].append(latency)
+
+
+class LeaveDates:
+    """Hands out non-overlapping date ranges per account, starting well in the future"""
+
+    def __init__(self):
+        self.start = date.today() + timedelta(days=30)
+        self.counters = defaultdict(itertools.count)
+
+    def next(self, email: str):
+        first = self.start + timedelta(days=3 * next(self.counters[email]))
+        return first, first + timedelta(days=1)
+
+
+async def login(client: httpx.AsyncClient, email: str, password: str) -> dict:
+    response = await client.post("/api/auth/login", data={"username": email, "password": password})
+    response.raise_for_status()
+    return {"Authorization": f"Bearer {response.json()['access_token']}"}
+
+
+async def send(client, headers, stats: Stats, message: str, session_id=None, stage=None):
+    """One chat turn; returns the response body, or None on failure"""
+    payload = {"message": message}
+    if session_id:
+        payload["session_id"] = session_id
+    started = time.perf_counter()
+    try:
+        response = await client.post("/api/chat", json=payload, headers=headers)
+    except httpx.HTTPError as e:
+        stats.http_errors[type(e).__name__] += 1
+        return None
+    latency = time.perf_counter() - started
+    if response.status_code != 200:
+        stats.http_errors[str(response.status_code)] += 1
+        return None
+    body = response.json()
+    stats.record(latency, body.get("intent"), stage)
+    return body
+
+
+async def policy_conversation(client, headers, stats: Stats, rng: random.Random, think_time: float):
+    session_id = None
+    for _ in range(rng.choice((1, 1, 2))):
+        body = await send(client, headers, stats, rng.choice(POLICY_QUESTIONS), session_id)
+        if body is None:
+            return False
+        session_id = body["session_id"]
+        await asyncio.sleep(rng.uniform(0, 2 * think_time))
+    stats.conversations["policy_question"] += 1
+    return True
+
+
+async def leave_conversation(client, headers, email, stats: Stats, rng: random.Random, think_time: float, dates: LeaveDates):
+    session_id = None
+    start, end = dates.next(email)
+    for stage, message, expected in LEAVE_FLOW:
+        if stage == "ask_dates":
+            message = f"From {start.isoformat()} to {end.isoformat()}"
+        elif stage == "ask_reason":
+            message = rng.choice(REASONS)
+        body = await send(client, headers, stats, message, session_id, stage)
+        if body is None:
+            return False
+        session_id = body["session_id"]
+        done = (body.get("data") or {}).get("id") is not None if expected is None else expected in body["response"]
+        if not done:
+            stats.derailed[stage] += 1
+            return True
+        await asyncio.sleep(rng.uniform(0, 2 * think_time))
+    stats.conversations["leave_request"] += 1
+    return True
+
+
+async def virtual_user(index, client, sessions, stats, args, should_continue, dates: LeaveDates):
+    rng = random.Random(args.seed + index)
+    email, headers = sessions[index % len(sessions)]
+    # Stagger arrivals so the users don't march in lockstep
+    await asyncio.sleep(rng.uniform(0, args.think_time))
+    failures = 0
+    while should_continue():
+        stats.started += 1
+        if rng.random() < args.leave_ratio:
+            ok = await leave_conversation(client, headers, email, stats, rng, args.think_time, dates)
+        else:
+            ok = await policy_conversation(client, headers, stats, rng, args.think_time)
+        # Back off after an HTTP error instead of hammering a failing stack
+        failures = 0 if ok else failures + 1
+        if failures:
+            await asyncio.sleep(min(ERROR_BACKOFF_SECONDS * 2 ** (failures - 1), MAX_ERROR_BACKOFF_SECONDS))
+
+
+@asynccontextmanager
+async def local_stack():
+    """The app with its lifespan, seeded users and ingested policies, behind an in-process transport"""
+    from app.main import app
+    from app.database import Base, SessionLocal, engine
+    from app.seeds.seed_users import seed_users
+    from app.services.rag_service import ingest_policy_documents
+
+    Base.metadata.create_all(bind=engine)
+    db = SessionLocal()
+    try:
+        seed_users(db)
+    finally:
+        db.close()
+    ingest_policy_documents(os.path.join(BACKEND_DIR, "app", "data", "hr_policies"))
+    async with app.router.lifespan_context(app):
+        transport = httpx.ASGITransport(app=app, raise_app_exceptions=False)
+        async with httpx.AsyncClient(transport=transport, base_url="http://load-test", timeout=120) as client:
+            yield client
+
+
+@asynccontextmanager
+async def remote_stack(url: str):
+    limits = httpx.Limits(max_connections=None, max_keepalive_connections=None)
+    async with httpx.AsyncClient(base_url=url, timeout=120, limits=limits) as client:
+        yield client
+
+
+def report(stats: Stats, elapsed: float) -> dict:
+    from app.services import metrics_service
+
+    def table(samples):
+        return {name: metrics_service.summarize(values) for name, values in sorted(samples.items())}
+
+    stage_order = [stage for stage, _, _ in LEAVE_FLOW]
+    return {
+        "elapsed_seconds": elapsed,
+        "turns": stats.turns,
+        "turns_per_second": stats.turns / elapsed if elapsed else 0.0,
+        "conversations_started": stats.started,
+        "conversations": dict(stats.conversations),
+        "conversations_per_second": sum(stats.conversations.values()) / elapsed if elapsed else 0.0,
+        "http_errors": dict(stats.http_errors),
+        "derailed": dict(stats.derailed),
+        "by_intent": table(stats.by_intent),
+        "by_stage": {stage: metrics_service.summarize(stats.by_stage[stage]) for stage in stage_order if stage in stats.by_stage},
+    }
+
+
+def print_report(result: dict):
+    print("\n" + "=" * 72)
+    print(f"Elapsed: {result['elapsed_seconds']:.1f}s   Turns: {result['turns']} "
+          f"({result['turns_per_second']:.2f}/s)   Conversations: {result['conversations_started']} started, "
+          f"{result['conversations_per_second']:.2f}/s completed")
+    for kind, count in sorted(result["conversations"].items()):
+        print(f"  {kind}: {count} completed")
+    for label, key in [("Latency by intent", "by_intent"), ("Latency by leave-flow stage", "by_stage")]:
+        print(f"\n{label} (ms):")
+        print(f"  {'':<18}{'count':>7}{'mean':>9}{'p50':>9}{'p95':>9}{'p99':>9}")
+        for name, summary in result[key].items():
+            print(f"  {name:<18}{summary['count']:>7}" + "".join(
+                f"{summary[stat] * 1000:>9.0f}" for stat in ("mean", "p50", "p95", "p99")
+            ))
+    errors = sum(result["http_errors"].values())
+    derailed = sum(result["derailed"].values())
+    print()
+    print(f"{'✓' if not errors else '✗'} HTTP errors: {errors} {result['http_errors'] or ''}")
+    print(f"{'✓' if not derailed else '✗'} Derailed leave conversations: {derailed} {result['derailed'] or ''}")
+    print("=" * 72)
+
+
+async def run(args) -> dict:
+    stack = remote_stack(args.url) if args.url else local_stack()
+    async with stack as client:
+        sessions = []
+        for email, password in ACCOUNTS:
+            sessions.append((email, await login(client, email, password)))
+        print(f"Logged in {len(sessions)} seeded accounts; starting {args.users} virtual users")
+
+        stats = Stats()
+        dates = LeaveDates()
+        started = time.perf_counter()
+        if args.conversations:
+            # Counted when started, so errored conversations count and users don't overshoot
+            should_continue = lambda: stats.started < args.conversations
+        else:
+            should_continue = lambda: time.perf_counter() - started < args.duration
+        await asyncio.gather(*(
+            virtual_user(i, client, sessions, stats, args, should_continue, dates) for i in range(args.users)
+        ))
+        return report(stats, time.perf_counter() - started)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Load test POST /api/chat")
+    parser.add_argument("--users", type=int, default=20, help="concurrent virtual users")
+    parser.add_argument("--duration", type=float, default=60.0, help="seconds to run for")
+    parser.add_argument("--conversations", type=int, default=0, help="stop starting conversations after this many, instead of --duration")
+    parser.add_argument("--leave-ratio", type=float, default=0.4, help="share of conversations that request leave")
+    parser.add_argument("--think-time", type=float, default=1.0, help="mean pause between turns, in seconds")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--url", help="target a running stack instead of the in-process one")
+    parser.add_argument("--json", action="store_true", help="print the report as JSON")
+    parser.add_argument("--verbose", action="store_true", help="keep the app's per-request INFO logging")
+    args = parser.parse_args()
+    if not args.verbose:
+        logging.disable(logging.INFO)
+
+    try:
+        result = asyncio.run(run(args))
+    finally:
+        shutil.rmtree(DATA_DIR, ignore_errors=True)
+    if args.json:
+        print(json.dumps(result, indent=2))
+    else:
+        print_report(result)
+    failed = sum(result["http_errors"].values()) + sum(result["derailed"].values())
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == "__main__":
+    main()
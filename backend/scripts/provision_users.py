@@ -0,0 +1,44 @@
+"""
+Bulk-provision users from a CSV file with columns: email,full_name,role,password
+
+Passwords are hashed in parallel across a process pool.
+
+Usage: python scripts/provision_users.py users.csv
+"""
+import csv
+import sys
+import os
+
+# Add parent directory to path
+sys.path.insert(0, os.path.dirname(os.path.dirname(__file__)))
+
+from app.database import SessionLocal
+from app.seeds.seed_users import provision_users
+
+
+def main(csv_path: str):
+    with open(csv_path, newline='', encoding='utf-8') as f:
+        users_data = [
+            {key: row[key].strip() for key in ("email", "full_name", "role", "password")}
+            for row in csv.DictReader(f)
+        ]
+    print(f"Provisioning {len(users_data)} users from {csv_path}...")
+
+    db = SessionLocal()
+    try:
+        users = provision_users(db, users_data)
+        db.commit()
+        print(f"✓ Created {len(users)} users")
+    except Exception as e:
+        db.rollback()
+        print(f"✗ Error provisioning users: {e}")
+        raise
+    finally:
+        db.close()
+
+
+if __name__ == "__main__":
+    if len(sys.argv) != 2:
+        print(__doc__)
+        sys.exit(1)
+    main(sys.argv[1])
@@ -0,0 +1,38 @@
+"""
+Rebuild leave_balances from HR request history in bulk (one aggregate query).
+
+Run after applying the leave_balances migration, after changing LEAVE_ENTITLEMENTS,
+or whenever balances may have drifted. Entitlements are reset from settings.
+
+Usage: python scripts/reconcile_leave_balances.py [year]
+"""
+import sys
+import os
+
+# Add parent directory to path
+sys.path.insert(0, os.path.dirname(os.path.dirname(__file__)))
+
+from app.database import SessionLocal
+from app.services.balance_service import reconcile_balances
+
+
+def main(year=None):
+    print(f"Reconciling leave balances{f' for {year}' if year else ''}...")
+    db = SessionLocal()
+    try:
+        rows = reconcile_balances(db, year)
+        db.commit()
+        print(f"✓ Wrote {rows} balance rows")
+    except Exception as e:
+        db.rollback()
+        print(f"✗ Error reconciling balances: {e}")
+        raise
+    finally:
+        db.close()
+
+
+if __name__ == "__main__":
+    if len(sys.argv) > 2:
+        print(__doc__)
+        sys.exit(1)
+    main(int(sys.argv[1]) if len(sys.argv) == 2 else None)
@@ -0,0 +1,37 @@
+"""
+Bring the analytics rollups up to date (the same work as the background task).
+
+Use --rebuild to clear the aggregates and watermarks and recompute from all history
+(archived chat turns included), e.g. after applying the rollup migration or changing
+the bucketing.
+
+Usage: python scripts/refresh_analytics.py [--rebuild]
+"""
+import sys
+import os
+
+# Add parent directory to path
+sys.path.insert(0, os.path.dirname(os.path.dirname(__file__)))
+
+from app.services.analytics_service import refresh_rollups
+
+
+def main(rebuild=False):
+    print(f"{'Rebuilding' if rebuild else 'Refreshing'} analytics rollups...")
+    try:
+        result = refresh_rollups(rebuild=rebuild)
+        print(f"✓ Recomputed {result['request_days']} request days, added {result['chat_turns']} chat turns "
+              f"(processed until {result['processed_until']})")
+        if rebuild:
+            print(f"✓ Counted {result['archived_chat_turns']} archived chat turns")
+    except Exception as e:
+        print(f"✗ Error refreshing rollups: {e}")
+        raise
+
+
+if __name__ == "__main__":
+    args = sys.argv[1:]
+    if args not in ([], ["--rebuild"]):
+        print(__doc__)
+        sys.exit(1)
+    main(rebuild=bool(args))
@@ -0,0 +1,231 @@
+"""
+Replay chat transcripts through the chat graph in batch, without the API, and write
+one NDJSON result per turn: intent, response, leave-flow stage, per-node timings and
+LLM token counts. Use it to regression-test prompt and routing changes over real
+transcripts and to measure their throughput impact.
+
+Input is JSONL, one record per line, in any of these shapes:
+
+    {"message": "What is the sick leave policy?"}
+    {"id": "c1", "user_id": 2, "messages": ["I need leave", "annual", {"message": "yes", "intent": "leave_request"}]}
+    a row of GET /api/exports/chat (rows sharing a session_id replay as one conversation, in file order)
+
+Conversations run concurrently on --workers threads; turns within one run in order,
+carrying the leave-flow state forward as /api/chat does. A recorded "intent" is
+compared with the replayed one. The LLM provider and Qdrant come from the usual
+settings (LLM_PROVIDER=stub runs offline; --ingest loads the policy documents first,
+e.g. into QDRANT_HOST=:memory:). Leave requests are created in a scratch SQLite
+database unless --database-url is given.
+
+Usage: python scripts/replay_transcripts.py transcripts.jsonl [--workers 8] [--output results.ndjson]
+                                            [--limit N] [--ingest] [--user-id 2] [--database-url URL]
+"""
+import argparse
+import json
+import logging
+import os
+import shutil
+import sys
+import tempfile
+import time
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+# Add parent directory to path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Replay chat transcripts through the chat graph")
+    parser.add_argument("input", help="JSONL transcripts ('-' for stdin)")
+    parser.add_argument("--workers", type=int, default=8, help="conversations replayed concurrently")
+    parser.add_argument("--output", help="NDJSON results file (default: stdout)")
+    parser.add_argument("--limit", type=int, default=0, help="replay only the first N conversations")
+    parser.add_argument("--ingest", action="store_true", help="ingest the HR policy documents into Qdrant first")
+    parser.add_argument("--user-id", type=int, default=2, help="user for transcripts without a user_id (default: a seeded employee)")
+    parser.add_argument("--database-url", help="database for leave requests created by the replay (default: scratch SQLite)")
+    parser.add_argument("--verbose", action="store_true", help="keep the graph's per-node INFO logging")
+    return parser.parse_args()
+
+
+def load_conversations(lines) -> list:
+    """Group JSONL records into conversations: {"id", "user_id", "turns": [{"message", "intent"}]}"""
+    conversations = {}
+    for number, line in enumerate(lines, 1):
+        line = line.strip()
+        if not line:
+            continue
+        record = json.loads(line)
+        if "messages" in record:
+            turns = [turn if isinstance(turn, dict) else {"message": turn} for turn in record["messages"]]
+            key = record.get("id") or f"line-{number}"
+        elif "message" in record:
+            turns = [{"message": record["message"], "intent": record.get("intent")}]
+            key = record.get("session_id") or record.get("id") or f"line-{number}"
+        else:
+            raise ValueError(f"Line {number}: expected a 'message' or 'messages' field")
+        conversation = conversations.setdefault(str(key), {"id": str(key), "user_id": record.get("user_id"), "turns": []})
+        conversation["turns"].extend(turns)
+    return list(conversations.values())
+
+
+def run_turn(graph, state: dict, db):
+    """Stream one turn through the graph; returns (final state, {node: milliseconds})"""
+    final = dict(state)
+    timings = {}
+    last = time.perf_counter()
+    for update in graph.stream(state, config={"configurable": {"db": db}}, stream_mode="updates"):
+        now = time.perf_counter()
+        for node, values in update.items():
+            timings[node] = round((now - last) * 1000, 1)
+            if values:
+                final.update(values)
+        last = now
+    return final, timings
+
+
+def replay_conversation(conversation: dict, default_user_id: int) -> list:
+    from app.config import settings
+    from app.database import SessionLocal
+    from app.graphs.chat_graph import get_chat_graph
+    from app.graphs.deadline import new_deadline
+    from app.services.gemini_service import track_usage
+
+    graph = get_chat_graph()
+    user_id = conversation["user_id"] or default_user_id
+    conversation_data = None
+    results = []
+    for index, turn in enumerate(conversation["turns"]):
+        state = {
+            "message": turn["message"],
+            "user_id": user_id,
+            "intent": None,
+            "context": None,
+            "tool_result": None,
+            "response": "",
+            "conversation_data": conversation_data,
+            "deadline": new_deadline(settings.route_deadline("chat_replay")),
+        }
+        result = {"conversation": conversation["id"], "turn": index, "user_id": user_id, "message": turn["message"]}
+        db = SessionLocal()
+        started = time.perf_counter()
+        try:
+            with track_usage() as usage:
+                final, timings = run_turn(graph, state, db)
+            db.commit()
+        except Exception as e:
+            db.rollback()
+            result.update(error=f"{type(e).__name__}: {e}", latency_ms=round((time.perf_counter() - started) * 1000, 1))
+            results.append(result)
+            break  # The conversation state is unknown from here on
+        finally:
+            db.close()
+        conversation_data = final.get("conversation_data")
+        result.update(
+            intent=final.get("intent"),
+            expected_intent=turn.get("intent"),
+            response=final.get("response"),
+            stage=(conversation_data or {}).get("stage"),
+            data=final.get("tool_result"),
+            latency_ms=round((time.perf_counter() - started) * 1000, 1),
+            node_ms=timings,
+            tokens=usage,
+            total_tokens=sum(entry["prompt_tokens"] + entry["output_tokens"] for entry in usage.values()),
+        )
+        results.append(result)
+    return results
+
+
+def print_summary(results: list, elapsed: float, num_conversations: int):
+    from app.services import metrics_service
+
+    turns = [r for r in results if "error" not in r]
+    errors = len(results) - len(turns)
+    node_samples = defaultdict(list)
+    token_totals = defaultdict(int)
+    for r in turns:
+        for node, ms in r["node_ms"].items():
+            node_samples[node].append(ms)
+        for node, entry in r["tokens"].items():
+            token_totals[node] += entry["prompt_tokens"] + entry["output_tokens"]
+    compared = [r for r in turns if r["expected_intent"]]
+    changed = [r for r in compared if r["intent"] != r["expected_intent"]]
+
+    out = sys.stderr
+    print("\n" + "=" * 72, file=out)
+    print(f"Replayed {num_conversations} conversations, {len(results)} turns in {elapsed:.1f}s "
+          f"({len(results) / elapsed if elapsed else 0:.2f} turns/s)", file=out)
+    latency = metrics_service.summarize([r["latency_ms"] for r in turns])
+    print(f"Turn latency (ms): p50 {latency['p50']:.0f}  p95 {latency['p95']:.0f}  p99 {latency['p99']:.0f}", file=out)
+    for node, samples in sorted(node_samples.items()):
+        summary = metrics_service.summarize(samples)
+        print(f"  {node:<20} n={summary['count']:<6} p50 {summary['p50']:>7.0f}  p95 {summary['p95']:>7.0f}  p99 {summary['p99']:>7.0f}", file=out)
+    print(f"Tokens: {sum(token_totals.values())} " + (str(dict(token_totals)) if token_totals else ""), file=out)
+    if compared:
+        print(f"{'✓' if not changed else '✗'} Intent changed on {len(changed)} of {len(compared)} turns with a recorded intent", file=out)
+    print(f"{'✓' if not errors else '✗'} Errors: {errors}", file=out)
+    print("=" * 72, file=out)
+
+
+def main():
+    args = parse_args()
+    scratch_dir = None
+    if args.database_url:
+        os.environ["DATABASE_URL"] = args.database_url
+    else:
+        scratch_dir = tempfile.mkdtemp(prefix="hr-replay-")
+        os.environ["DATABASE_URL"] = f"sqlite:///{os.path.join(scratch_dir, 'replay.db')}"
+    # No background jobs or warm-up; the graph and clients are created on first use
+    os.environ.setdefault("STARTUP_WARMUP", "false")
+    if not args.verbose:
+        logging.disable(logging.INFO)
+
+    try:
+        from app.database import Base, SessionLocal, engine
+        from app.graphs.chat_graph import get_chat_graph
+        from app.seeds.seed_users import seed_users
+        from app.services.rag_service import ingest_policy_documents
+
+        if scratch_dir:
+            Base.metadata.create_all(bind=engine)
+            db = SessionLocal()
+            try:
+                seed_users(db)
+            finally:
+                db.close()
+        if args.ingest:
+            ingest_policy_documents(os.path.join(BACKEND_DIR, "app", "data", "hr_policies"))
+
+        stream = sys.stdin if args.input == "-" else open(args.input, encoding="utf-8")
+        with stream:
+            conversations = load_conversations(stream)
+        if args.limit:
+            conversations = conversations[:args.limit]
+        print(f"Replaying {len(conversations)} conversations on {args.workers} workers...", file=sys.stderr)
+
+        get_chat_graph()
+        output = open(args.output, "w", encoding="utf-8") if args.output else sys.stdout
+        results = []
+        started = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=max(args.workers, 1)) as pool:
+            futures = [pool.submit(replay_conversation, c, args.user_id) for c in conversations]
+            for future in as_completed(futures):
+                turns = future.result()
+                for result in turns:
+                    output.write(json.dumps(result, default=str) + "\n")
+                results.extend(turns)
+        elapsed = time.perf_counter() - started
+        if args.output:
+            output.close()
+        print_summary(results, elapsed, len(conversations))
+    finally:
+        if scratch_dir:
+            shutil.rmtree(scratch_dir, ignore_errors=True)
+
+    sys.exit(1 if any("error" in r for r in results) else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -8,8 +8,26 @@ const ChatInterface = () => {
   const [loading, setLoading] = useState(false);
   const [sessionId, setSessionId] = useState(null);
   const [loadingHistory, setLoadingHistory] = useState(false);
+  const [historyCursor, setHistoryCursor] = useState(null);
   const messagesEndRef = useRef(null);
 
+  // Convert history format to message format
+  const formatHistory = (historyMessages) => {
+    const formattedMessages = [];
+    historyMessages.forEach((item) => {
+      formattedMessages.push({
+        role: 'user',
+        content: item.message,
+      });
+      formattedMessages.push({
+        role: 'assistant',
+        content: item.response,
+        intent: item.intent,
+      });
+    });
+    return formattedMessages;
+  };
+
   const scrollToBottom = () => {
     messagesEndRef.current?.scrollIntoView({ behavior: 'smooth' });
   };
@@ -34,23 +52,8 @@ const ChatInterface = () => {
       setLoadingHistory(true);
       try {
         const response = await api.get(`/api/chat/history/${sessionId}`);
-        const historyMessages = response.data.messages || [];
-        
-        // Convert history format to message format
-        const formattedMessages = [];
-        historyMessages.forEach((item) => {
-          formattedMessages.push({
-            role: 'user',
-            content: item.message,
-          });
-          formattedMessages.push({
-            role: 'assistant',
-            content: item.response,
-            intent: item.intent,
-          });
-        });
-        
-        setMessages(formattedMessages);
+        setMessages(formatHistory(response.data.messages || []));
+        setHistoryCursor(response.data.next_cursor || null);
       } catch (error) {
         console.error('Error loading chat history:', error);
         // If history doesn't exist or error, just continue with empty messages
@@ -62,6 +65,18 @@ const ChatInterface = () => {
     loadChatHistory();
   }, [sessionId]);
 
+  const loadEarlierMessages = async () => {
+    try {
+      const response = await api.get(`/api/chat/history/${sessionId}`, {
+        params: { before: historyCursor },
+      });
+      setMessages((prev) => [...formatHistory(response.data.messages || []), ...prev]);
+      setHistoryCursor(response.data.next_cursor || null);
+    } catch (error) {
+      console.error('Error loading earlier messages:', error);
+    }
+  };
+
   const handleSendMessage = async (message) => {
     if (!message.trim()) return;
 
@@ -110,6 +125,16 @@ const ChatInterface = () => {
             <p>Loading conversation history...</p>
           </div>
         )}
+        {!loadingHistory && historyCursor && (
+          <div className="text-center">
+            <button
+              onClick={loadEarlierMessages}
+              className="text-sm text-indigo-600 hover:text-indigo-800"
+            >
+              Load earlier messages
+            </button>
+          </div>
+        )}
         {!loadingHistory && messages.length === 0 && (
           <div className="text-center text-gray-500 mt-8">
             <p className="text-lg font-semibold mb-2">Welcome to HR AI Agent!</p>
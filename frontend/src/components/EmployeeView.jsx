@@ -5,10 +5,14 @@ import RequestCard from './RequestCard';
 import api from '../services/api';
 import { useAuth } from '../context/AuthContext';
 import { logout } from '../services/auth';
+import { subscribeToRequestEvents, upsertRequest, appendPage } from '../services/requestEvents';
+
+const PAGE_SIZE = 100;
 
 const EmployeeView = () => {
   const [requests, setRequests] = useState([]);
   const [loading, setLoading] = useState(true);
+  const [nextCursor, setNextCursor] = useState(null);
   const { user } = useAuth();
   const navigate = useNavigate();
 
@@ -16,12 +20,27 @@ const EmployeeView = () => {
     fetchRequests();
   }, []);
 
-  const fetchRequests = async () => {
+  // Requests created in chat and HR decisions show up without a refresh
+  useEffect(() => {
+    return subscribeToRequestEvents((event) => {
+      if (event.type === 'resync') {
+        fetchRequests();
+      } else {
+        setRequests((prev) => upsertRequest(prev, event.request));
+      }
+    });
+  }, []);
+
+  // Fetch the first page, or the page after `cursor` when loading more
+  const fetchRequests = async (cursor = null) => {
     try {
       console.log('Fetching user requests...');
-      const response = await api.get('/api/requests');
+      const params = { limit: PAGE_SIZE };
+      if (cursor) params.cursor = cursor;
+      const response = await api.get('/api/requests', { params });
       console.log('Requests fetched:', response.data);
-      setRequests(response.data);
+      setRequests((prev) => (cursor ? appendPage(prev, response.data) : response.data));
+      setNextCursor(response.headers['x-next-cursor'] || null);
     } catch (error) {
       console.error('Error fetching requests:', error);
       console.error('Error details:', error.response?.data);
@@ -81,6 +100,16 @@ const EmployeeView = () => {
                 {requests.map((request) => (
                   <RequestCard key={request.id} request={request} />
                 ))}
+                {nextCursor && (
+                  <div className="text-center">
+                    <button
+                      onClick={() => fetchRequests(nextCursor)}
+                      className="px-4 py-2 text-sm text-indigo-600 hover:text-indigo-800"
+                    >
+                      Load more
+                    </button>
+                  </div>
+                )}
               </div>
             )}
           </div>
@@ -3,25 +3,47 @@ import { useNavigate } from 'react-router-dom';
 import api from '../services/api';
 import { useAuth } from '../context/AuthContext';
 import { logout } from '../services/auth';
+import { subscribeToRequestEvents, upsertRequest, appendPage } from '../services/requestEvents';
 import ChatInterface from './ChatInterface';
 
+const PAGE_SIZE = 100;
+
 const HRDashboard = () => {
   const [requests, setRequests] = useState([]);
   const [loading, setLoading] = useState(true);
   const [filter, setFilter] = useState('all');
+  const [nextCursor, setNextCursor] = useState(null);
+  const [selected, setSelected] = useState(new Set());
   const { user } = useAuth();
   const navigate = useNavigate();
 
   useEffect(() => {
+    setSelected(new Set());
     fetchRequests();
-  }, []);
+  }, [filter]);
+
+  // Apply pushed changes (new chat-created requests, other reviewers' decisions) in place
+  useEffect(() => {
+    return subscribeToRequestEvents((event) => {
+      if (event.type === 'resync') {
+        fetchRequests();
+      } else {
+        setRequests((prev) => upsertRequest(prev, event.request));
+      }
+    });
+  }, [filter]);
 
-  const fetchRequests = async () => {
+  // Fetch the first page, or the page after `cursor` when loading more
+  const fetchRequests = async (cursor = null) => {
     try {
       console.log('Fetching leave requests...');
-      const response = await api.get('/api/requests/all');
+      const params = { limit: PAGE_SIZE };
+      if (filter !== 'all') params.status = filter;
+      if (cursor) params.cursor = cursor;
+      const response = await api.get('/api/requests/all', { params });
       console.log('Requests fetched:', response.data);
-      setRequests(response.data);
+      setRequests((prev) => (cursor ? appendPage(prev, response.data) : response.data));
+      setNextCursor(response.headers['x-next-cursor'] || null);
     } catch (error) {
       console.error('Error fetching requests:', error);
       console.error('Error details:', error.response?.data);
@@ -31,10 +53,28 @@ const HRDashboard = () => {
     }
   };
 
+  // Patch review fields of loaded rows from approve/reject/bulk-review results
+  const applyReviews = (results) => {
+    const byId = new Map(results.map((result) => [result.id, result]));
+    setRequests((prev) =>
+      prev.map((req) => {
+        const result = byId.get(req.id);
+        if (!result || result.outcome === 'not_found') return req;
+        return {
+          ...req,
+          status: result.status,
+          reviewed_by: result.reviewed_by,
+          reviewed_at: result.reviewed_at,
+          reviewed_by_name: result.outcome === 'updated' ? user?.full_name : req.reviewed_by_name,
+        };
+      })
+    );
+  };
+
   const handleApprove = async (requestId) => {
     try {
-      await api.patch(`/api/requests/${requestId}/approve`);
-      fetchRequests();
+      const response = await api.patch(`/api/requests/${requestId}/approve`);
+      applyReviews([{ ...response.data, outcome: 'updated' }]);
     } catch (error) {
       console.error('Error approving request:', error);
       alert('Failed to approve request');
@@ -43,14 +83,41 @@ const HRDashboard = () => {
 
   const handleReject = async (requestId) => {
     try {
-      await api.patch(`/api/requests/${requestId}/reject`);
-      fetchRequests();
+      const response = await api.patch(`/api/requests/${requestId}/reject`);
+      applyReviews([{ ...response.data, outcome: 'updated' }]);
     } catch (error) {
       console.error('Error rejecting request:', error);
       alert('Failed to reject request');
     }
   };
 
+  const toggleSelected = (requestId) => {
+    setSelected((prev) => {
+      const next = new Set(prev);
+      if (next.has(requestId)) next.delete(requestId);
+      else next.add(requestId);
+      return next;
+    });
+  };
+
+  // Review all selected requests in one call and patch the loaded rows in place
+  const handleBulkReview = async (decision) => {
+    try {
+      const response = await api.post('/api/requests/bulk-review', {
+        ids: [...selected],
+        decision,
+      });
+      applyReviews(response.data.results);
+      setSelected(new Set());
+      if (response.data.conflicts > 0) {
+        alert(`${response.data.conflicts} request(s) had already been reviewed`);
+      }
+    } catch (error) {
+      console.error('Error reviewing requests:', error);
+      alert('Failed to review selected requests');
+    }
+  };
+
   const handleLogout = () => {
     logout();
     navigate('/login');
@@ -131,6 +198,25 @@ const HRDashboard = () => {
               </button>
             </div>
           </div>
+          {selected.size > 0 && (
+            <div className="px-6 py-3 bg-indigo-50 border-b border-indigo-100 flex justify-between items-center">
+              <span className="text-sm text-gray-700">{selected.size} selected</span>
+              <div className="flex space-x-2">
+                <button
+                  onClick={() => handleBulkReview('approved')}
+                  className="px-3 py-1 bg-green-600 text-white rounded text-sm hover:bg-green-700 transition-colors"
+                >
+                  Approve selected
+                </button>
+                <button
+                  onClick={() => handleBulkReview('rejected')}
+                  className="px-3 py-1 bg-red-600 text-white rounded text-sm hover:bg-red-700 transition-colors"
+                >
+                  Reject selected
+                </button>
+              </div>
+            </div>
+          )}
           <div className="flex-1 overflow-y-auto p-4">
             {loading ? (
               <div className="text-center text-gray-500">Loading...</div>
@@ -148,6 +234,14 @@ const HRDashboard = () => {
                     <div className="flex justify-between items-start mb-3">
                       <div className="flex-1">
                         <div className="flex items-center gap-2 mb-1">
+                          {request.status === 'pending' && (
+                            <input
+                              type="checkbox"
+                              checked={selected.has(request.id)}
+                              onChange={() => toggleSelected(request.id)}
+                              className="h-4 w-4"
+                            />
+                          )}
                           <h3 className="font-semibold text-gray-800 capitalize">
                             {request.request_type} Leave
                           </h3>
@@ -198,6 +292,16 @@ const HRDashboard = () => {
                     </div>
                   </div>
                 ))}
+                {nextCursor && (
+                  <div className="text-center">
+                    <button
+                      onClick={() => fetchRequests(nextCursor)}
+                      className="px-4 py-2 text-sm text-indigo-600 hover:text-indigo-800"
+                    >
+                      Load more
+                    </button>
+                  </div>
+                )}
               </div>
             )}
           </div>
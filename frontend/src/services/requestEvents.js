@@ -0,0 +1,33 @@
+import { API_BASE_URL } from './api';
+import { getToken } from './auth';
+
+const EVENT_TYPES = ['request.created', 'request.updated', 'resync'];
+
+// Subscribe to server-sent request changes; returns an unsubscribe function
+export const subscribeToRequestEvents = (onEvent) => {
+  const token = getToken();
+  if (!token) return () => {};
+
+  const source = new EventSource(
+    `${API_BASE_URL}/api/requests/events?token=${encodeURIComponent(token)}`
+  );
+  EVENT_TYPES.forEach((type) => {
+    source.addEventListener(type, (message) => onEvent(JSON.parse(message.data)));
+  });
+  return () => source.close();
+};
+
+const newestFirst = (a, b) =>
+  (b.created_at || '').localeCompare(a.created_at || '') || b.id - a.id;
+
+// Insert or replace a request row, keeping the list newest-first
+export const upsertRequest = (requests, request) => {
+  const rest = requests.filter((req) => req.id !== request.id);
+  return [...rest, request].sort(newestFirst);
+};
+
+// Append a fetched page, skipping rows already delivered by push events
+export const appendPage = (requests, page) => {
+  const seen = new Set(requests.map((req) => req.id));
+  return [...requests, ...page.filter((req) => !seen.has(req.id))];
+};